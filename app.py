@@ -1,25 +1,26 @@
 import os
 import logging
-from src.github.webhook_handler import app as webhook_app, set_review_agent, set_review_label
-from src.utils.config_loader import ConfigLoader
+from src.github.webhook_handler import (
+    app as webhook_app, enable_swagger, set_review_agent, set_review_label, set_review_scheduler
+)
+from src.utils.logger import configure_logging
+from src.utils.config_loader import (
+    get_config_snapshot, install_reload_signal_handler, set_config_dir, start_config_watcher
+)
 from src.github.github_api import GitHubAPI
 from src.agents.pr_review_agent import PRReviewAgent
+from src.agents.review_scheduler import create_review_scheduler
+from src.language_handlers import spell_dictionary
+from src.utils.profiling import configure_profiling
+from src.utils.tracing import configure_tracing
+from src.github.webhook_recorder import configure_recording
 import threading
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def initialize_github_api(config):
     logger.info("Initializing GitHub API")
-    logger.debug(f"Loaded configuration: {config}")  # Debug log for config content
+    logger.debug("Loaded configuration: %s", config)  # Debug log for config content
 
     # Get GitHub configuration details from the config file
     github_app_id = os.getenv('GITHUB_APP_ID', config.get('github', {}).get('app_id'))
@@ -44,13 +45,38 @@ def run_webhook_server():
 
 if __name__ == "__main__":
     # Load configuration
-    logger.info("Loading configuration")
-    config_loader = ConfigLoader(config_dir="./config")
-    config = config_loader.get_config()
+    set_config_dir("./config")
+    config = get_config_snapshot().config
+
+    # Log through a background thread so request threads never wait on disk or console I/O
+    configure_logging(config.get('logging', {}), config.get('log_level'))
+    logger.info("Loaded configuration")
+
+    # Reload prompts and model parameters on SIGHUP and, optionally, when the files change
+    install_reload_signal_handler()
+    start_config_watcher(float(os.getenv('CONFIG_WATCH_INTERVAL', config.get('config_reload', {}).get('watch_interval', 0))))
+
+    # Configure per-review tracing
+    configure_tracing(config.get('tracing', {}))
+
+    # Record webhook deliveries for replay, when a recording path is set
+    configure_recording(config.get('webhook_recording', {}))
+
+    # Configure opt-in profiling of CPU-bound review stages
+    configure_profiling(config.get('profiling', {}))
 
     # Initialize GitHub API
     github_api = initialize_github_api(config)
 
+    # Load the shared spell dictionary in the background so the server can accept requests meanwhile;
+    # a review that needs it before it is ready waits for the load to finish
+    spell_dictionary.configure_correction_cache(config.get('spell_check', {}))
+    threading.Thread(target=spell_dictionary.preload, name="spell-dictionary-preload", daemon=True).start()
+
+    # The Swagger UI is opt-in because flasgger is slow to import
+    if os.getenv('SWAGGER_ENABLED', str(config.get('swagger', {}).get('enabled', False))).lower() in ('1', 'true', 'yes'):
+        enable_swagger()
+
     # Initialize Agents
     agents = initialize_agents(github_api)
     review_agent = agents[0]  # Get the review agent
@@ -58,6 +84,13 @@ if __name__ == "__main__":
     # Pass the ReviewAgent instance to the webhook handler
     set_review_agent(review_agent)
 
+    # Run reviews on the scheduler, cheapest first, optionally answering webhooks before the review completes
+    review_scheduler = create_review_scheduler(review_agent, config)
+    if review_scheduler is not None:
+        scheduler_config = config.get('review', {}).get('scheduler', {})
+        respond_async = os.getenv('REVIEW_RESPOND_ASYNC', str(scheduler_config.get('respond_async', False)))
+        set_review_scheduler(review_scheduler, respond_async.lower() in ('1', 'true', 'yes'))
+
     # Get the label from the config and set it in the webhook handler
     review_label = config.get('github', {}).get('review_label', 'ready-to-review')
     set_review_label(review_label)
@@ -0,0 +1,163 @@
+"""
+Benchmark changed-parts extraction over generated multi-thousand-line hunks.
+
+Compares DiffIndex.changed_parts with the previous implementation, which paired lines with
+list.pop(0) and ran a word diff for every pair, and checks that both produce identical output.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_changed_parts
+    python -m benchmarks.bench_changed_parts --sizes 1000 5000 20000 --repeat 5
+"""
+import sys
+import time
+import random
+import argparse
+from difflib import SequenceMatcher
+
+from unidiff.patch import PatchSet
+
+from benchmarks.common import compare_results, print_results, save_results
+from benchmarks.synthetic import WORDS, generate_sentence
+
+DEFAULT_SIZES = (1000, 5000, 20000)
+
+
+def legacy_changed_parts(diff_text, filename):
+    """
+    The changed-parts extraction as it was before DiffIndex, kept as the reference.
+    """
+    header = f'--- a/{filename}\n+++ b/{filename}\n'
+    changed_parts = []
+    for patched_file in PatchSet(header + diff_text):
+        for hunk in patched_file:
+            removed_lines = []
+            for line in hunk:
+                if line.is_removed:
+                    removed_lines.append((line.value.rstrip('\n'), line.source_line_no))
+                elif line.is_added:
+                    added_line = line.value.rstrip('\n')
+                    if removed_lines:
+                        prev_line, _ = removed_lines.pop(0)
+                        prev_words = prev_line.split()
+                        added_words = added_line.split()
+                        matcher = SequenceMatcher(None, prev_words, added_words)
+                        changes = []
+                        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                            if tag in ('insert', 'replace', 'delete'):
+                                changes.extend(added_words[j1:j2])
+                        if changes:
+                            changed_parts.append({'line': line.target_line_no, 'changes': added_line.strip()})
+                    else:
+                        changed_parts.append({'line': line.target_line_no, 'changes': added_line.strip()})
+                else:
+                    removed_lines = []
+    return changed_parts
+
+
+def edit_line(rng, line):
+    """
+    Produce the new version of a line: a word change, a removed word, a whitespace-only edit or no change.
+    """
+    words = line.split()
+    choice = rng.random()
+    if choice < 0.4:
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    elif choice < 0.6 and len(words) > 1:
+        del words[rng.randrange(len(words))]
+    elif choice < 0.8:
+        return "  " + line + " "
+    return " ".join(words)
+
+
+def generate_hunk(rng, line_count, run_length=None, words_per_line=10):
+    """
+    Generate a single hunk of roughly line_count lines made of long runs of rewritten lines.
+
+    Each run removes run_length lines and adds their edited versions, which is the shape that
+    made pairing with list.pop(0) quadratic. By default the whole hunk is a single run.
+
+    Returns:
+        str: The patch text, starting with the '@@' header.
+    """
+    run_length = run_length or max(1, line_count // 2)
+    body = []
+    source = target = 0
+    while source + target < line_count:
+        before = [generate_sentence(rng, words_per_line, 0.0) for _ in range(run_length)]
+        body.extend(f"-{line}\n" for line in before)
+        body.extend(f"+{edit_line(rng, line)}\n" for line in before)
+        body.append(" Context line.\n")
+        source += run_length + 1
+        target += run_length + 1
+    return f"@@ -1,{source} +1,{target} @@\n" + "".join(body)
+
+
+def time_best(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark changed-parts extraction over large hunks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Hunk sizes in lines.")
+    parser.add_argument("--run-length", type=int,
+                        help="Removed lines per run of rewritten lines (default: half the hunk, a single run).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per hunk (best is reported).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for hunk generation.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from src.utils.diff_index import DiffIndex
+
+    rng = random.Random(args.seed)
+    results = {}
+    identical = True
+    for size in args.sizes:
+        patch = generate_hunk(rng, size, run_length=args.run_length)
+        legacy_s, expected = time_best(lambda: legacy_changed_parts(patch, "bench.md"), args.repeat)
+        parse_s, index = time_best(lambda: DiffIndex(patch, "bench.md"), args.repeat)
+
+        def extract():
+            index._changed_parts = None
+            return index.changed_parts
+
+        extract_s, actual = time_best(extract, args.repeat)
+        same = actual == expected
+        identical = identical and same
+        print(f"{size:>7} lines: legacy {legacy_s * 1000:9.1f} ms  index parse {parse_s * 1000:8.1f} ms  "
+              f"changed parts {extract_s * 1000:8.1f} ms  speedup {legacy_s / (parse_s + extract_s):5.1f}x  "
+              f"{'identical' if same else 'DIFFERENT'} ({len(actual)} parts)")
+        results[f"hunk-{size}.legacy_ms"] = legacy_s * 1000
+        results[f"hunk-{size}.parse_ms"] = parse_s * 1000
+        results[f"hunk-{size}.changed_parts_ms"] = extract_s * 1000
+
+    results["identical"] = identical
+    print_results({"identical": identical})
+    path = save_results("changed-parts", results, args.output)
+    print(f"Results written to {path}")
+
+    if not identical:
+        return 1
+    if args.compare:
+        metrics = {key: False for key in results if key.endswith(".changed_parts_ms")}
+        passed = compare_results(args.compare, results, metrics, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Webhook latency with synchronous logging handlers versus the queue-based setup of src.utils.logger.
+
+Each request posts a large pull_request event without the review label, so the measured
+time is Flask, JSON parsing and logging the payload at DEBUG.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --requests 500 --payload-kb 1024 --concurrency 8 --format json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import compare_results, print_results, save_results, summarize_latencies
+from src.utils.logger import TEXT_FORMAT, configure_logging, stop_logging
+
+
+def build_payload(payload_kb):
+    """
+    Build a 'labeled' pull_request event of about payload_kb KiB whose label is not the review label.
+    """
+    files = [{'filename': f'docs/page-{index}.md', 'additions': index, 'deletions': 0}
+             for index in range(payload_kb * 7)]
+    return {
+        'action': 'labeled',
+        'number': 1,
+        'repository': {'full_name': 'bench/repo'},
+        'pull_request': {
+            'number': 1,
+            'labels': [{'name': 'not-the-review-label'}],
+            'body': 'Lorem ipsum dolor sit amet. ' * (payload_kb * 18),
+            'files': files,
+        },
+    }
+
+
+def configure_sync(log_file):
+    """
+    The previous setup: DEBUG records formatted and written by the request thread.
+    """
+    root = logging.getLogger()
+    for handler in (logging.FileHandler(log_file), logging.StreamHandler()):
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+
+
+def reset_logging():
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run_mode(mode, body, requests, concurrency, log_format, workdir):
+    """
+    Send the webhook requests with one logging setup.
+
+    Returns:
+        dict: Latency summary, throughput and bytes written to the log file.
+    """
+    from src.github.webhook_handler import app
+
+    log_file = os.path.join(workdir, f"{mode}.log")
+    if mode == "sync":
+        configure_sync(log_file)
+    else:
+        configure_logging({'format': log_format, 'file': log_file}, 'DEBUG')
+
+    headers = {'X-GitHub-Event': 'pull_request', 'Content-Type': 'application/json'}
+
+    def send(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/webhook', data=body, headers=headers)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"Webhook answered {response.status_code}: {response.get_data(as_text=True)}")
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(send, range(requests)))
+    wall = time.perf_counter() - start
+    reset_logging()
+
+    results = summarize_latencies(latencies)
+    results["requests_per_second"] = requests / wall
+    results["log_bytes"] = os.path.getsize(log_file)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare webhook latency with synchronous and queued logging.")
+    parser.add_argument("--requests", type=int, default=200, help="Webhook requests per mode.")
+    parser.add_argument("--payload-kb", type=int, default=512, help="Approximate size of the webhook payload in KiB.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent request threads.")
+    parser.add_argument("--format", default="text", choices=("text", "json"), help="Record format of the queued setup.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    body = json.dumps(build_payload(args.payload_kb))
+    workdir = tempfile.mkdtemp(prefix="bench-logging-")
+    results = {"payload_bytes": len(body)}
+    try:
+        # Console output goes to /dev/null so the terminal does not dominate the measurement
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+            reset_logging()
+            for mode in ("sync", "queue"):
+                for key, value in run_mode(mode, body, args.requests, args.concurrency, args.format, workdir).items():
+                    results[f"{mode}_{key}"] = value
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+    path = save_results("logging", results, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        passed = compare_results(args.compare, results, {
+            "queue_p50_ms": False,
+            "queue_p99_ms": False,
+        }, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for MarkdownHandler.review over small to huge Markdown documents.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_markdown_handler
+    python -m benchmarks.bench_markdown_handler --sizes 100 1000 --corpus-dir docs --profile
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tracemalloc
+
+from benchmarks.common import compare_results, print_results, save_results
+from benchmarks.synthetic import generate_markdown
+
+DEFAULT_SIZES = (50, 500, 2000, 10000)
+
+
+def build_corpus(sizes, typo_rate, seed, corpus_dir=None):
+    """
+    Build the documents to benchmark.
+
+    Args:
+        sizes (list): Line counts of the generated documents.
+        typo_rate (float): Probability that a generated word is misspelled.
+        seed (int): Seed for document generation.
+        corpus_dir (str): Optional directory of real Markdown files to include.
+
+    Returns:
+        list: (name, content) tuples.
+    """
+    rng = random.Random(seed)
+    corpus = [(f"synthetic-{size}", "\n".join(generate_markdown(rng, size, typo_rate=typo_rate)) + "\n")
+              for size in sizes]
+    if corpus_dir:
+        for root, _, files in os.walk(corpus_dir):
+            for file_name in sorted(files):
+                if file_name.endswith(".md"):
+                    path = os.path.join(root, file_name)
+                    with open(path, "r", encoding="utf-8") as file:
+                        corpus.append((os.path.relpath(path, corpus_dir), file.read()))
+    return corpus
+
+
+def measure(handler, content, repeat):
+    """
+    Time handler.review and record its allocations.
+
+    Returns:
+        dict: Best-of-repeat seconds, lines/sec, peak traced bytes and allocated blocks.
+    """
+    lines = content.count("\n") + 1
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        comments = handler.review(content)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    tracemalloc.start()
+    handler.review(content)
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    return {
+        "lines": lines,
+        "comments": len(comments),
+        "best_s": best,
+        "lines_per_s": lines / best if best else 0.0,
+        "peak_alloc_kb": peak / 1024,
+        "live_blocks": blocks,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MarkdownHandler.review across document sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Document sizes in lines.")
+    parser.add_argument("--typo-rate", type=float, default=0.02, help="Probability that a word is misspelled.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per document (best is reported).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for document generation.")
+    parser.add_argument("--corpus-dir", help="Directory of additional Markdown files to benchmark.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Dump cProfile and tracemalloc stats for each document to ./profiles.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    from src.language_handlers.markdown_handler import MarkdownHandler
+    from src.utils.profiling import configure_profiling, profile
+
+    start = time.perf_counter()
+    handler = MarkdownHandler()
+    construct_s = time.perf_counter() - start
+    configure_profiling({'enabled': args.profile, 'tracemalloc': True})
+
+    results = {"handler_init_s": construct_s}
+    for name, content in build_corpus(args.sizes, args.typo_rate, args.seed, args.corpus_dir):
+        measurement = measure(handler, content, args.repeat)
+        with profile(f"markdown_review-{name}"):
+            handler.review(content)
+        print(f"{name:>32}: {measurement['lines']:>7} lines  {measurement['lines_per_s']:>10.0f} lines/s  "
+              f"{measurement['peak_alloc_kb']:>9.0f} KiB peak  {measurement['comments']:>6} comments")
+        for key, value in measurement.items():
+            results[f"{name}.{key}"] = value
+
+    print_results({"handler_init_s": construct_s})
+    path = save_results("markdown-handler", results, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        metrics = {"handler_init_s": False}
+        for key in results:
+            if key.endswith(".lines_per_s"):
+                metrics[key] = True
+            elif key.endswith(".peak_alloc_kb"):
+                metrics[key] = False
+        passed = compare_results(args.compare, results, metrics, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
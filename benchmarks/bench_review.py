@@ -0,0 +1,255 @@
+"""
+End-to-end review throughput benchmark against local GitHub, WatsonX and IAM stand-ins.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_review --reviews 20 --concurrency 4 --files 10 --file-lines 500
+    python -m benchmarks.bench_review --executor process --workers 4 --file-lines 5000 --changed-lines 1000
+    python -m benchmarks.bench_review --mode webhook --compare benchmarks/results/<baseline>.json
+    python -m benchmarks.bench_review --mode async --concurrency 100 --reviews 200
+"""
+import os
+import sys
+import json
+import asyncio
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.common import compare_results, peak_rss_mb, print_results, save_results, summarize_latencies
+from benchmarks.fake_services import FakeServices, FakeServicesState
+from benchmarks.synthetic import generate_pull_request
+
+REPO_NAME = "bench/docs"
+
+
+def generate_private_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode("utf-8")
+
+
+def configure_environment(services):
+    """
+    Point the GitHub, WatsonX and IAM clients at the fake services.
+    """
+    os.environ.update({
+        "GITHUB_APP_ID": "1",
+        "GITHUB_INSTALLATION_ID": "1",
+        "GITHUB_PRIVATE_KEY": generate_private_key(),
+        "GITHUB_API_URL": services.url,
+        "WATSONX_URL": services.watsonx_url,
+        "WATSONX_APIKEY": "fake-api-key",
+        "WATSONX_PROJECT_ID": "fake-project",
+        "IBM_IAM_URL": services.iam_url,
+    })
+
+
+def build_agent(executor="inline", workers=None, use_async=False):
+    os.environ["REVIEW_EXECUTOR"] = executor
+    if workers:
+        os.environ["REVIEW_WORKERS"] = str(workers)
+    from src.github.github_api import GitHubAPI
+    from src.agents.pr_review_agent import PRReviewAgent
+    async_github_api = None
+    if use_async:
+        from src.github.async_github_api import AsyncGitHubAPI
+        async_github_api = AsyncGitHubAPI()
+    return PRReviewAgent(github_api=GitHubAPI(), async_github_api=async_github_api)
+
+
+def run_agent_mode(agent, pr_numbers, concurrency):
+    def review(pr_number):
+        start = time.perf_counter()
+        result = agent.perform_code_review(REPO_NAME, pr_number)
+        return time.perf_counter() - start, result['status'] == 'success'
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(review, pr_numbers))
+
+
+def run_async_mode(agent, pr_numbers, concurrency):
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        # LLM requests still block, so give the default thread pool room for every review in flight
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+        async def review(pr_number):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await agent.perform_code_review_async(REPO_NAME, pr_number)
+                return time.perf_counter() - start, result['status'] == 'success'
+
+        try:
+            return await asyncio.gather(*(review(pr_number) for pr_number in pr_numbers))
+        finally:
+            await agent.async_github_api.close()
+
+    return asyncio.run(run())
+
+
+def run_webhook_mode(agent, pr_numbers, concurrency):
+    from werkzeug.serving import make_server
+    from src.github.webhook_handler import app, set_review_agent
+
+    set_review_agent(agent)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/webhook"
+    session = requests.Session()
+
+    def deliver(pr_number):
+        payload = {
+            "action": "synchronize",
+            "number": pr_number,
+            "repository": {"full_name": REPO_NAME},
+            "pull_request": {"labels": [{"name": "ready-to-review"}]},
+        }
+        start = time.perf_counter()
+        response = session.post(url, data=json.dumps(payload), headers={
+            "X-GitHub-Event": "pull_request",
+            "X-GitHub-Delivery": f"bench-{pr_number}-{time.monotonic_ns()}",
+            "Content-Type": "application/json",
+        })
+        return time.perf_counter() - start, response.status_code < 300
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(deliver, pr_numbers))
+    finally:
+        server.shutdown()
+
+
+def run_benchmark(args):
+    state = FakeServicesState(
+        github_latency=args.github_latency_ms / 1000,
+        watsonx_latency=args.watsonx_latency_ms / 1000,
+        iam_latency=args.iam_latency_ms / 1000,
+        github_rate_limit=args.github_rate_limit,
+        llm_comments_per_request=args.llm_comments,
+        max_listed_patch_bytes=args.max_listed_patch_bytes,
+    )
+    pr_numbers = list(range(1, args.prs + 1))
+    for pr_number in pr_numbers:
+        state.add_pull_request(REPO_NAME, generate_pull_request(
+            pr_number,
+            file_count=args.files,
+            lines_per_file=args.file_lines,
+            changed_lines_per_file=args.changed_lines,
+            comment_count=args.comments,
+            typo_rate=args.typo_rate,
+            seed=args.seed + pr_number,
+        ))
+
+    with FakeServices(state) as services:
+        configure_environment(services)
+        agent = build_agent(args.executor, args.workers, use_async=args.mode == "async")
+
+        workload = [pr_numbers[index % len(pr_numbers)] for index in range(args.reviews)]
+        if args.warmup:
+            run_agent_mode(agent, workload[:1], 1)
+
+        state.reset_calls()
+        start = time.perf_counter()
+        if args.mode == "webhook":
+            outcomes = run_webhook_mode(agent, workload, args.concurrency)
+        elif args.mode == "async":
+            outcomes = run_async_mode(agent, workload, args.concurrency)
+        else:
+            outcomes = run_agent_mode(agent, workload, args.concurrency)
+        elapsed = time.perf_counter() - start
+        calls = state.snapshot_calls()
+        posted_reviews = len(state.reviews)
+        agent.handler_executor.shutdown()
+
+    latencies = [latency for latency, _ in outcomes]
+    github_calls = sum(count for name, count in calls.items() if name.startswith("github:"))
+    watsonx_calls = sum(count for name, count in calls.items() if name.startswith("watsonx:"))
+    summary = summarize_latencies(latencies)
+    results = {
+        "mode": args.mode,
+        "executor": args.executor,
+        "reviews": args.reviews,
+        "concurrency": args.concurrency,
+        "files_per_pr": args.files,
+        "lines_per_file": args.file_lines,
+        "failures": sum(1 for _, ok in outcomes if not ok),
+        "elapsed_s": elapsed,
+        "reviews_per_s": args.reviews / elapsed if elapsed else 0.0,
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "mean_ms": summary["mean_ms"],
+        "github_calls_per_review": github_calls / args.reviews,
+        "watsonx_calls_per_review": watsonx_calls / args.reviews,
+        "posted_reviews": posted_reviews,
+        "peak_rss_mb": peak_rss_mb(),
+        "calls": calls,
+    }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PRReviewAgent against local GitHub and WatsonX stand-ins.")
+    parser.add_argument("--mode", choices=("agent", "webhook", "async"), default="agent",
+                        help="Drive perform_code_review directly, through the /webhook endpoint, "
+                             "or perform_code_review_async on one event loop.")
+    parser.add_argument("--executor", choices=("inline", "process"), default="inline",
+                        help="Spell check on the review thread or in worker processes.")
+    parser.add_argument("--workers", type=int, help="Worker processes for --executor process (default: CPU count).")
+    parser.add_argument("--reviews", type=int, default=20, help="Total number of reviews to run.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Reviews in flight at once.")
+    parser.add_argument("--prs", type=int, default=5, help="Number of distinct synthetic pull requests.")
+    parser.add_argument("--files", type=int, default=5, help="Changed files per pull request.")
+    parser.add_argument("--file-lines", type=int, default=200, help="Lines per file.")
+    parser.add_argument("--changed-lines", type=int, default=10, help="Changed lines per file.")
+    parser.add_argument("--comments", type=int, default=20, help="Existing review comments per pull request.")
+    parser.add_argument("--typo-rate", type=float, default=0.02, help="Probability that a word is misspelled.")
+    parser.add_argument("--llm-comments", type=int, default=1, help="Comments returned by the fake LLM per request.")
+    parser.add_argument("--github-latency-ms", type=float, default=20.0, help="Latency added to GitHub responses.")
+    parser.add_argument("--watsonx-latency-ms", type=float, default=200.0, help="Latency added to WatsonX responses.")
+    parser.add_argument("--iam-latency-ms", type=float, default=20.0, help="Latency added to IAM token responses.")
+    parser.add_argument("--github-rate-limit", type=float, default=0.0,
+                        help="GitHub requests per second before responses are delayed (0 = unlimited).")
+    parser.add_argument("--max-listed-patch-bytes", type=int,
+                        help="Omit larger patches from file listings so they are read from the raw diff.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic pull request generation.")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Skip the warm-up review.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    results = run_benchmark(args)
+    print_results({key: value for key, value in results.items() if key != "calls"})
+    path = save_results(f"review-{args.mode}", results, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        passed = compare_results(args.compare, results, {
+            "reviews_per_s": True,
+            "p50_ms": False,
+            "p99_ms": False,
+            "github_calls_per_review": False,
+            "peak_rss_mb": False,
+        }, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
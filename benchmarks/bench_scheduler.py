@@ -0,0 +1,177 @@
+"""
+Compare review scheduling policies on a mix of one giant pull request and a stream of small ones.
+
+Every policy reviews the same workload against the local GitHub, WatsonX and IAM stand-ins through a
+ReviewScheduler: the giant pull request is submitted first, then the small ones arrive at --rate per second.
+
+    python -m benchmarks.bench_scheduler --giant-files 600 --small-prs 40 --workers 2
+    python -m benchmarks.bench_scheduler --giant-files 60 --split-files 20 --batch-files 20 --small-prs 10
+    python -m benchmarks.bench_scheduler --policies fifo,scheduled --compare benchmarks/results/<baseline>.json
+
+Policies:
+    fifo       reviews in arrival order, giant pull requests in one job (the behaviour without a scheduler)
+    scheduled  cheapest first with aging, giant pull requests split into file batches (review.scheduler defaults)
+"""
+import sys
+import time
+import logging
+import argparse
+import threading
+
+from benchmarks.bench_review import REPO_NAME, build_agent, configure_environment
+from benchmarks.common import compare_results, print_results, save_results, summarize_latencies
+from benchmarks.fake_services import FakeServices, FakeServicesState
+from benchmarks.synthetic import generate_pull_request
+
+GIANT_NUMBER = 1
+
+
+def make_payload(pull_request):
+    return {
+        "action": "synchronize",
+        "number": pull_request.number,
+        "repository": {"full_name": REPO_NAME},
+        "pull_request": {
+            "head": {"sha": pull_request.head_sha},
+            "additions": pull_request.additions,
+            "deletions": pull_request.deletions,
+            "changed_files": len(pull_request.files),
+            "labels": [{"name": label} for label in pull_request.labels],
+        },
+    }
+
+
+def create_scheduler(policy, agent, args):
+    from src.agents.review_scheduler import ReviewScheduler
+    if policy == "fifo":
+        # Waiting time dominates any cost difference, so jobs run in submission order
+        return ReviewScheduler(agent, workers=args.workers, aging_per_second=1e12, split_files=None)
+    return ReviewScheduler(agent, workers=args.workers, split_files=args.split_files, batch_files=args.batch_files)
+
+
+def run_policy(policy, agent, pull_requests, args):
+    """
+    Submit the giant pull request, then the small ones at --rate per second, and wait for every review.
+
+    Returns:
+        dict: Completion latencies in seconds of the small reviews and of the giant review, and failures.
+    """
+    scheduler = create_scheduler(policy, agent, args)
+    latencies = {}
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def finished(pr_number, submitted_at):
+        def callback(future):
+            with lock:
+                latencies[pr_number] = (time.perf_counter() - submitted_at, future.result()['status'] == 'success')
+                if len(latencies) == len(pull_requests):
+                    done.set()
+        return callback
+
+    start = time.perf_counter()
+    try:
+        for index, pull_request in enumerate(pull_requests):
+            delay = start + max(0, index - 1) / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            job = scheduler.submit(make_payload(pull_request))
+            job.future.add_done_callback(finished(pull_request.number, time.perf_counter()))
+        done.wait()
+    finally:
+        scheduler.shutdown()
+    elapsed = time.perf_counter() - start
+
+    giant_latency, _ = latencies.pop(GIANT_NUMBER)
+    return {
+        "elapsed_s": elapsed,
+        "giant_ms": giant_latency * 1000,
+        "small": [latency for latency, _ in latencies.values()],
+        "failures": sum(1 for _, ok in latencies.values() if not ok),
+    }
+
+
+def run_benchmark(args):
+    state = FakeServicesState(github_latency=args.github_latency_ms / 1000,
+                              watsonx_latency=args.watsonx_latency_ms / 1000,
+                              llm_comments_per_request=args.llm_comments)
+    pull_requests = [generate_pull_request(GIANT_NUMBER, file_count=args.giant_files, lines_per_file=args.file_lines,
+                                           changed_lines_per_file=args.changed_lines, seed=args.seed)]
+    for number in range(GIANT_NUMBER + 1, GIANT_NUMBER + 1 + args.small_prs):
+        pull_requests.append(generate_pull_request(number, file_count=args.small_files, lines_per_file=args.file_lines,
+                                                   changed_lines_per_file=args.changed_lines, seed=args.seed + number))
+    for pull_request in pull_requests:
+        state.add_pull_request(REPO_NAME, pull_request)
+
+    results = {
+        "workers": args.workers,
+        "giant_files": args.giant_files,
+        "small_prs": args.small_prs,
+        "small_files": args.small_files,
+        "rate": args.rate,
+        "split_files": args.split_files,
+        "batch_files": args.batch_files,
+    }
+    with FakeServices(state) as services:
+        configure_environment(services)
+        agent = build_agent(args.executor)
+        try:
+            for policy in args.policies.split(","):
+                outcome = run_policy(policy, agent, pull_requests, args)
+                small = summarize_latencies(outcome["small"])
+                results.update({
+                    f"{policy}_elapsed_s": outcome["elapsed_s"],
+                    f"{policy}_giant_ms": outcome["giant_ms"],
+                    f"{policy}_small_p50_ms": small["p50_ms"],
+                    f"{policy}_small_p99_ms": small["p99_ms"],
+                    f"{policy}_failures": outcome["failures"],
+                })
+        finally:
+            agent.handler_executor.shutdown()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare review scheduling policies on a mixed workload.")
+    parser.add_argument("--policies", default="fifo,scheduled", help="Comma-separated policies to run.")
+    parser.add_argument("--workers", type=int, default=1, help="Reviews run concurrently.")
+    parser.add_argument("--giant-files", type=int, default=300, help="Changed files of the giant pull request.")
+    parser.add_argument("--small-prs", type=int, default=20, help="Number of small pull requests.")
+    parser.add_argument("--small-files", type=int, default=3, help="Changed files per small pull request.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Small pull requests submitted per second.")
+    parser.add_argument("--split-files", type=int, default=200,
+                        help="The scheduled policy splits pull requests with more changed files.")
+    parser.add_argument("--batch-files", type=int, default=100, help="Files per batch of a split pull request.")
+    parser.add_argument("--executor", default="inline", choices=("inline", "process"))
+    parser.add_argument("--file-lines", type=int, default=100, help="Lines per synthetic file.")
+    parser.add_argument("--changed-lines", type=int, default=10, help="Changed lines per synthetic file.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--github-latency-ms", type=float, default=5.0)
+    parser.add_argument("--watsonx-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-comments", type=int, default=1)
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    results = run_benchmark(args)
+    print_results(results)
+    path = save_results("scheduler", results, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        passed = compare_results(args.compare, results, {
+            "scheduled_small_p99_ms": False,
+            "scheduled_giant_ms": False,
+        }, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
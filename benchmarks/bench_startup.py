@@ -0,0 +1,144 @@
+"""
+Start-up benchmark: import time per module and time until a new replica answers its first request.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --module src.github.webhook_handler --top 30 --runs 5
+"""
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+import requests
+
+from benchmarks.bench_review import configure_environment
+from benchmarks.common import compare_results, print_results, save_results
+from benchmarks.fake_services import FakeServices, FakeServicesState
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): The module to import, e.g. 'src.github.webhook_handler'.
+
+    Returns:
+        tuple: (wall seconds, list of (module name, self microseconds, cumulative microseconds)).
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return wall, imports
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(timeout):
+    """
+    Start app.py against the fake services and time until GET /metrics succeeds.
+
+    The application runs in a scratch directory (with config/ linked in) so its log file
+    does not end up in the repository.
+
+    Returns:
+        float: Seconds from process start to the first successful response.
+    """
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    os.symlink(os.path.join(REPO_ROOT, "config"), os.path.join(workdir, "config"))
+    env = dict(os.environ, PORT=str(port), PYTHONPATH=REPO_ROOT)
+    url = f"http://127.0.0.1:{port}/metrics"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "app.py")], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"app.py exited with status {process.returncode}")
+            try:
+                if requests.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"app.py did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-request.")
+    parser.add_argument("--module", default="src.github.webhook_handler", help="Module whose imports are measured.")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest imports to print.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of application starts (median is reported).")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first response.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    import_wall, imports = measure_imports(args.module)
+    total_us = max((cumulative for _, _, cumulative in imports), default=0)
+    print(f"Slowest imports of {args.module} (cumulative):")
+    for name, self_us, cumulative_us in sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:10.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+    first_requests = []
+    with FakeServices(FakeServicesState(github_latency=0.0, watsonx_latency=0.0, iam_latency=0.0)) as services:
+        configure_environment(services)
+        for _ in range(args.runs):
+            first_requests.append(measure_first_request(args.timeout))
+
+    results = {
+        "module": args.module,
+        "import_ms": total_us / 1000,
+        "import_wall_ms": import_wall * 1000,
+        "modules_imported": len(imports),
+        "time_to_first_request_ms": statistics.median(first_requests) * 1000,
+        "time_to_first_request_max_ms": max(first_requests) * 1000,
+        "slowest_imports": {name: cumulative / 1000 for name, _, cumulative in
+                            sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]},
+    }
+    print_results({key: value for key, value in results.items() if key != "slowest_imports"})
+    path = save_results("startup", results, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        passed = compare_results(args.compare, results, {
+            "import_ms": False,
+            "time_to_first_request_ms": False,
+        }, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import math
+import time
+import resource
+import platform
+import statistics
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values, fraction):
+    """
+    Return the value at the given fraction (0..1) of the sorted values using nearest-rank.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_latencies(latencies):
+    """
+    Summarize a list of latencies in seconds.
+
+    Returns:
+        dict: Count, mean, p50, p90, p99 and max latency in milliseconds.
+    """
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of this process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def save_results(name, results, output=None):
+    """
+    Save benchmark results as JSON, adding environment metadata.
+
+    Args:
+        name (str): The benchmark name, used in the default file name.
+        results (dict): The benchmark results.
+        output (str): Optional explicit output path.
+
+    Returns:
+        str: The path the results were written to.
+    """
+    document = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as file:
+        json.dump(document, file, indent=2)
+    return output
+
+
+def compare_results(baseline_path, results, metrics, max_regression=0.10):
+    """
+    Compare results against a saved baseline.
+
+    Args:
+        baseline_path (str): Path to a file written by save_results.
+        results (dict): The current results.
+        metrics (dict): Mapping of metric name to True when higher is better, False when lower is better.
+        max_regression (float): Allowed relative regression before the comparison fails.
+
+    Returns:
+        bool: True when no metric regressed by more than max_regression.
+    """
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)["results"]
+
+    passed = True
+    for metric, higher_is_better in metrics.items():
+        old, new = baseline.get(metric), results.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regression = -change if higher_is_better else change
+        status = "REGRESSION" if regression > max_regression else "ok"
+        if regression > max_regression:
+            passed = False
+        print(f"{metric:>28}: {old:12.3f} -> {new:12.3f} ({change:+.1%}) {status}")
+    return passed
+
+
+def print_results(results):
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:>28}: {value:.3f}")
+        else:
+            print(f"{key:>28}: {value}")
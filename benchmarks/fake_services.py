@@ -0,0 +1,363 @@
+import re
+import json
+import time
+import base64
+import logging
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Simple token bucket used to emulate API rate limits by delaying requests.
+    """
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): Requests allowed per second. 0 disables the limit.
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request may proceed.
+
+        Returns:
+            float: Seconds the caller was delayed.
+        """
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class FakeServicesState:
+    """
+    In-memory state shared by the fake GitHub, WatsonX and IAM endpoints.
+    """
+
+    def __init__(self, github_latency=0.0, watsonx_latency=0.0, iam_latency=0.0, github_rate_limit=0.0,
+                 llm_comments_per_request=0, max_listed_patch_bytes=None):
+        """
+        Args:
+            github_latency (float): Seconds added to every GitHub response.
+            watsonx_latency (float): Seconds added to every WatsonX response.
+            iam_latency (float): Seconds added to every IAM token response.
+            github_rate_limit (float): GitHub requests per second before requests are delayed (0 = unlimited).
+            llm_comments_per_request (int): Number of comments the fake LLM returns for each request.
+            max_listed_patch_bytes (int): Omit the patch of larger files from file listings, like GitHub does
+                                          for large diffs; the raw diff still contains them.
+        """
+        self.github_latency = github_latency
+        self.watsonx_latency = watsonx_latency
+        self.iam_latency = iam_latency
+        self.github_bucket = TokenBucket(github_rate_limit)
+        self.llm_comments_per_request = llm_comments_per_request
+        self.max_listed_patch_bytes = max_listed_patch_bytes
+        self.repositories = {}
+        self.reviews = []
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def add_pull_request(self, repo_name, pull_request):
+        """
+        Register a synthetic pull request so the fake GitHub API can serve it.
+
+        Args:
+            repo_name (str): The repository in 'owner/repo' format.
+            pull_request (SyntheticPullRequest): The pull request to serve.
+        """
+        with self.lock:
+            self.repositories.setdefault(repo_name, {})[pull_request.number] = pull_request
+
+    def record_call(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls.clear()
+            self.reviews.clear()
+
+    def snapshot_calls(self):
+        with self.lock:
+            return dict(self.calls)
+
+
+class _FakeServicesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # (method, pattern, handler name, service)
+    routes = [
+        ("POST", r"^/app/installations/[^/]+/access_tokens$", "_installation_token", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)$", "_get_repo", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)/pulls/(?P<number>\d+)$", "_get_pull", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)/pulls/(?P<number>\d+)/files$", "_get_files", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)/pulls/(?P<number>\d+)/comments$", "_get_review_comments", "github"),
+        ("POST", r"^/repos/(?P<repo>[^/]+/[^/]+)/pulls/(?P<number>\d+)/reviews$", "_create_review", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)/commits/(?P<sha>[^/]+)$", "_get_commit", "github"),
+        ("GET", r"^/repos/(?P<repo>[^/]+/[^/]+)/contents/(?P<file_path>.+)$", "_get_contents", "github"),
+        ("POST", r"^/ml/v1/text/generation$", "_text_generation", "watsonx"),
+        ("POST", r"^/identity/token$", "_iam_token", "iam"),
+    ]
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    @property
+    def state(self) -> FakeServicesState:
+        return self.server.state
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+
+        for route_method, pattern, handler_name, service in self.routes:
+            match = re.match(pattern, parsed.path)
+            if route_method == method and match:
+                self.state.record_call(f"{service}:{handler_name.lstrip('_')}")
+                if service == "github":
+                    self.state.github_bucket.acquire()
+                    time.sleep(self.state.github_latency)
+                elif service == "watsonx":
+                    time.sleep(self.state.watsonx_latency)
+                else:
+                    time.sleep(self.state.iam_latency)
+                getattr(self, handler_name)(parsed.path, **match.groupdict())
+                return
+        self._send_json(404, {"message": "Not Found"})
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_page(self, path, items):
+        per_page = int(self.query.get("per_page", 30))
+        page = int(self.query.get("page", 1))
+        last_page = max(1, -(-len(items) // per_page))
+        page_items = items[(page - 1) * per_page:page * per_page]
+
+        links = []
+        if page < last_page:
+            links.append(f'<{self._page_url(path, page + 1, per_page)}>; rel="next"')
+        if last_page > 1:
+            links.append(f'<{self._page_url(path, last_page, per_page)}>; rel="last"')
+        headers = {"Link": ", ".join(links)} if links else {}
+        self._send_json(200, page_items, headers)
+
+    def _page_url(self, path, page, per_page):
+        return f"{self.base_url}{path}?{urlencode({'per_page': per_page, 'page': page})}"
+
+    def _pull_request(self, repo, number):
+        return self.state.repositories.get(repo, {}).get(int(number))
+
+    # GitHub endpoints
+
+    def _installation_token(self, path):
+        self._send_json(201, {"token": "fake-installation-token", "expires_at": "2099-01-01T00:00:00Z"})
+
+    def _get_repo(self, path, repo):
+        if repo not in self.state.repositories:
+            self._send_json(404, {"message": "Not Found"})
+            return
+        owner, name = repo.split("/")
+        self._send_json(200, {
+            "id": abs(hash(repo)) % 10 ** 8,
+            "name": name,
+            "full_name": repo,
+            "owner": {"login": owner},
+            "url": f"{self.base_url}/repos/{repo}",
+        })
+
+    def _get_pull(self, path, repo, number):
+        pull_request = self._pull_request(repo, number)
+        if pull_request is None:
+            self._send_json(404, {"message": "Not Found"})
+            return
+        if "diff" in (self.headers.get("Accept") or ""):
+            self._send_diff(pull_request)
+            return
+        self._send_json(200, {
+            "id": pull_request.number,
+            "number": pull_request.number,
+            "url": f"{self.base_url}/repos/{repo}/pulls/{number}",
+            "head": {"sha": pull_request.head_sha, "ref": "feature"},
+            "base": {"sha": "0" * 40, "ref": "main"},
+            "changed_files": len(pull_request.files),
+            "additions": pull_request.additions,
+            "deletions": pull_request.deletions,
+            "labels": [{"name": label} for label in pull_request.labels],
+        })
+
+    def _get_files(self, path, repo, number):
+        pull_request = self._pull_request(repo, number)
+        items = [{
+            "sha": synthetic_file.sha,
+            "filename": synthetic_file.filename,
+            "status": "modified",
+            "additions": synthetic_file.additions,
+            "deletions": synthetic_file.deletions,
+            "changes": synthetic_file.additions + synthetic_file.deletions,
+            "patch": self._listed_patch(synthetic_file.patch),
+        } for synthetic_file in (pull_request.files if pull_request else [])]
+        self._send_page(path, items)
+
+    def _listed_patch(self, patch):
+        limit = self.state.max_listed_patch_bytes
+        return None if limit is not None and len(patch) > limit else patch
+
+    def _send_diff(self, pull_request):
+        body = "".join(
+            f"diff --git a/{synthetic_file.filename} b/{synthetic_file.filename}\n"
+            f"--- a/{synthetic_file.filename}\n"
+            f"+++ b/{synthetic_file.filename}\n"
+            f"{synthetic_file.patch}"
+            for synthetic_file in pull_request.files
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _get_review_comments(self, path, repo, number):
+        pull_request = self._pull_request(repo, number)
+        self._send_page(path, list(pull_request.comments) if pull_request else [])
+
+    def _create_review(self, path, repo, number):
+        payload = json.loads(self.body or b"{}")
+        with self.state.lock:
+            self.state.reviews.append({"repo": repo, "number": int(number), "payload": payload})
+            review_id = len(self.state.reviews)
+        self._send_json(200, {"id": review_id, "state": "COMMENTED", "body": payload.get("body", "")})
+
+    def _get_commit(self, path, repo, sha):
+        self._send_json(200, {"sha": sha, "url": f"{self.base_url}/repos/{repo}/commits/{sha}"})
+
+    def _get_contents(self, path, repo, file_path):
+        file_path = unquote(file_path)
+        pull_request = None
+        ref = self.query.get("ref")
+        for candidate in self.state.repositories.get(repo, {}).values():
+            if candidate.head_sha == ref:
+                pull_request = candidate
+                break
+        synthetic_file = pull_request.file_by_name(file_path) if pull_request else None
+        if synthetic_file is None:
+            self._send_json(404, {"message": "Not Found"})
+            return
+        encoded = base64.b64encode(synthetic_file.content.encode("utf-8")).decode("ascii")
+        self._send_json(200, {
+            "type": "file",
+            "encoding": "base64",
+            "size": len(synthetic_file.content),
+            "name": file_path.rsplit("/", 1)[-1],
+            "path": file_path,
+            "sha": synthetic_file.sha,
+            "content": encoded,
+            "url": f"{self.base_url}/repos/{repo}/contents/{file_path}",
+        })
+
+    # WatsonX and IAM endpoints
+
+    def _text_generation(self, path):
+        payload = json.loads(self.body or b"{}")
+        input_text = payload.get("input", "")
+        output = [{"line": index + 1, "text": f"Consider rewording this sentence ({index + 1})."}
+                  for index in range(self.state.llm_comments_per_request)]
+        self._send_json(200, {
+            "model_id": payload.get("model_id"),
+            "results": [{
+                "generated_text": json.dumps(output),
+                "input_token_count": len(input_text.split()),
+                "generated_token_count": 16 * len(output),
+                "stop_reason": "eos_token",
+            }],
+            "output": output,
+        })
+
+    def _iam_token(self, path):
+        self._send_json(200, {"access_token": "fake-iam-token", "expires_in": 3600, "token_type": "Bearer"})
+
+
+class FakeServices:
+    """
+    Local HTTP server that stands in for the GitHub REST API, WatsonX text generation and IBM Cloud IAM.
+
+    Usage:
+        with FakeServices(state) as services:
+            os.environ['GITHUB_API_URL'] = services.url
+    """
+
+    def __init__(self, state=None, host="127.0.0.1", port=0):
+        self.state = state or FakeServicesState()
+        self.server = ThreadingHTTPServer((host, port), _FakeServicesHandler)
+        self.server.daemon_threads = True
+        self.server.state = self.state
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def watsonx_url(self):
+        return f"{self.url}/ml/v1/text/generation?version=2023-05-29"
+
+    @property
+    def iam_url(self):
+        return f"{self.url}/identity/token"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Fake services listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
@@ -0,0 +1,300 @@
+"""
+Replay recorded webhook deliveries against the webhook endpoint at a controlled rate.
+
+Record deliveries by starting the application with WEBHOOK_RECORD_PATH (or webhook_recording.path in
+config/config.yaml) set. Then replay them against a running application:
+
+    python -m benchmarks.replay_webhooks recording.jsonl.gz --url http://localhost:8888/webhook --rate 20
+
+Without --url the endpoint is served in-process against the local GitHub, WatsonX and IAM stand-ins,
+with a synthetic pull request for every repository and number in the recording:
+
+    python -m benchmarks.replay_webhooks recording.jsonl.gz --speed 10 --concurrency 16 --repeat 3
+
+--speed keeps the recorded gaps between deliveries, divided by the factor; --rate sends a fixed number
+of deliveries per second; with neither, deliveries are sent as fast as --concurrency allows.
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import compare_results, percentile, print_results, save_results, summarize_latencies
+from src.github.webhook_recorder import read_recording
+
+# Review outcomes that end a job; queued or running jobs are polled until they reach one
+FINAL_STATUSES = ("success", "failure", "skipped")
+
+
+def load_deliveries(path, repeat=1, limit=None):
+    """
+    Load a recording and compute each delivery's offset in seconds from the first one.
+
+    Returns:
+        list: Deliveries as dicts with 'offset', 'headers' and 'body', repeated back to back.
+    """
+    recorded = list(read_recording(path))[:limit]
+    if not recorded:
+        raise ValueError(f"No deliveries recorded in '{path}'")
+    start = recorded[0]['time']
+    span = recorded[-1]['time'] - start
+    deliveries = []
+    for iteration in range(repeat):
+        for entry in recorded:
+            deliveries.append({
+                'offset': iteration * span + entry['time'] - start,
+                'headers': entry['headers'],
+                'body': entry['body'],
+            })
+    return deliveries
+
+
+def schedule(deliveries, rate=None, speed=None):
+    """
+    Return the send time of every delivery relative to the start of the replay.
+    """
+    if speed:
+        return [delivery['offset'] / speed for delivery in deliveries]
+    if rate:
+        return [index / rate for index in range(len(deliveries))]
+    return [0.0] * len(deliveries)
+
+
+def wait_for_completion(session, status_url, poll_interval, timeout):
+    """
+    Poll the status of an accepted review job until it finishes.
+
+    Returns:
+        str: The final status, or 'timeout'.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        response = session.get(status_url, timeout=30)
+        if response.status_code == 200:
+            status = response.json().get('status')
+            if status in FINAL_STATUSES:
+                return status
+        time.sleep(poll_interval)
+    return 'timeout'
+
+
+def deliver(session, url, delivery, poll_interval, completion_timeout):
+    """
+    Send one delivery and, if the review is processed asynchronously (202), wait for it to complete.
+
+    Returns:
+        dict: The HTTP status, the acceptance and completion latencies in seconds and the review outcome.
+    """
+    start = time.perf_counter()
+    try:
+        response = session.post(url, data=delivery['body'], headers=delivery['headers'], timeout=completion_timeout)
+    except requests.RequestException as e:
+        return {'http_status': 'error', 'accept': time.perf_counter() - start, 'complete': None,
+                'outcome': type(e).__name__}
+    accepted = time.perf_counter() - start
+
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    outcome = body.get('status') if isinstance(body, dict) else 'ignored'
+    status_url = response.headers.get('Location') or (body.get('status_url') if isinstance(body, dict) else None)
+    if response.status_code == 202 and status_url:
+        outcome = wait_for_completion(session, requests.compat.urljoin(url, status_url), poll_interval,
+                                      completion_timeout)
+    completed = time.perf_counter() - start
+    return {
+        'http_status': response.status_code,
+        'accept': accepted,
+        # Deliveries the endpoint did not review have no completion time
+        'complete': completed if outcome in ('success', 'failure') else None,
+        'outcome': outcome,
+    }
+
+
+def replay(url, deliveries, send_times, concurrency, poll_interval=0.2, completion_timeout=600.0):
+    """
+    Send the deliveries at their scheduled times with at most `concurrency` requests in flight.
+
+    Returns:
+        tuple: (list of deliver() results, list of schedule lags in seconds, elapsed seconds).
+    """
+    slots = threading.Semaphore(concurrency)
+    local = threading.local()
+
+    def send(delivery):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        try:
+            return deliver(local.session, url, delivery, poll_interval, completion_timeout)
+        finally:
+            slots.release()
+
+    lags = []
+    futures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for delivery, send_time in zip(deliveries, send_times):
+            delay = start + send_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            # How late the delivery is sent, e.g. because every slot was busy
+            lags.append(max(0.0, time.perf_counter() - start - send_time))
+            futures.append(executor.submit(send, delivery))
+        results = [future.result() for future in futures]
+    return results, lags, time.perf_counter() - start
+
+
+def summarize(results, lags, elapsed):
+    accepted = [result['accept'] for result in results]
+    completed = [result['complete'] for result in results if result['complete'] is not None]
+    http_statuses = Counter(str(result['http_status']) for result in results)
+    errors = sum(count for status, count in http_statuses.items() if status == 'error' or status.startswith('5'))
+    summary = {
+        "deliveries": len(results),
+        "elapsed_s": elapsed,
+        "deliveries_per_s": len(results) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "schedule_lag_p99_ms": percentile(lags, 0.99) * 1000,
+    }
+    summary.update({f"accept_{key}": value for key, value in summarize_latencies(accepted).items()})
+    summary.update({f"complete_{key}": value for key, value in summarize_latencies(completed).items()})
+    summary["http_statuses"] = dict(http_statuses)
+    summary["outcomes"] = dict(Counter(str(result['outcome']) for result in results))
+    return summary
+
+
+def pull_requests_in(deliveries):
+    """
+    Return the (repository, number) of every pull request the deliveries refer to.
+    """
+    found = set()
+    for delivery in deliveries:
+        try:
+            payload = json.loads(delivery['body'])
+            found.add((payload['repository']['full_name'], int(payload['number'])))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return found
+
+
+def serve_locally(args, deliveries):
+    """
+    Serve the webhook endpoint in-process against the local stand-ins and replay the deliveries.
+    """
+    from werkzeug.serving import make_server
+    from benchmarks.bench_review import build_agent, configure_environment
+    from benchmarks.fake_services import FakeServices, FakeServicesState
+    from benchmarks.synthetic import generate_pull_request
+
+    state = FakeServicesState(github_latency=args.github_latency_ms / 1000,
+                              watsonx_latency=args.watsonx_latency_ms / 1000,
+                              llm_comments_per_request=args.llm_comments)
+    for repo_name, number in sorted(pull_requests_in(deliveries)):
+        state.add_pull_request(repo_name, generate_pull_request(
+            number, file_count=args.files, lines_per_file=args.file_lines,
+            changed_lines_per_file=args.changed_lines, typo_rate=args.typo_rate, seed=args.seed + number))
+
+    with FakeServices(state) as services:
+        configure_environment(services)
+        agent = build_agent(args.executor)
+        from src.github.webhook_handler import app, set_review_agent, set_review_label, set_review_scheduler
+        set_review_agent(agent)
+        set_review_label(args.review_label)
+        scheduler = None
+        if args.scheduler_workers:
+            from src.agents.review_scheduler import ReviewScheduler
+            scheduler = ReviewScheduler(agent, workers=args.scheduler_workers)
+            set_review_scheduler(scheduler, respond_immediately=args.respond_async)
+        # One access log line per delivery would drown the results
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/webhook"
+            return replay(url, deliveries, schedule(deliveries, args.rate, args.speed), args.concurrency,
+                          args.poll_interval, args.completion_timeout)
+        finally:
+            server.shutdown()
+            if scheduler is not None:
+                set_review_scheduler(None)
+                scheduler.shutdown()
+            agent.handler_executor.shutdown()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded webhook deliveries.")
+    parser.add_argument("recording", help="File written with WEBHOOK_RECORD_PATH.")
+    parser.add_argument("--url", help="Webhook endpoint of a running application (default: serve in-process).")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=float, help="Deliveries per second.")
+    pacing.add_argument("--speed", type=float, help="Replay the recorded timing this many times faster.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Deliveries in flight at most.")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the recording this many times.")
+    parser.add_argument("--limit", type=int, help="Only replay the first N recorded deliveries.")
+    parser.add_argument("--poll-interval", type=float, default=0.2,
+                        help="Seconds between status polls of reviews accepted with 202.")
+    parser.add_argument("--completion-timeout", type=float, default=600.0,
+                        help="Seconds to wait for a review to complete.")
+    local = parser.add_argument_group("in-process serving (without --url)")
+    local.add_argument("--review-label", default="ready-to-review", help="Label that triggers a review.")
+    local.add_argument("--executor", default="inline", choices=("inline", "process"))
+    local.add_argument("--scheduler-workers", type=int,
+                       help="Queue reviews on a review scheduler with this many workers.")
+    local.add_argument("--respond-async", action="store_true",
+                       help="With --scheduler-workers, answer 202 and poll the job status URL.")
+    local.add_argument("--files", type=int, default=5, help="Files per synthetic pull request.")
+    local.add_argument("--file-lines", type=int, default=200, help="Lines per synthetic file.")
+    local.add_argument("--changed-lines", type=int, default=20, help="Changed lines per synthetic file.")
+    local.add_argument("--typo-rate", type=float, default=0.02)
+    local.add_argument("--seed", type=int, default=1)
+    local.add_argument("--github-latency-ms", type=float, default=20.0)
+    local.add_argument("--watsonx-latency-ms", type=float, default=200.0)
+    local.add_argument("--llm-comments", type=int, default=1)
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/).")
+    parser.add_argument("--compare", help="Baseline results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression when comparing against a baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    deliveries = load_deliveries(args.recording, args.repeat, args.limit)
+
+    if args.url:
+        results, lags, elapsed = replay(args.url, deliveries, schedule(deliveries, args.rate, args.speed),
+                                        args.concurrency, args.poll_interval, args.completion_timeout)
+    else:
+        results, lags, elapsed = serve_locally(args, deliveries)
+
+    summary = summarize(results, lags, elapsed)
+    summary.update({"rate": args.rate, "speed": args.speed, "concurrency": args.concurrency})
+    print_results({key: value for key, value in summary.items() if not isinstance(value, dict)})
+    print(f"HTTP statuses: {summary['http_statuses']}")
+    print(f"Outcomes: {summary['outcomes']}")
+    path = save_results("replay", summary, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        passed = compare_results(args.compare, summary, {
+            "accept_p99_ms": False,
+            "complete_p99_ms": False,
+            "error_rate": False,
+        }, args.max_regression)
+        return 0 if passed else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import random
+import hashlib
+import difflib
+
+WORDS = (
+    "the review agent checks every pull request and posts comments about spelling grammar and structure "
+    "documentation should explain how to install configure and deploy the application on cloud services "
+    "each file in the repository is analysed with the same handlers so results stay consistent between runs "
+    "developers can update the configuration without restarting the server when prompts or models change "
+    "a webhook delivery triggers the review which fetches files from the pull request and reads their content"
+).split()
+
+TYPOS = ["teh", "reveiw", "confgure", "documantation", "aplication", "repositry", "reslts", "serer", "promtps",
+         "cnfiguration", "deliverry", "analyzd", "consistant", "betwen", "chnage"]
+
+
+class SyntheticFile:
+    """
+    A changed file in a synthetic pull request, with its head content and GitHub-style patch.
+    """
+
+    def __init__(self, filename, content, patch, additions, deletions):
+        self.filename = filename
+        self.content = content
+        self.patch = patch
+        self.additions = additions
+        self.deletions = deletions
+        self.sha = hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class SyntheticPullRequest:
+    """
+    A generated pull request served by the fake GitHub API.
+    """
+
+    def __init__(self, number, head_sha, files, comments, labels=("ready-to-review",)):
+        self.number = number
+        self.head_sha = head_sha
+        self.files = files
+        self.comments = comments
+        self.labels = list(labels)
+        self._files_by_name = {synthetic_file.filename: synthetic_file for synthetic_file in files}
+
+    @property
+    def additions(self):
+        return sum(synthetic_file.additions for synthetic_file in self.files)
+
+    @property
+    def deletions(self):
+        return sum(synthetic_file.deletions for synthetic_file in self.files)
+
+    def file_by_name(self, filename):
+        return self._files_by_name.get(filename)
+
+
+def generate_sentence(rng, words_per_line, typo_rate):
+    words = []
+    for _ in range(words_per_line):
+        if rng.random() < typo_rate:
+            words.append(rng.choice(TYPOS))
+        else:
+            words.append(rng.choice(WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def generate_markdown(rng, line_count, typo_rate=0.0, words_per_line=12):
+    """
+    Generate Markdown prose with headings every 20 lines.
+
+    Args:
+        rng (random.Random): The random generator to use.
+        line_count (int): The number of lines to generate.
+        typo_rate (float): Probability that any generated word is misspelled.
+        words_per_line (int): Words in each prose line.
+
+    Returns:
+        list: The generated lines without trailing newlines.
+    """
+    lines = []
+    for index in range(line_count):
+        if index % 20 == 0:
+            lines.append(f"## Section {index // 20 + 1}")
+        elif index % 20 == 1:
+            lines.append("")
+        else:
+            lines.append(generate_sentence(rng, words_per_line, typo_rate))
+    return lines
+
+
+def make_patch(before_lines, after_lines, context=3):
+    """
+    Build a GitHub-style patch (hunks only, without file headers) between two versions of a file.
+
+    Args:
+        before_lines (list): The base version of the file.
+        after_lines (list): The head version of the file.
+        context (int): Number of context lines around each change.
+
+    Returns:
+        str: The patch text.
+    """
+    diff = difflib.unified_diff(before_lines, after_lines, lineterm="", n=context)
+    hunk_lines = [line for index, line in enumerate(diff) if index >= 2]
+    return "\n".join(hunk_lines) + "\n" if hunk_lines else ""
+
+
+def generate_file(rng, filename, line_count, changed_lines, typo_rate):
+    """
+    Generate a Markdown file and a patch that rewrites `changed_lines` of it.
+
+    Returns:
+        SyntheticFile: The generated file.
+    """
+    after_lines = generate_markdown(rng, line_count, typo_rate=typo_rate)
+    before_lines = list(after_lines)
+    prose_indices = [index for index, line in enumerate(after_lines) if line and not line.startswith("#")]
+    changed = rng.sample(prose_indices, min(changed_lines, len(prose_indices)))
+    for index in changed:
+        before_lines[index] = generate_sentence(rng, 12, 0.0)
+    patch = make_patch(before_lines, after_lines)
+    additions = sum(1 for line in patch.splitlines() if line.startswith("+"))
+    deletions = sum(1 for line in patch.splitlines() if line.startswith("-"))
+    return SyntheticFile(filename, "\n".join(after_lines) + "\n", patch, additions, deletions)
+
+
+def generate_pull_request(number, file_count=5, lines_per_file=200, changed_lines_per_file=10, comment_count=0,
+                          typo_rate=0.02, seed=None):
+    """
+    Generate a synthetic pull request of Markdown files with an existing review comment history.
+
+    Args:
+        number (int): The pull request number.
+        file_count (int): Number of changed files.
+        lines_per_file (int): Number of lines in each file at the head commit.
+        changed_lines_per_file (int): Number of lines modified in each file.
+        comment_count (int): Number of existing review comments.
+        typo_rate (float): Probability that a generated word is misspelled.
+        seed (int): Seed for reproducible generation; defaults to the pull request number.
+
+    Returns:
+        SyntheticPullRequest: The generated pull request.
+    """
+    rng = random.Random(number if seed is None else seed)
+    files = [
+        generate_file(rng, f"docs/page_{index}.md", lines_per_file, changed_lines_per_file, typo_rate)
+        for index in range(file_count)
+    ]
+    head_sha = hashlib.sha1(f"head-{number}-{seed}".encode("utf-8")).hexdigest()
+
+    comments = []
+    for index in range(comment_count):
+        synthetic_file = files[index % len(files)] if files else None
+        comments.append({
+            "id": number * 100000 + index,
+            "path": synthetic_file.filename if synthetic_file else "README.md",
+            "commit_id": hashlib.sha1(f"old-{number}-{index}".encode("utf-8")).hexdigest(),
+            "diff_hunk": synthetic_file.patch.split("\n", 4)[0] if synthetic_file else "@@ -1 +1 @@",
+            "body": f"Possible spelling mistake: '{rng.choice(TYPOS)}'. Did you mean 'the'?",
+            "line": 1,
+            "side": "RIGHT",
+        })
+    return SyntheticPullRequest(number, head_sha, files, comments)
@@ -0,0 +1,102 @@
+"""
+Review local changes without GitHub and write the comments as JSON lines.
+
+Review a directory of git-style patch files, or commit ranges of a local repository:
+
+    python review_cli.py patches ./patches --output comments.jsonl
+    python review_cli.py git ../docs-repo v1.0..v1.1 main~50..main --per-commit --workers 8
+
+Each output line is one comment: {"change", "path", "line", "side", "body"}. A summary
+(changes, files, comments and throughput) is printed to standard error.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+from src.utils.config_loader import get_config_snapshot, set_config_dir
+from src.utils.logger import configure_logging
+from src.utils.local_diffs import iter_git_changes, iter_patch_dir
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Review local patches or git commit ranges offline.")
+    subparsers = parser.add_subparsers(dest="source", required=True)
+    patches = subparsers.add_parser("patches", help="Review every *.patch and *.diff file of a directory.")
+    patches.add_argument("patch_dir", help="Directory of git-style patch files.")
+    patches.add_argument("--source-dir", help="Checkout of the patched version to read full file contents from.")
+    git = subparsers.add_parser("git", help="Review commit ranges of a local git repository.")
+    git.add_argument("repo_dir", help="The git repository.")
+    git.add_argument("ranges", nargs="+", help="'base..head' ranges, or single commits.")
+    git.add_argument("--per-commit", action="store_true", help="Review every commit of a range separately.")
+
+    for subparser in (patches, git):
+        subparser.add_argument("--output", default="-", help="Where to write the comments (default: stdout).")
+        subparser.add_argument("--summary", help="Also write the summary as JSON to this file.")
+        subparser.add_argument("--workers", type=int, default=4, help="Changes reviewed concurrently.")
+        subparser.add_argument("--executor", choices=("inline", "process"),
+                               help="Spell check backend (default: review.executor of config.yaml).")
+        subparser.add_argument("--llm-url", help="Text generation endpoint to use instead of WatsonX, e.g. a local stub.")
+        subparser.add_argument("--iam-url", help="Token endpoint to use instead of IBM Cloud IAM.")
+        subparser.add_argument("--no-llm", action="store_true", help="Only run the language handlers.")
+        subparser.add_argument("--config-dir", default="./config", help="Configuration directory.")
+        subparser.add_argument("--log-level", default="WARNING", help="Log level of the messages on stderr.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_config_dir(args.config_dir)
+    config = get_config_snapshot().config
+    logging_config = dict(config.get('logging', {}), file=None)
+    configure_logging(logging_config, args.log_level)
+
+    # The agents read these settings when they are created
+    if args.llm_url:
+        os.environ['WATSONX_URL'] = args.llm_url
+    if args.iam_url:
+        os.environ['IBM_IAM_URL'] = args.iam_url
+    if args.executor:
+        os.environ['REVIEW_EXECUTOR'] = args.executor
+
+    from src.agents.offline_review_agent import OfflineReviewAgent
+    agent = OfflineReviewAgent(use_llm=not args.no_llm)
+
+    if args.source == "patches":
+        changes = iter_patch_dir(args.patch_dir, args.source_dir)
+    else:
+        changes = iter_git_changes(args.repo_dir, args.ranges, per_commit=args.per_commit)
+
+    totals = {"changes": 0, "failures": 0, "files": 0, "comments": 0}
+    start = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            output = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w"))
+            for result in agent.review_changes(changes, workers=args.workers):
+                totals["changes"] += 1
+                if result['status'] != 'success':
+                    totals["failures"] += 1
+                    print(f"{result['change']}: {result['message']}", file=sys.stderr)
+                    continue
+                totals["files"] += result['files']
+                totals["comments"] += len(result['comments'])
+                for comment in result['comments']:
+                    output.write(json.dumps(dict(change=result['change'], **comment)) + "\n")
+    finally:
+        agent.handler_executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = round(elapsed, 3)
+    totals["changes_per_second"] = round(totals["changes"] / elapsed, 3) if elapsed else 0.0
+    totals["files_per_second"] = round(totals["files"] / elapsed, 3) if elapsed else 0.0
+    print(", ".join(f"{key}: {value}" for key, value in totals.items()), file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w") as summary_file:
+            json.dump(totals, summary_file, indent=2)
+    return 1 if totals["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 import os
-import yaml
 import logging
-from src.utils.config_loader import ConfigLoader
+from src.utils.config_loader import get_config_snapshot, thaw
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +16,8 @@ class BaseAgent:
         self.github_api = github_api
         self.agent_name = agent_name
 
-        # Load WatsonX configuration from file
-        config_loader = ConfigLoader(config_dir="./config")
-        common_config = config_loader.get_config().get("models", {})  # Changed from 'watsonx_models' to 'models'
+        # Configuration is parsed once per process and shared by all agents
+        common_config = self.config.get("models", {})  # Changed from 'watsonx_models' to 'models'
 
         # Load WatsonX configuration
         watsonx_config = common_config.get("watsonx", {})
@@ -36,18 +34,23 @@ class BaseAgent:
 
         logger.info("WatsonX configuration loaded successfully.")
 
-        # Load agent-specific configuration
-        if agent_name:
-            agent_config_path = f"./config/agents/{agent_name}.yaml"
-            if os.path.exists(agent_config_path):
-                with open(agent_config_path, "r") as file:
-                    agent_config = yaml.safe_load(file)
-                    self.agent_config = agent_config
-            else:
-                logger.warning(f"Configuration file not found for agent: {agent_name}")
-                self.agent_config = {}
-        else:
-            self.agent_config = {}
+        # Check for agent-specific configuration
+        if agent_name and agent_name not in get_config_snapshot().agents:
+            logger.warning(f"Configuration file not found for agent: {agent_name}")
+
+    @property
+    def config(self):
+        """
+        The application configuration from the current snapshot, reflecting configuration reloads.
+        """
+        return get_config_snapshot().config
+
+    @property
+    def agent_config(self):
+        """
+        The agent-specific configuration from the current snapshot, reflecting configuration reloads.
+        """
+        return get_config_snapshot().agent_config(self.agent_name)
 
     def get_agent_prompt(self):
         """
@@ -74,7 +77,7 @@ class BaseAgent:
         Returns:
             dict: Model parameters such as temperature, decoding method, etc.
         """
-        return self.agent_config.get("parameters", {"decoding_method": "greedy",
-                                                    "max_new_tokens": 900,
-                                                    "stop_sequences": [],
-                                                    "repetition_penalty": 1})
+        return thaw(self.agent_config.get("parameters", {"decoding_method": "greedy",
+                                                         "max_new_tokens": 900,
+                                                         "stop_sequences": [],
+                                                         "repetition_penalty": 1}))
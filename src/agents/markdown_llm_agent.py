@@ -2,6 +2,7 @@ import logging
 import requests
 from src.agents.base_agent import BaseAgent
 from src.utils.ibm_cloud_auth import get_ibm_bearer_token
+from src.utils.metrics import WATSONX_LATENCY, record_watsonx_usage
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +35,11 @@ class MarkdownLLMAgent(BaseAgent):
         input_text = f"{prompt}\n\nFull file content:\n{full_text}\n\nChanged content:\n{changed_text}\n\nExisting comments:\n{existing_comments}"
 
         # Prepare the request payload
+        model_id = self.get_model_id()
         payload = {
             "input": input_text,
             "parameters": self.get_model_parameters(),
-            "model_id": self.get_model_id(),
+            "model_id": model_id,
             "project_id": self.watsonx_project_id
         }
 
@@ -50,13 +52,15 @@ class MarkdownLLMAgent(BaseAgent):
 
         try:
             # Make the request to WatsonX LLM API
-            response = requests.post(self.watsonx_url, headers=headers, json=payload)
+            with WATSONX_LATENCY.labels(model=model_id).time():
+                response = requests.post(self.watsonx_url, headers=headers, json=payload)
             if response.status_code != 200:
                 logger.error(f"WatsonX API returned non-200 response: {response.status_code}, {response.text}")
                 return []
 
             # Parse the response from WatsonX
             data = response.json()
+            record_watsonx_usage(model_id, data)
             comments = data.get("output", [])
 
             # Extract comments and structure them as needed
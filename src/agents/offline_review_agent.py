@@ -0,0 +1,112 @@
+import hashlib
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agents.pr_review_agent import PRReviewAgent
+from src.language_handlers.spell_dictionary import get_repository_words
+from src.utils.comment_index import CommentIndex
+from src.utils.local_diffs import content_from_patch
+from src.utils.tracing import span, start_trace
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineReviewAgent(PRReviewAgent):
+    def __init__(self, use_llm=True):
+        """
+        Review local changes (patch files or git commit ranges) with the same handlers and LLM agents
+        as PRReviewAgent, returning the comments instead of posting them to GitHub.
+
+        Args:
+            use_llm (bool): Whether to send files to the LLM agents of their handlers; without it
+                            only the language handlers (e.g. spell checking) run.
+        """
+        super().__init__(github_api=None)
+        self.use_llm = use_llm
+
+    def get_llm_agent(self, handler_name):
+        if not self.use_llm:
+            return None
+        return super().get_llm_agent(handler_name)
+
+    def review_change(self, change):
+        """
+        Review one local change.
+
+        Args:
+            change (LocalChange): The change to review.
+
+        Returns:
+            dict: The status, the change name, the number of reviewed files and the comments
+                  as {'path', 'line', 'side', 'body'} dictionaries, or a failure message.
+        """
+        logger.info(f"Starting offline review of '{change.name}'")
+        with start_trace("offline_review", change=change.name):
+            try:
+                repository_words = self.get_local_repository_words(change)
+                reviewed_files = []
+                tasks = []
+                for filename, diff_text in change.iter_patches(self.handler_registry.match, self.max_patch_bytes):
+                    handler_name = self.handler_registry.match(filename)
+                    with span("diff_index", path=filename):
+                        diff_index = self.get_diff_index(filename, change.head, diff_text)
+                    content_str = change.read_file(filename)
+                    if content_str is None:
+                        content_str = content_from_patch(diff_index)
+                    reviewed_files.append((handler_name, filename, content_str, diff_text, diff_index.added_lines))
+                    tasks.append(self._create_review_task(handler_name, filename, content_str, diff_index,
+                                                          change.source, change.name, repository_words))
+
+                with span("spell_check", count=len(tasks)):
+                    pending_spell_check = self.handler_executor.submit(tasks)
+                comment_index = CommentIndex()
+                llm_results = self._review_files_with_llm(reviewed_files, comment_index)
+                with span("spell_check_wait"):
+                    spell_check_results = pending_spell_check.result()
+
+                comments = self._merge_review_comments(reviewed_files, spell_check_results, llm_results,
+                                                       comment_index)
+                return {'status': 'success', 'change': change.name, 'files': len(reviewed_files),
+                        'comments': comments}
+
+            except Exception as e:
+                logger.error(f"Exception occurred during offline review of '{change.name}': {str(e)}")
+                return {'status': 'failure', 'change': change.name, 'message': f'Exception occurred: {str(e)}'}
+
+    def review_changes(self, changes, workers=4):
+        """
+        Review local changes in a pool of threads, yielding the results in input order.
+
+        At most twice as many changes as there are workers are read ahead, so long change lists
+        are not loaded at once.
+
+        Args:
+            changes (iterable): LocalChange objects.
+            workers (int): Changes reviewed concurrently.
+
+        Yields:
+            dict: The result of review_change for every change.
+        """
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="offline-review") as executor:
+            pending = deque()
+            for change in changes:
+                pending.append(executor.submit(self.review_change, change))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def get_local_repository_words(self, change):
+        """
+        Get the words of the wordlist (e.g. '.wordlist.txt') of the reviewed version, like get_repository_words.
+
+        Returns:
+            frozenset: The lower-cased words, empty if there is no wordlist.
+        """
+        if not self.wordlist_path:
+            return frozenset()
+        content = change.read_file(self.wordlist_path)
+        if content is None:
+            return frozenset()
+        return get_repository_words(hashlib.sha1(content.encode('utf-8')).hexdigest(), lambda: content)
@@ -1,122 +1,574 @@
+import asyncio
 import logging
-from github.PullRequest import PullRequest
-from github.Repository import Repository
-from unidiff.patch import PatchSet
-from src.language_handlers.markdown_handler import MarkdownHandler
+import functools
+import threading
+from contextlib import closing
+from typing import TYPE_CHECKING
+from src.github.pagination import PER_PAGE, iter_paginated
+from src.github.review_batches import MAX_COMMENTS_PER_REVIEW, MAX_REVIEW_BYTES
+from src.language_handlers.handler_executor import ReviewTask, create_handler_executor
+from src.language_handlers.registry import registry
+from src.language_handlers.spell_dictionary import get_repository_words
 from src.agents.base_agent import BaseAgent
-from difflib import SequenceMatcher
-from src.agents.markdown_llm_agent import MarkdownLLMAgent
+from src.utils.comment_index import CommentIndex, anchor_from_diff_hunk
+from src.utils.diff_index import DiffIndex, get_diff_index
+from src.utils.raw_diff import RawDiffSplitter, split_raw_diff
+from src.utils.metrics import GITHUB_API_LATENCY, GITHUB_CONTENT_BYTES
+from src.utils.tracing import span, start_trace
+
+if TYPE_CHECKING:
+    from github.PullRequest import PullRequest
+    from github.Repository import Repository
 
 logger = logging.getLogger(__name__)
 
 class PRReviewAgent(BaseAgent):
-    def __init__(self, github_api):
+    def __init__(self, github_api, async_github_api=None):
+        """
+        Args:
+            github_api (GitHubAPI): The client used by perform_code_review.
+            async_github_api (AsyncGitHubAPI): Optional asyncio client used by perform_code_review_async.
+        """
         super().__init__(github_api, "pr_review_agent")
-        self.markdown_handler = MarkdownHandler()
-        self.markdown_llm_agent = MarkdownLLMAgent(github_api)
-
-    def perform_code_review(self, repo_name: str, pr_number: int):
+        self.async_github_api = async_github_api
+        self.handler_executor = create_handler_executor(self.config)
+        self.handler_registry = registry
+        self._llm_agents = {}
+        self._llm_agents_lock = threading.Lock()
+        self.wordlist_path = self.config.get('spell_check', {}).get('wordlist_path', '.wordlist.txt')
+        review_config = self.config.get('review', {})
+        self.prefetch_pages = review_config.get('prefetch_pages', True)
+        self.raw_diff_fallback = review_config.get('raw_diff_fallback', True)
+        self.max_raw_diff_bytes = review_config.get('max_raw_diff_bytes')
+        self.max_patch_bytes = review_config.get('max_patch_bytes')
+        self.max_comments_per_review = review_config.get('max_comments_per_review', MAX_COMMENTS_PER_REVIEW)
+        self.max_review_bytes = review_config.get('max_review_bytes', MAX_REVIEW_BYTES)
+
+    def perform_code_review(self, repo_name: str, pr_number: int, file_range=None, head_sha=None):
         """
         Perform an code review for the specified pull request in the given repository.
 
         Args:
             repo_name (str): The name of the repository in the format 'owner/repo'.
             pr_number (int): The number of the pull request to review.
+            file_range (tuple): Optional (start, stop) indexes into the file listing, to review one batch
+                                of the files of a large pull request; stop may be None for the rest.
+                                Only the pages holding the batch are requested.
+            head_sha (str): Optional head commit the batches were planned for. If the pull request has
+                            moved on, nothing is reviewed and the status is 'stale', with the new
+                            'head_sha' and 'changed_files', so the batches can be planned again.
 
         Returns:
             dict: The result of the review, including status and a message.
         """
         logger.info(f"Starting code review for PR #{pr_number} in repo '{repo_name}'")
-        try:
-            pull_request: PullRequest = self.github_api.get_pull_request(repo_name, pr_number)
-            repo: Repository = self.github_api.get_repository(repo_name)
-            commit_id = pull_request.head.sha
-
-            review_comments = []
-
-            # Collect existing comments from all commits in the PR
-            existing_comments_dict = {}
-            existing_comments = self.get_all_review_comments(pull_request)
-            for comment in existing_comments:
-                key = (comment.commit_id, comment.diff_hunk, comment.body)
-                existing_comments_dict[key] = True
-
-            for file in self.get_all_files(pull_request):
-                filename = file.filename
-                logger.info(f"Reviewing file: {filename}")
-
-                # Handle Markdown files
-                if filename.endswith('.md'):
-                    logger.info(f"Delegating review of Markdown file: {filename}")
-
-                    file_content = repo.get_contents(filename, ref=commit_id)
-                    content_str = file_content.decoded_content.decode('utf-8')
-
-                    diff_text = file.patch
-                    changed_line_numbers = self.get_changed_line_numbers(diff_text, filename)
-
-                    markdown_comments = self.markdown_handler.review(content_str)
-                    for comment in markdown_comments:
-                        original_line_number = comment['line']
-                        if original_line_number in changed_line_numbers:
-                            diff_hunk = file.patch
-                            comment_key = (commit_id, diff_hunk, comment['comment'])
-                            if comment_key in existing_comments_dict:
-                                logger.info(f"Skipping duplicate comment on line {original_line_number} in file {filename}")
-                                continue
-
-                            review_comments.append({
-                                'path': filename,
-                                'line': original_line_number,
-                                'side': 'RIGHT',
-                                'body': comment['comment']
-                            })
-
-                    # Send to LLM for review
-                    logger.info(f"Sending changes to LLM for further analysis for file: {filename}")
-                    llm_comments = self.markdown_llm_agent.review(
-                        full_text=content_str,
-                        changed_text=diff_text,
-                        existing_comments=list(existing_comments_dict.keys())
+        start, stop = file_range or (0, None)
+        with start_trace("perform_code_review", repo=repo_name, pr_number=pr_number, file_range=file_range):
+            try:
+                with span("get_pull_request"):
+                    pull_request: "PullRequest" = self.github_api.get_pull_request(repo_name, pr_number)
+                if head_sha is not None and pull_request.head.sha != head_sha:
+                    logger.info(f"PR #{pr_number} in '{repo_name}' moved from {head_sha} to {pull_request.head.sha}")
+                    return {'status': 'stale', 'message': f'Head moved to {pull_request.head.sha}',
+                            'head_sha': pull_request.head.sha, 'changed_files': pull_request.changed_files}
+                with span("get_repository"):
+                    repo: "Repository" = self.github_api.get_repository(repo_name)
+                commit_id = pull_request.head.sha
+
+                repository_words = None
+
+                # Index existing comments from all commits in the PR by file, anchor line content and body
+                with span("get_all_review_comments") as comments_span:
+                    existing_comments = self.get_all_review_comments(pull_request)
+                    comments_span.set_attribute("count", len(existing_comments))
+                comment_index = CommentIndex.from_review_comments(existing_comments)
+
+                # Fetch the files that have a language handler and their changed lines, page by page
+                reviewed_files = []
+                tasks = []
+                diff_indexes = {}
+
+                def add_file(handler_name, filename, diff_text):
+                    nonlocal repository_words
+                    with span("get_contents", path=filename) as contents_span:
+                        with GITHUB_API_LATENCY.labels(endpoint="get_contents").time():
+                            file_content = repo.get_contents(filename, ref=commit_id)
+                            decoded_content = file_content.decoded_content
+                        contents_span.set_attribute("bytes", len(decoded_content))
+                    GITHUB_CONTENT_BYTES.observe(len(decoded_content))
+                    content_str = decoded_content.decode('utf-8')
+
+                    with span("diff_index", path=filename):
+                        diff_index = self.get_diff_index(filename, commit_id, diff_text)
+                    if diff_text is not None:
+                        diff_indexes[filename] = diff_index
+
+                    if repository_words is None:
+                        with span("get_repository_words"):
+                            repository_words = self.get_repository_words(repo, commit_id)
+
+                    reviewed_files.append((handler_name, filename, content_str, diff_text, diff_index.added_lines))
+                    tasks.append(self._create_review_task(handler_name, filename, content_str, diff_index,
+                                                          repo_name, pr_number, repository_words))
+
+                listed_paths = set()
+                omitted_patches = {}
+                first_page = start // PER_PAGE
+                pages = None if stop is None else -(-stop // PER_PAGE) - first_page
+                for index, file in enumerate(self.iter_files(pull_request, first_page, pages), first_page * PER_PAGE):
+                    if index < start:
+                        continue
+                    if stop is not None and index >= stop:
+                        break
+                    filename = file.filename
+                    listed_paths.add(filename)
+                    logger.info(f"Reviewing file: {filename}")
+
+                    handler_name = self.handler_registry.match(filename)
+                    if handler_name is not None:
+                        logger.info(f"Delegating review of {handler_name} file: {filename}")
+                        if file.patch is None and self.raw_diff_fallback:
+                            # GitHub omits the patch of large diffs; it is read from the raw diff below
+                            omitted_patches[filename] = handler_name
+                            continue
+                        add_file(handler_name, filename, file.patch)
+
+                # A batch only knows its own files, so files past the listing cap are left to whole reviews;
+                # the scheduler only splits pull requests the listing covers, and plans again when the head moves
+                changed_files = pull_request.changed_files if file_range is None else None
+                raw_diff_request = self._raw_diff_request(omitted_patches, listed_paths, changed_files)
+                if raw_diff_request is not None:
+                    with span("raw_diff", omitted=len(omitted_patches)) as raw_diff_span:
+                        raw_patches = self.get_raw_diff_patches(repo_name, pr_number, *raw_diff_request)
+                        raw_diff_span.set_attribute("count", len(raw_patches))
+                    for filename, diff_text in raw_patches.items():
+                        add_file(omitted_patches.pop(filename, None) or self.handler_registry.match(filename),
+                                 filename, diff_text)
+                # Files missing from the raw diff too are reviewed without changed lines, as before
+                for filename, handler_name in omitted_patches.items():
+                    add_file(handler_name, filename, None)
+
+                # Spell check every file at once; with the process backend this runs while the LLM is queried
+                with span("spell_check", count=len(tasks)):
+                    pending_spell_check = self.handler_executor.submit(tasks)
+
+                llm_results = self._review_files_with_llm(reviewed_files, comment_index)
+
+                with span("spell_check_wait"):
+                    spell_check_results = pending_spell_check.result()
+
+                review_comments = self._merge_review_comments(reviewed_files, spell_check_results, llm_results,
+                                                              comment_index)
+
+                # Post the comments back to the pull request
+                if review_comments:
+                    with span("post_review_comment", count=len(review_comments)):
+                        post_result = self.github_api.post_review_comment(
+                            repo_name, pr_number, review_comments,
+                            pull_request=pull_request,
+                            commit_id=commit_id,
+                            diff_indexes=diff_indexes,
+                            max_comments=self.max_comments_per_review,
+                            max_bytes=self.max_review_bytes
+                        )
+                    return self._review_result(post_result)
+                else:
+                    return {'status': 'success', 'message': 'No issues found'}
+
+            except Exception as e:
+                logger.error(f"Exception occurred during review: {str(e)}")
+                return {'status': 'failure', 'message': f'Exception occurred: {str(e)}'}
+
+    async def perform_code_review_async(self, repo_name: str, pr_number: int):
+        """
+        Perform a code review like perform_code_review, using the asyncio GitHub client.
+
+        The review comments and files are fetched concurrently, as are the contents of every
+        reviewed file and the LLM reviews of all files, so one event loop can keep the I/O of
+        many reviews in flight. Spell checking runs on the handler executor and LLM requests
+        on the loop's default thread pool, so neither blocks the event loop.
+
+        Args:
+            repo_name (str): The name of the repository in the format 'owner/repo'.
+            pr_number (int): The number of the pull request to review.
+
+        Returns:
+            dict: The result of the review, including status and a message.
+        """
+        if self.async_github_api is None:
+            return {'status': 'failure', 'message': 'No asyncio GitHub client configured'}
+        api = self.async_github_api
+        loop = asyncio.get_running_loop()
+
+        logger.info(f"Starting code review for PR #{pr_number} in repo '{repo_name}'")
+        with start_trace("perform_code_review", repo=repo_name, pr_number=pr_number):
+            try:
+                with span("get_pull_request"):
+                    pull_request = await api.get_pull_request(repo_name, pr_number)
+                commit_id = pull_request['head']['sha']
+
+                with span("get_review_comments_and_files") as listing_span:
+                    existing_comments, files = await asyncio.gather(
+                        api.get_review_comments(repo_name, pr_number),
+                        api.get_files(repo_name, pr_number)
                     )
-                    for llm_comment in llm_comments:
-                        if (commit_id, diff_text, llm_comment['comment']) not in existing_comments_dict:
-                            review_comments.append({
-                                'path': filename,
-                                'line': llm_comment['line'],
-                                'side': 'RIGHT',
-                                'body': llm_comment['comment']
-                            })
-
-            # Post the comments back to the pull request
-            if review_comments:
-                post_result = self.github_api.post_review_comment(repo_name, pr_number, review_comments)
-                if post_result['status'] == 'success':
-                    return {'status': 'success', 'message': 'Review comments posted successfully'}
+                    listing_span.set_attribute("comments", len(existing_comments))
+                    listing_span.set_attribute("files", len(files))
+                comment_index = CommentIndex.from_review_comments(existing_comments)
+
+                matched_files = {}
+                omitted_patches = {}
+                for file in files:
+                    filename = file['filename']
+                    handler_name = self.handler_registry.match(filename)
+                    if handler_name is not None:
+                        logger.info(f"Delegating review of {handler_name} file: {filename}")
+                        matched_files[filename] = (handler_name, file.get('patch'))
+                        if file.get('patch') is None:
+                            omitted_patches[filename] = handler_name
+
+                listed_paths = {file['filename'] for file in files}
+                raw_diff_request = self._raw_diff_request(omitted_patches, listed_paths,
+                                                          pull_request.get('changed_files'))
+                if raw_diff_request is not None:
+                    with span("raw_diff", omitted=len(omitted_patches)) as raw_diff_span:
+                        raw_patches = await self.get_raw_diff_patches_async(repo_name, pr_number, *raw_diff_request)
+                        raw_diff_span.set_attribute("count", len(raw_patches))
+                    for filename, diff_text in raw_patches.items():
+                        handler_name = omitted_patches.get(filename) or self.handler_registry.match(filename)
+                        matched_files[filename] = (handler_name, diff_text)
+
+                # Fetch every reviewed file and the repository wordlist at once
+                repository_words, contents = None, []
+                if matched_files:
+                    with span("get_contents", count=len(matched_files)):
+                        repository_words, *contents = await asyncio.gather(
+                            self.get_repository_words_async(repo_name, commit_id),
+                            *(api.get_contents(repo_name, filename, commit_id) for filename in matched_files)
+                        )
+
+                reviewed_files = []
+                tasks = []
+                diff_indexes = {}
+                for (filename, (handler_name, diff_text)), (_, decoded_content) in zip(matched_files.items(), contents):
+                    GITHUB_CONTENT_BYTES.observe(len(decoded_content))
+                    content_str = decoded_content.decode('utf-8')
+                    with span("diff_index", path=filename):
+                        diff_index = self.get_diff_index(filename, commit_id, diff_text)
+                    if diff_text is not None:
+                        diff_indexes[filename] = diff_index
+                    reviewed_files.append((handler_name, filename, content_str, diff_text, diff_index.added_lines))
+                    tasks.append(self._create_review_task(handler_name, filename, content_str, diff_index,
+                                                          repo_name, pr_number, repository_words))
+
+                # The inline executor spell checks inside submit, so submit off the event loop too
+                with span("spell_check", count=len(tasks)):
+                    submitted = await loop.run_in_executor(None, self.handler_executor.submit, tasks)
+                    pending_spell_check = asyncio.wrap_future(submitted)
+
+                with span("llm_review", count=len(reviewed_files)):
+                    llm_reviews = await asyncio.gather(*(
+                        self._review_with_llm(loop, handler_name, filename, content_str, diff_text, comment_index)
+                        for handler_name, filename, content_str, diff_text, _ in reviewed_files
+                    ))
+                llm_results = {filename: comments for (_, filename, _, _, _), comments in
+                               zip(reviewed_files, llm_reviews)}
+
+                with span("spell_check_wait"):
+                    spell_check_results = await pending_spell_check
+
+                review_comments = self._merge_review_comments(reviewed_files, spell_check_results, llm_results,
+                                                              comment_index)
+
+                if review_comments:
+                    with span("post_review_comment", count=len(review_comments)):
+                        post_result = await api.post_review_comment(
+                            repo_name, pr_number, review_comments,
+                            commit_id=commit_id,
+                            diff_indexes=diff_indexes,
+                            max_comments=self.max_comments_per_review,
+                            max_bytes=self.max_review_bytes
+                        )
+                    return self._review_result(post_result)
+                else:
+                    return {'status': 'success', 'message': 'No issues found'}
+
+            except Exception as e:
+                logger.error(f"Exception occurred during review: {str(e)}")
+                return {'status': 'failure', 'message': f'Exception occurred: {str(e)}'}
+
+    def _review_files_with_llm(self, reviewed_files, comment_index):
+        """
+        Send each reviewed file to the LLM agent of its handler, one file after the other.
+
+        Args:
+            reviewed_files (list): (handler name, filename, content, diff text, added line numbers) tuples.
+            comment_index (CommentIndex): The existing comments, passed to the LLM as context.
+
+        Returns:
+            dict: LLM comments by filename; empty for handlers without an LLM agent.
+        """
+        llm_results = {}
+        for handler_name, filename, content_str, diff_text, _ in reviewed_files:
+            llm_agent = self.get_llm_agent(handler_name)
+            if llm_agent is None:
+                llm_results[filename] = []
+                continue
+            # Send to LLM for review
+            logger.info(f"Sending changes to LLM for further analysis for file: {filename}")
+            with span("llm_review", path=filename):
+                llm_results[filename] = llm_agent.review(
+                    full_text=content_str,
+                    changed_text=diff_text,
+                    existing_comments=comment_index.comments_for_path(filename)
+                )
+        return llm_results
+
+    async def _review_with_llm(self, loop, handler_name, filename, content_str, diff_text, comment_index):
+        llm_agent = self.get_llm_agent(handler_name)
+        if llm_agent is None:
+            return []
+        logger.info(f"Sending changes to LLM for further analysis for file: {filename}")
+        return await loop.run_in_executor(None, functools.partial(
+            llm_agent.review,
+            full_text=content_str,
+            changed_text=diff_text,
+            existing_comments=comment_index.comments_for_path(filename)
+        ))
+
+    @staticmethod
+    def _create_review_task(handler_name, filename, content_str, diff_index, repo_name, pr_number, repository_words):
+        return ReviewTask(
+            handler_name,
+            filename,
+            content_str,
+            line_ranges=diff_index.added_line_ranges,
+            repo_name=repo_name,
+            extra_words=repository_words,
+            profile_name=f"spell_check-{repo_name}-{pr_number}-{filename}"
+        )
+
+    @staticmethod
+    def _merge_review_comments(reviewed_files, spell_check_results, llm_results, comment_index):
+        """
+        Merge the spell check and LLM comments in file order, dropping comments already on the pull request.
+
+        Args:
+            reviewed_files (list): (handler name, filename, content, diff text, added line numbers) tuples.
+            spell_check_results (dict): Spell check comments by filename.
+            llm_results (dict): LLM comments by filename.
+            comment_index (CommentIndex): The existing comments; new comments are added to it.
+
+        Returns:
+            list: The review comments to post.
+        """
+        review_comments = []
+        for _, filename, content_str, _, changed_line_numbers in reviewed_files:
+            file_lines = content_str.splitlines()
+            candidates = [comment for comment in spell_check_results.get(filename, [])
+                          if comment['line'] in changed_line_numbers]
+            candidates.extend(llm_results[filename])
+            for comment in candidates:
+                line_number = comment['line']
+                if isinstance(line_number, int) and 0 < line_number <= len(file_lines):
+                    anchor = file_lines[line_number - 1]
                 else:
-                    logger.error(f"Failed to post review comments: {post_result['message']}")
-                    return {'status': 'failure', 'message': f"Failed to post review comments: {post_result['message']}"}
-            else:
-                return {'status': 'success', 'message': 'No issues found'}
+                    anchor = ""
+                if comment_index.contains(filename, anchor, comment['comment']):
+                    logger.info(f"Skipping duplicate comment on line {line_number} in file {filename}")
+                    continue
+                # Also keeps the same comment from being posted twice in this review
+                comment_index.add(filename, anchor, comment['comment'], line=line_number)
+
+                review_comments.append({
+                    'path': filename,
+                    'line': line_number,
+                    'side': 'RIGHT',
+                    'body': comment['comment']
+                })
+        return review_comments
+
+    @staticmethod
+    def _review_result(post_result):
+        if post_result['status'] == 'success':
+            return {'status': 'success', 'message': 'Review comments posted successfully'}
+        logger.error(f"Failed to post review comments: {post_result['message']}")
+        return {'status': 'failure', 'message': f"Failed to post review comments: {post_result['message']}"}
+
+    def _raw_diff_request(self, omitted_patches, listed_paths, changed_files):
+        """
+        Decide which files to read from the raw diff of a pull request.
+
+        The raw diff is needed when GitHub omitted the patch of a reviewed file, or when
+        the file listing stopped short of changed_files (GitHub caps it at 3000 files).
+
+        Args:
+            omitted_patches (dict): Handler names of the reviewed files listed without a patch, by path.
+            listed_paths (set): The paths in the file listing.
+            changed_files (int): The number of changed files reported for the pull request.
+
+        Returns:
+            tuple: (wanted predicate, number of files to find or None), or None if the raw diff is not needed.
+        """
+        if not self.raw_diff_fallback:
+            return None
+        unlisted = isinstance(changed_files, int) and changed_files > len(listed_paths)
+        if not omitted_patches and not unlisted:
+            return None
+        if not unlisted:
+            return omitted_patches.__contains__, len(omitted_patches)
+
+        def wanted(path):
+            return path in omitted_patches or (
+                path not in listed_paths and self.handler_registry.match(path) is not None)
+
+        logger.info(f"File listing stopped at {len(listed_paths)} of {changed_files} files; reading the raw diff")
+        return wanted, None
+
+    def get_raw_diff_patches(self, repo_name, pr_number, wanted, limit=None):
+        """
+        Read the patches of some files from the raw diff of a pull request.
+
+        The diff is streamed and split per file as it arrives, and reading stops once
+        limit files are found or max_raw_diff_bytes are read.
+
+        Args:
+            repo_name (str): The name of the repository in the format 'owner/repo'.
+            pr_number (int): The number of the pull request.
+            wanted (callable): Called with a file path, returns whether its patch is needed.
+            limit (int): Optional number of files to find.
+
+        Returns:
+            dict: The patches by path, empty if the diff could not be fetched.
+        """
+        from github import GithubException
+
+        patches = {}
+        try:
+            with closing(self.github_api.iter_pull_request_diff(repo_name, pr_number)) as chunks:
+                for path, patch in split_raw_diff(chunks, wanted, max_file_bytes=self.max_patch_bytes,
+                                                  max_bytes=self.max_raw_diff_bytes, limit=limit):
+                    patches[path] = patch
+        except GithubException as e:
+            logger.warning(f"Could not fetch the raw diff of PR #{pr_number} in repo '{repo_name}': {str(e)}")
+        return patches
+
+    async def get_raw_diff_patches_async(self, repo_name, pr_number, wanted, limit=None):
+        """
+        Read the patches of some files from the raw diff with the asyncio client, like get_raw_diff_patches.
+        """
+        from github import GithubException
 
+        patches = {}
+        splitter = RawDiffSplitter(wanted, max_file_bytes=self.max_patch_bytes, max_bytes=self.max_raw_diff_bytes,
+                                   limit=limit)
+        chunks = self.async_github_api.iter_pull_request_diff(repo_name, pr_number)
+        try:
+            async for chunk in chunks:
+                patches.update(splitter.feed(chunk))
+                if splitter.done:
+                    break
+            patches.update(splitter.close())
+        except GithubException as e:
+            logger.warning(f"Could not fetch the raw diff of PR #{pr_number} in repo '{repo_name}': {str(e)}")
+        finally:
+            await chunks.aclose()
+        return patches
+
+    def get_llm_agent(self, handler_name):
+        """
+        Get the LLM agent registered for a language handler, creating it on first use.
+
+        Args:
+            handler_name (str): The name of the registered handler, e.g. 'markdown'.
+
+        Returns:
+            BaseAgent: The LLM agent, or None if the handler has none.
+        """
+        if handler_name not in self._llm_agents:
+            with self._llm_agents_lock:
+                if handler_name not in self._llm_agents:
+                    self._llm_agents[handler_name] = self.handler_registry.create_llm_agent(
+                        handler_name, self.github_api)
+        return self._llm_agents[handler_name]
+
+    def get_repository_words(self, repo: "Repository", ref: str):
+        """
+        Get the words of the repository wordlist (e.g. '.wordlist.txt') at the given ref.
+
+        The parsed words are cached by the wordlist's blob SHA, so the file is only
+        parsed again when its content changes.
+
+        Args:
+            repo (Repository): The repository object.
+            ref (str): The commit SHA to read the wordlist from.
+
+        Returns:
+            frozenset: The lower-cased words, empty if the repository has no wordlist.
+        """
+        from github import GithubException
+
+        if not self.wordlist_path:
+            return frozenset()
+        try:
+            with GITHUB_API_LATENCY.labels(endpoint="get_contents").time():
+                wordlist_file = repo.get_contents(self.wordlist_path, ref=ref)
+        except GithubException as e:
+            if e.status == 404:
+                return frozenset()
+            logger.warning(f"Could not fetch wordlist '{self.wordlist_path}': {str(e)}")
+            return frozenset()
+        if isinstance(wordlist_file, list):
+            logger.warning(f"Wordlist path '{self.wordlist_path}' is a directory")
+            return frozenset()
+        return get_repository_words(wordlist_file.sha,
+                                    lambda: wordlist_file.decoded_content.decode('utf-8', errors='replace'))
+
+    async def get_repository_words_async(self, repo_name: str, ref: str):
+        """
+        Get the words of the repository wordlist with the asyncio GitHub client, like get_repository_words.
+
+        Args:
+            repo_name (str): The name of the repository in the format 'owner/repo'.
+            ref (str): The commit SHA to read the wordlist from.
+
+        Returns:
+            frozenset: The lower-cased words, empty if the repository has no wordlist.
+        """
+        from github import GithubException
+
+        if not self.wordlist_path:
+            return frozenset()
+        try:
+            sha, content = await self.async_github_api.get_contents(repo_name, self.wordlist_path, ref)
+        except GithubException as e:
+            if e.status != 404:
+                logger.warning(f"Could not fetch wordlist '{self.wordlist_path}': {str(e)}")
+            return frozenset()
+        return get_repository_words(sha, lambda: content.decode('utf-8', errors='replace'))
+
+    @staticmethod
+    def get_diff_index(filename, head_sha, diff_text):
+        """
+        Get the parsed diff of a file, parsing each file patch only once per head commit.
+
+        Args:
+            filename (str): The filename that was modified.
+            head_sha (str): The head commit SHA of the pull request.
+            diff_text (str): The diff text for the file.
+
+        Returns:
+            DiffIndex: The indexed diff.
+        """
+        try:
+            return get_diff_index(filename, head_sha, diff_text)
         except Exception as e:
-            logger.error(f"Exception occurred during review: {str(e)}")
-            return {'status': 'failure', 'message': f'Exception occurred: {str(e)}'}
+            logger.error(f"Error parsing diff for file '{filename}': {e}")
+            raise e
 
     @staticmethod
     def get_changed_line_numbers(diff_text, filename):
-        # Prepend file header
-        header = f'--- a/{filename}\n+++ b/{filename}\n'
-        diff_text_with_header = header + diff_text
-
-        changed_lines = set()
-        patch_set = PatchSet(diff_text_with_header)
-        for patched_file in patch_set:
-            for hunk in patched_file:
-                for line in hunk:
-                    if line.is_added:
-                        changed_lines.add(line.target_line_no)
-        return changed_lines
+        return DiffIndex(diff_text, filename).added_lines
 
     @staticmethod
     def get_changed_lines(diff_text, filename):
@@ -130,26 +582,44 @@ class PRReviewAgent(BaseAgent):
         Returns:
             str: A string containing only the changed lines.
         """
-        # Add file headers to the diff text
-        header = f'--- a/{filename}\n+++ b/{filename}\n'
-        diff_text_with_header = header + diff_text
-
-        changed_lines = []
         try:
-            patch_set = PatchSet(diff_text_with_header)
-            for patched_file in patch_set:
-                for hunk in patched_file:
-                    for line in hunk:
-                        if line.is_added:
-                            changed_lines.append(line.value)
+            return DiffIndex(diff_text, filename).changed_text
         except Exception as e:
             logger.error(f"Error parsing diff for file '{filename}': {e}")
             raise e
 
-        return ''.join(changed_lines)
+    def iter_review_comments(self, pull_request: "PullRequest"):
+        """
+        Iterate over the review comments of a pull request, requesting each page once.
 
-    @staticmethod
-    def get_all_review_comments(pull_request: PullRequest):
+        Args:
+            pull_request (PullRequest): The pull request object to retrieve comments from.
+
+        Returns:
+            iterator: The review comments, page by page.
+        """
+        return iter_paginated(pull_request.get_review_comments(), "get_review_comments",
+                              prefetch=self.prefetch_pages)
+
+    def iter_files(self, pull_request: "PullRequest", first_page=0, pages=None):
+        """
+        Iterate over the files of a pull request, requesting each page once.
+
+        Files can be reviewed as soon as their page arrives; with prefetch_pages the next
+        page is already being requested meanwhile.
+
+        Args:
+            pull_request (PullRequest): The pull request object to retrieve files from.
+            first_page (int): The first page to request, to start at a later batch of files.
+            pages (int): Optional number of pages to request at most.
+
+        Returns:
+            iterator: The files of the pull request, page by page.
+        """
+        return iter_paginated(pull_request.get_files(), "get_files", prefetch=self.prefetch_pages,
+                              first_page=first_page, pages=pages)
+
+    def get_all_review_comments(self, pull_request: "PullRequest"):
         """
         Get all review comments for a given pull request, handling pagination.
 
@@ -159,18 +629,9 @@ class PRReviewAgent(BaseAgent):
         Returns:
             list: A list of all review comments.
         """
-        all_comments = []
-        comments = pull_request.get_review_comments()
-        while True:
-            all_comments.extend(comments)
-            if comments.totalCount == len(all_comments):
-                break
-            comments = pull_request.get_review_comments().get_page(len(all_comments))
-
-        return all_comments
+        return list(self.iter_review_comments(pull_request))
 
-    @staticmethod
-    def get_all_files(pull_request: PullRequest):
+    def get_all_files(self, pull_request: "PullRequest"):
         """
         Get all files for a given pull request, handling pagination.
 
@@ -180,27 +641,17 @@ class PRReviewAgent(BaseAgent):
         Returns:
             list: A list of all files in the pull request.
         """
-        all_files = []
-        files = pull_request.get_files()
-        while True:
-            all_files.extend(files)
-            if files.totalCount == len(all_files):
-                break
-            files = pull_request.get_files().get_page(len(all_files))
-
-        return all_files
+        return list(self.iter_files(pull_request))
 
     @staticmethod
     def _normalize_diff_hunk(diff_hunk):
         """
-        Normalize the diff hunk text to improve matching for duplicate comments.
-        This will strip leading/trailing spaces and reduce the content to the
-        essential part that identifies the change.
+        Normalize the diff hunk of a review comment to improve matching for duplicate comments.
+
+        GitHub ends the diff hunk with the line the comment is attached to, so the normalized
+        content of that line identifies the comment's anchor across commits and line shifts.
         """
-        if diff_hunk:
-            # Strip leading and trailing whitespace and limit to significant lines
-            return diff_hunk.strip().split('\n', 1)[0]  # Consider only the first line for consistency
-        return diff_hunk
+        return anchor_from_diff_hunk(diff_hunk)
 
     @staticmethod
     def get_changed_parts(diff_text, filename):
@@ -214,56 +665,8 @@ class PRReviewAgent(BaseAgent):
         Returns:
             list: A list of dictionaries containing the line number and the specific changed parts.
         """
-        # Add file headers to the diff text
-        header = f'--- a/{filename}\n+++ b/{filename}\n'
-        diff_text_with_header = header + diff_text
-
-        changed_parts = []
         try:
-            patch_set = PatchSet(diff_text_with_header)
-            for patched_file in patch_set:
-                for hunk in patched_file:
-                    removed_lines = []
-                    added_lines = []
-                    for line in hunk:
-                        if line.is_removed:
-                            removed_lines.append((line.value.rstrip('\n'), line.source_line_no))
-                        elif line.is_added:
-                            added_line = line.value.rstrip('\n')
-                            target_line_no = line.target_line_no
-
-                            if removed_lines:
-                                # Pair the added line with the first removed line
-                                prev_line, source_line_no = removed_lines.pop(0)
-                                # Compare the lines word by word
-                                prev_words = prev_line.split()
-                                added_words = added_line.split()
-                                # Identify changed words
-                                matcher = SequenceMatcher(None, prev_words, added_words)
-                                changes = []
-                                for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                                    if tag in ('insert', 'replace', 'delete'):
-                                        # Include entire words that have changed
-                                        changed_words = added_words[j1:j2]
-                                        changes.extend(changed_words)
-                                # Reconstruct the line with changes highlighted
-                                if changes:
-                                    changed_text = ' '.join(changes)
-                                    changed_parts.append({
-                                        'line': target_line_no,
-                                        'changes': added_line.strip()
-                                    })
-                            else:
-                                # New line added, include the entire line
-                                changed_parts.append({
-                                    'line': target_line_no,
-                                    'changes': added_line.strip()
-                                })
-                        else:
-                            # Reset if we encounter context lines
-                            removed_lines = []
+            return DiffIndex(diff_text, filename).changed_parts
         except Exception as e:
             logger.error(f"Error parsing diff for file '{filename}': {e}")
             raise e
-
-        return changed_parts
\ No newline at end of file
@@ -0,0 +1,371 @@
+import os
+import time
+import uuid
+import heapq
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from src.github.pagination import PER_PAGE
+from src.utils.config_loader import thaw
+from src.utils.metrics import REVIEW_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# GitHub lists at most 3000 files of a pull request; larger ones are reviewed in one job
+MAX_LISTED_FILES = 3000
+
+# Times the batches of a job are planned again because the pull request moved on, before it is reviewed whole
+MAX_REPLANS = 3
+
+
+def estimate_cost(payload, file_cost=50, label_weights=None):
+    """
+    Estimate the cost of reviewing a pull request from its webhook payload.
+
+    The cost is the number of changed lines plus file_cost per changed file, multiplied by
+    the weight of every label of the pull request found in label_weights.
+
+    Args:
+        payload (dict): The pull_request webhook payload.
+        file_cost (float): The cost of a changed file (fetching it and reviewing it) in changed lines.
+        label_weights (dict): Cost multipliers by label name, e.g. {'priority/high': 0.1}.
+
+    Returns:
+        float: The estimated cost.
+    """
+    pull_request = payload.get('pull_request') or {}
+    lines = _count(pull_request.get('additions')) + _count(pull_request.get('deletions'))
+    cost = lines + file_cost * max(_count(pull_request.get('changed_files')), 1)
+    for label in pull_request.get('labels') or []:
+        weight = (label_weights or {}).get(label.get('name'))
+        if weight is not None:
+            cost *= weight
+    return float(cost)
+
+
+def _count(value):
+    return value if isinstance(value, int) and value > 0 else 0
+
+
+class ReviewJob:
+    """
+    The review of one pull request, possibly split into batches of files that are scheduled separately.
+    """
+
+    def __init__(self, repo_name, pr_number, cost, file_ranges, head_sha=None, delivery_id=None):
+        self.job_id = uuid.uuid4().hex
+        self.repo_name = repo_name
+        self.pr_number = pr_number
+        self.cost = cost
+        self.file_ranges = file_ranges
+        self.head_sha = head_sha
+        self.delivery_id = delivery_id
+        # Incremented when the batches are planned again; queued batches of earlier plans are discarded
+        self.generation = 0
+        # Batches of the current plan that have not finished
+        self.pending = 0
+        # (head_sha, changed_files) of a delivery that arrived while the job was running
+        self.rerun = None
+        self.base_priority = 0.0
+        self.status = 'queued'
+        self.message = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Results of every finished batch, including those of earlier plans
+        self.results = []
+        self.future = Future()
+
+    def to_dict(self):
+        """
+        Describe the job for the job status endpoint.
+        """
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'message': self.message,
+            'repo': self.repo_name,
+            'pr_number': self.pr_number,
+            'cost': self.cost,
+            'batches': len(self.results) + self.pending,
+            'batches_done': len(self.results),
+            'head_sha': self.head_sha,
+            'queued_seconds': _elapsed(self.submitted_at, self.started_at),
+            'run_seconds': _elapsed(self.started_at, self.finished_at),
+        }
+
+    def _finish(self):
+        failures = [result['message'] for result in self.results if result.get('status') != 'success']
+        if failures:
+            self.status = 'failure'
+            self.message = '; '.join(dict.fromkeys(failures))
+        else:
+            messages = [result.get('message') for result in self.results]
+            self.status = 'success'
+            self.message = ('Review comments posted successfully'
+                            if 'Review comments posted successfully' in messages else messages[0])
+        self.finished_at = time.time()
+        self.future.set_result({'status': self.status, 'message': self.message})
+
+
+def _elapsed(start, end):
+    if start is None:
+        return None
+    return round((end or time.time()) - start, 3)
+
+
+class ReviewScheduler:
+    def __init__(self, agent, workers=4, file_cost=50, aging_per_second=100.0, split_files=200,
+                 batch_files=PER_PAGE, label_weights=None, max_jobs=1000):
+        """
+        Run pull request reviews in a pool of worker threads, cheapest first.
+
+        A job's priority is its estimated cost (see estimate_cost) minus aging_per_second for every
+        second it has waited, so small reviews overtake large ones, but a large review is not postponed
+        indefinitely. Since every queued job ages at the same rate, the priority is fixed when the job
+        is queued: cost + aging_per_second * submission time.
+
+        Pull requests with more than split_files changed files are reviewed in batches of batch_files
+        files. Each batch is queued with its share of the cost, so batches interleave with other jobs.
+        The last batch runs to the end of the file listing. Every batch is pinned to the head commit of
+        the webhook payload; when the pull request has moved on, the batches are planned again for the
+        new head, so files are neither skipped nor reviewed against a shifted listing.
+
+        Args:
+            agent (PRReviewAgent): The agent performing the reviews.
+            workers (int): Reviews run concurrently.
+            file_cost (float): The cost of a changed file in changed lines.
+            aging_per_second (float): Cost subtracted from a job's priority for every second it waits.
+            split_files (int): Pull requests with more changed files are split into batches; None to never split.
+            batch_files (int): Files per batch; multiples of the page size (100) avoid requesting a page twice.
+            label_weights (dict): Cost multipliers by label name.
+            max_jobs (int): Finished jobs kept for the job status endpoint; queued and running jobs are always kept.
+        """
+        self.agent = agent
+        self.workers = workers
+        self.file_cost = file_cost
+        self.aging_per_second = aging_per_second
+        self.split_files = split_files
+        self.batch_files = batch_files
+        self.label_weights = label_weights or {}
+        self.max_jobs = max_jobs
+        self._active_jobs = {}
+        self._finished_jobs = OrderedDict()
+        # The unfinished job of every pull request, by (repo_name, pr_number)
+        self._pr_jobs = {}
+        self._unfinished = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._work, name=f"review-worker-{index}", daemon=True)
+                         for index in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, payload, delivery_id=None):
+        """
+        Queue the review of the pull request of a webhook payload.
+
+        A pull request has at most one unfinished job, which is returned instead of queueing another.
+        If the delivery names a new head commit, a waiting job is planned for that head, and a running
+        job is planned once more for it when its batch finds the head moved or its plan finishes.
+
+        Args:
+            payload (dict): The pull_request webhook payload.
+            delivery_id (str): The X-GitHub-Delivery header, for logging.
+
+        Returns:
+            ReviewJob: The queued job; job.future resolves to the review result.
+        """
+        repo_name = payload['repository']['full_name']
+        pr_number = payload['number']
+        cost = estimate_cost(payload, self.file_cost, self.label_weights)
+        pull_request = payload.get('pull_request') or {}
+        changed_files = pull_request.get('changed_files')
+        head_sha = (pull_request.get('head') or {}).get('sha')
+        with self._condition:
+            active = self._pr_jobs.get((repo_name, pr_number))
+            if active is not None:
+                if head_sha and head_sha != active.head_sha:
+                    if active.status == 'queued':
+                        self._replan(active, head_sha, changed_files)
+                    else:
+                        active.rerun = (head_sha, changed_files)
+                logger.info(f"Review of PR #{pr_number} in '{repo_name}' is already {active.status} as job {active.job_id}")
+                return active
+
+            # Batches can only be pinned to a known head commit
+            file_ranges = self.plan_batches(changed_files) if head_sha else [None]
+            job = ReviewJob(repo_name, pr_number, cost, file_ranges, head_sha, delivery_id)
+            # Aging: a job submitted t seconds later must be cheaper by t * aging_per_second to go first
+            job.base_priority = time.monotonic() * self.aging_per_second
+            self._queue_batches(job, changed_files)
+            self._active_jobs[job.job_id] = job
+            self._pr_jobs[(repo_name, pr_number)] = job
+            self._unfinished += 1
+            REVIEW_QUEUE_DEPTH.set(self._unfinished)
+        logger.info(f"Queued review of PR #{pr_number} in '{repo_name}' as job {job.job_id} "
+                    f"(cost {cost:.0f}, {len(file_ranges)} batches)")
+        return job
+
+    def plan_batches(self, changed_files):
+        """
+        Split the files of a pull request into batches.
+
+        Returns:
+            list: (start, stop) file ranges, the last one (start, None) to include files added since,
+                  or [None] to review the pull request in one job.
+        """
+        if (self.split_files is None or not isinstance(changed_files, int)
+                or changed_files <= self.split_files or changed_files > MAX_LISTED_FILES):
+            return [None]
+        starts = range(0, changed_files, self.batch_files)
+        return [(start, start + self.batch_files) for start in starts[:-1]] + [(starts[-1], None)]
+
+    def _queue_batches(self, job, changed_files):
+        # Called with the condition held
+        job.pending = len(job.file_ranges)
+        for file_range in job.file_ranges:
+            if file_range is None:
+                share = job.cost
+            else:
+                stop = changed_files if file_range[1] is None else file_range[1]
+                share = job.cost * max(stop - file_range[0], 1) / changed_files
+            heapq.heappush(self._heap, (job.base_priority + share, next(self._sequence), job, file_range,
+                                        job.generation))
+        self._condition.notify(len(job.file_ranges))
+
+    def _replan(self, job, head_sha, changed_files):
+        # Called with the condition held, when the pull request moved to a new head; batches of the
+        # earlier plan that are still queued are discarded
+        job.generation += 1
+        job.head_sha = head_sha
+        job.rerun = None
+        job.file_ranges = self.plan_batches(changed_files) if job.generation <= MAX_REPLANS else [None]
+        logger.info(f"PR #{job.pr_number} in '{job.repo_name}' moved to {job.head_sha}; "
+                    f"planned job {job.job_id} again in {len(job.file_ranges)} batches")
+        self._queue_batches(job, changed_files)
+
+    def get_job(self, job_id):
+        """
+        Return a queued, running or recently finished job, or None.
+        """
+        with self._condition:
+            return self._active_jobs.get(job_id) or self._finished_jobs.get(job_id)
+
+    def _retire(self, job):
+        # Called with the condition held, once the job's future is resolved
+        self._active_jobs.pop(job.job_id, None)
+        if self._pr_jobs.get((job.repo_name, job.pr_number)) is job:
+            del self._pr_jobs[(job.repo_name, job.pr_number)]
+        self._finished_jobs[job.job_id] = job
+        while len(self._finished_jobs) > self.max_jobs:
+            self._finished_jobs.popitem(last=False)
+        self._unfinished -= 1
+        REVIEW_QUEUE_DEPTH.set(self._unfinished)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers once the running reviews finish; queued reviews fail.
+        """
+        with self._condition:
+            self._stopping = True
+            for _, _, job, _, _ in self._heap:
+                if not job.future.done():
+                    job.results.append({'status': 'failure', 'message': 'Review scheduler shut down'})
+                    job._finish()
+                    self._retire(job)
+            self._heap.clear()
+            self._pr_jobs.clear()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                _, _, job, file_range, generation = heapq.heappop(self._heap)
+                if generation != job.generation:
+                    # A batch of a plan that was replaced
+                    continue
+                if job.status == 'queued':
+                    job.status = 'running'
+                    job.started_at = time.time()
+
+            logger.info(f"Running job {job.job_id} for PR #{job.pr_number} in '{job.repo_name}'"
+                        + (f", files {file_range[0]}-{'' if file_range[1] is None else file_range[1] - 1}"
+                           if file_range else ""))
+            try:
+                if file_range is None:
+                    result = self.agent.perform_code_review(job.repo_name, job.pr_number)
+                else:
+                    result = self.agent.perform_code_review(job.repo_name, job.pr_number, file_range=file_range,
+                                                            head_sha=job.head_sha)
+            except Exception as e:
+                logger.error(f"Exception occurred in review job {job.job_id}: {str(e)}")
+                result = {'status': 'failure', 'message': f'Exception occurred: {str(e)}'}
+
+            with self._condition:
+                if job.future.done():
+                    # Failed by shutdown() while this batch was running
+                    continue
+                if result.get('status') == 'stale':
+                    if generation == job.generation:
+                        self._replan(job, result.get('head_sha'), result.get('changed_files'))
+                    continue
+                # A batch of an earlier plan that finished has still posted its comments
+                job.results.append(result)
+                if generation != job.generation:
+                    continue
+                job.pending -= 1
+                if job.pending:
+                    continue
+                if job.rerun is not None:
+                    # A delivery for a newer head arrived while the last batches ran
+                    self._replan(job, *job.rerun)
+                    continue
+                job._finish()
+                self._retire(job)
+
+
+def create_review_scheduler(agent, config):
+    """
+    Create the review scheduler from the 'review.scheduler' section of the application config.
+
+    The scheduler can be disabled with enabled: false or REVIEW_SCHEDULER_ENABLED, and the number
+    of workers overridden with REVIEW_SCHEDULER_WORKERS.
+
+    Args:
+        agent (PRReviewAgent): The agent performing the reviews.
+        config (dict): The application configuration.
+
+    Returns:
+        ReviewScheduler: The scheduler, or None if scheduling is disabled.
+    """
+    config = config or {}
+    scheduler_config = (config.get('review') or {}).get('scheduler') or {}
+    enabled = os.getenv('REVIEW_SCHEDULER_ENABLED', str(scheduler_config.get('enabled', True))).lower()
+    if enabled not in ('1', 'true', 'yes'):
+        return None
+    workers = int(os.getenv('REVIEW_SCHEDULER_WORKERS', scheduler_config.get('workers', 4)))
+    scheduler = ReviewScheduler(
+        agent,
+        workers=workers,
+        file_cost=scheduler_config.get('file_cost', 50),
+        aging_per_second=scheduler_config.get('aging_per_second', 100.0),
+        split_files=scheduler_config.get('split_files', 200),
+        batch_files=scheduler_config.get('batch_files', PER_PAGE),
+        label_weights=thaw(scheduler_config.get('label_weights')),
+        max_jobs=scheduler_config.get('max_jobs', 1000)
+    )
+    logger.info(f"Scheduling reviews on {workers} workers")
+    return scheduler
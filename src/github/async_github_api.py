@@ -0,0 +1,332 @@
+import os
+import re
+import time
+import json as json_module
+import base64
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from urllib.parse import quote
+
+import jwt
+import aiohttp
+from github import GithubException
+from src.github.pagination import PER_PAGE
+from src.github.review_batches import (
+    MAX_COMMENTS_PER_REVIEW, MAX_REVIEW_BYTES, RETRY_STATUSES,
+    batch_comments, failure_message, rejects_comments, review_result, split_batch, validate_comments
+)
+from src.utils.metrics import GITHUB_API_LATENCY
+
+logger = logging.getLogger(__name__)
+
+_NEXT_LINK_PATTERN = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# Refresh the installation token this many seconds before GitHub expires it
+_TOKEN_REFRESH_MARGIN = 60
+
+
+class AsyncGitHubAPI:
+    def __init__(self, app_id=None, installation_id=None, private_key=None, api_url="https://api.github.com",
+                 max_connections=100, timeout=30):
+        """
+        asyncio client for the GitHub REST API calls made during a review.
+
+        All requests share one aiohttp session, so connections are pooled and kept alive across
+        requests and reviews. Responses are returned as decoded JSON dictionaries instead of
+        PyGithub objects, and HTTP errors are raised as GithubException, like the synchronous client.
+
+        Args:
+            app_id (str): The GitHub App ID (GITHUB_APP_ID takes precedence).
+            installation_id (str): The installation ID (GITHUB_INSTALLATION_ID takes precedence).
+            private_key (str): The GitHub App private key (GITHUB_PRIVATE_KEY takes precedence).
+            api_url (str): The GitHub API base URL (GITHUB_API_URL takes precedence).
+            max_connections (int): Maximum number of open connections in the pool.
+            timeout (float): Total timeout of a single request in seconds.
+        """
+        self.app_id = os.getenv('GITHUB_APP_ID', app_id)
+        self.installation_id = os.getenv('GITHUB_INSTALLATION_ID', installation_id)
+        self.private_key = os.getenv('GITHUB_PRIVATE_KEY', private_key)
+        self.api_url = os.getenv('GITHUB_API_URL', api_url).rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        if self.private_key:
+            self.private_key = self.private_key.replace("\\n", "\n")
+
+        if not self.app_id:
+            raise ValueError("GITHUB_APP_ID environment variable is not set")
+        if not self.installation_id:
+            raise ValueError("GITHUB_INSTALLATION_ID environment variable is not set")
+        if not self.private_key:
+            raise ValueError("GITHUB_PRIVATE_KEY environment variable is not set")
+
+        self._session = None
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self):
+        """
+        The shared aiohttp session, created on first use inside the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept": "application/vnd.github.v3+json"},
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_installation_token(self):
+        """
+        Return an installation access token, requesting a new one shortly before the current one expires.
+        """
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if self._token is not None and time.time() < self._token_expires_at - _TOKEN_REFRESH_MARGIN:
+                return self._token
+
+            current_time = int(time.time())
+            payload = {
+                "iat": current_time,
+                "exp": current_time + (10 * 60),
+                "iss": self.app_id
+            }
+            jwt_token = jwt.encode(payload, self.private_key, algorithm="RS256")
+            url = f"{self.api_url}/app/installations/{self.installation_id}/access_tokens"
+            with GITHUB_API_LATENCY.labels(endpoint="installation_token").time():
+                async with self.session.post(url, headers={"Authorization": f"Bearer {jwt_token}"}) as response:
+                    if response.status != 201:
+                        raise Exception(f"Failed to get installation token: {response.status}, {await response.text()}")
+                    data = await response.json()
+
+            self._token = data.get("token")
+            self._token_expires_at = _parse_expiry(data.get("expires_at"), current_time)
+            return self._token
+
+    async def request(self, method, path, endpoint, params=None, json=None, accept=None):
+        """
+        Make an authenticated request and return the decoded response.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): A path below the API URL, or an absolute URL (e.g. a pagination link).
+            endpoint (str): The endpoint label for the github_api_call_seconds metric.
+            params (dict): Optional query parameters.
+            json (dict): Optional JSON body.
+            accept (str): Optional media type; JSON is decoded, anything else is returned as bytes.
+
+        Returns:
+            tuple: (decoded body, response headers).
+
+        Raises:
+            GithubException: If GitHub answers with an error status.
+        """
+        url = path if path.startswith(('http://', 'https://')) else f"{self.api_url}{path}"
+        headers = {"Authorization": f"token {await self.get_installation_token()}"}
+        if accept:
+            headers["Accept"] = accept
+        with GITHUB_API_LATENCY.labels(endpoint=endpoint).time():
+            async with self.session.request(method, url, params=params, json=json, headers=headers) as response:
+                if response.status >= 400:
+                    # Gateways answer 502/503 with HTML, so the error body is only decoded if it is JSON
+                    text = await response.text()
+                    try:
+                        data = json_module.loads(text)
+                    except ValueError:
+                        data = {"message": text}
+                    raise GithubException(response.status, data, dict(response.headers))
+                if accept and 'json' not in accept:
+                    body = await response.read()
+                else:
+                    body = await response.json(content_type=None)
+                return body, response.headers
+
+    async def paginate(self, path, endpoint, per_page=PER_PAGE):
+        """
+        Yield the items of a paginated list endpoint, following the Link headers.
+
+        Args:
+            path (str): The path of the list endpoint.
+            endpoint (str): The endpoint label for the github_api_call_seconds metric.
+            per_page (int): Items per page (GitHub allows up to 100).
+        """
+        url, params = path, {"per_page": per_page}
+        while url:
+            items, headers = await self.request("GET", url, endpoint, params=params)
+            for item in items:
+                yield item
+            match = _NEXT_LINK_PATTERN.search(headers.get("Link", ""))
+            # The next link already carries the query parameters
+            url, params = (match.group(1), None) if match else (None, None)
+
+    async def get_pull_request(self, repo_name, pr_number):
+        pull_request, _ = await self.request("GET", f"/repos/{repo_name}/pulls/{pr_number}", "get_pull")
+        return pull_request
+
+    async def get_files(self, repo_name, pr_number):
+        """
+        Get all files of a pull request as dictionaries with filename, status and patch keys.
+        """
+        return [file async for file in self.paginate(f"/repos/{repo_name}/pulls/{pr_number}/files", "get_files")]
+
+    async def get_review_comments(self, repo_name, pr_number):
+        """
+        Get all review comments of a pull request as dictionaries with path, line, diff_hunk and body keys.
+        """
+        return [comment async for comment in
+                self.paginate(f"/repos/{repo_name}/pulls/{pr_number}/comments", "get_review_comments")]
+
+    async def get_contents(self, repo_name, path, ref):
+        """
+        Get a file of the repository at the given ref.
+
+        Args:
+            repo_name (str): The name of the repository in the format 'owner/repo'.
+            path (str): The path of the file in the repository.
+            ref (str): The commit SHA, branch or tag.
+
+        Returns:
+            tuple: (blob SHA, decoded content as bytes).
+
+        Raises:
+            GithubException: If the file does not exist (status 404) or the path is a directory.
+        """
+        contents_path = f"/repos/{repo_name}/contents/{quote(path)}"
+        data, _ = await self.request("GET", contents_path, "get_contents", params={"ref": ref})
+        if isinstance(data, list):
+            raise GithubException(400, {"message": f"'{path}' is a directory"}, None)
+        if data.get("encoding") == "base64":
+            return data["sha"], base64.b64decode(data.get("content") or "")
+        # Files over 1 MB come without inline content and must be fetched raw
+        content, _ = await self.request("GET", contents_path, "get_contents", params={"ref": ref},
+                                        accept="application/vnd.github.raw")
+        return data["sha"], content
+
+    async def iter_pull_request_diff(self, repo_name, pr_number, chunk_size=64 * 1024):
+        """
+        Stream the raw diff of a pull request, like GitHubAPI.iter_pull_request_diff.
+
+        Yields:
+            bytes: Chunks of the diff as they arrive.
+        """
+        headers = {
+            "Authorization": f"token {await self.get_installation_token()}",
+            "Accept": "application/vnd.github.diff"
+        }
+        with GITHUB_API_LATENCY.labels(endpoint="get_diff").time():
+            response = await self.session.get(f"{self.api_url}/repos/{repo_name}/pulls/{pr_number}", headers=headers)
+        async with response:
+            if response.status != 200:
+                raise GithubException(response.status, await response.text(), dict(response.headers))
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def post_review_comment(self, repo_name, pr_number, comments, commit_id=None, diff_indexes=None,
+                                  max_comments=MAX_COMMENTS_PER_REVIEW, max_bytes=MAX_REVIEW_BYTES,
+                                  max_retries=2, retry_delay=1.0) -> dict:
+        """
+        Post review comments in size-bounded batches, like GitHubAPI.post_review_comment.
+
+        Args:
+            repo_name (str): The name of the repository in the format 'owner/repo'.
+            pr_number (int): The number of the pull request.
+            comments (list): Review comments as {'path', 'line', 'side', 'body'} dictionaries.
+            commit_id (str): The commit to review; the pull request head is fetched if omitted.
+            diff_indexes (dict): Optional DiffIndex objects by path, to drop comments on lines outside the diff.
+            max_comments (int): Maximum number of comments per review.
+            max_bytes (int): Approximate maximum JSON size of the comments of one review.
+            max_retries (int): Retries of a batch that failed with 503.
+            retry_delay (float): Seconds before the first retry, doubled for each further retry.
+
+        Returns:
+            dict: The status and message of the operation, as returned by GitHubAPI.post_review_comment.
+        """
+        try:
+            logger.info(f"Attempting to post review comments on PR #{pr_number} in repository '{repo_name}'.")
+            if commit_id is None:
+                commit_id = (await self.get_pull_request(repo_name, pr_number))['head']['sha']
+            if diff_indexes is not None:
+                comments, _ = validate_comments(comments, diff_indexes)
+                if not comments:
+                    return {'status': 'success', 'message': 'No review comments left to post'}
+
+            posted = 0
+            rejected = 0
+            failures = []
+            pending = deque((batch, 0) for batch in batch_comments(comments, max_comments, max_bytes))
+            while pending:
+                batch, attempt = pending.popleft()
+                try:
+                    review, _ = await self.request("POST", f"/repos/{repo_name}/pulls/{pr_number}/reviews",
+                                                   "create_review", json={
+                                                       "commit_id": commit_id,
+                                                       "body": "Automated code review comments.",
+                                                       "event": "COMMENT",
+                                                       "comments": batch,
+                                                   })
+                except GithubException as e:
+                    logger.error(f"GitHubException occurred while posting a review: {str(e)}")
+                    if e.status == 422 and not rejects_comments(e.data):
+                        logger.error(f"Validation error data: {e.data}")
+                        failures.append((None, failure_message(e.status, e)))
+                        break
+                    halves = split_batch(batch) if e.status == 422 else []
+                    if halves:
+                        pending.extendleft(reversed([(half, 0) for half in halves]))
+                    elif e.status in RETRY_STATUSES and attempt < max_retries:
+                        await asyncio.sleep(retry_delay * 2 ** attempt)
+                        pending.appendleft((batch, attempt + 1))
+                    else:
+                        failures.append((e.status, e))
+                        if e.status == 422:
+                            logger.error(f"Validation error data: {e.data}")
+                            rejected += len(batch)
+                        elif e.status == 403:
+                            break
+                    continue
+
+                if review.get('id') is None:
+                    logger.warning(f"Unknown failure occurred while posting review comments on PR #{pr_number} in repository '{repo_name}'.")
+                    failures.append((None, 'Unknown failure: Review ID is None'))
+                    continue
+                posted += len(batch)
+
+            result = review_result(posted, rejected, failures, len(comments))
+            if result['status'] == 'success':
+                logger.info(f"Successfully posted review comments on PR #{pr_number} in repository '{repo_name}'.")
+            return result
+
+        except GithubException as e:
+            logger.error(f"GitHubException occurred while posting a review: {str(e)}")
+            return {'status': 'failure', 'message': failure_message(e.status, e)}
+        except Exception as e:
+            logger.error(f"Exception occurred: {str(e)}")
+            return {'status': 'failure', 'message': f'Exception occurred: {str(e)}'}
+
+
+def _parse_expiry(expires_at, issued_at):
+    """
+    Convert the expires_at timestamp of an installation token to epoch seconds.
+    GitHub tokens last one hour, which is assumed when the timestamp is missing or malformed.
+    """
+    try:
+        return datetime.fromisoformat(expires_at.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return issued_at + 3600
@@ -4,8 +4,18 @@ import jwt
 import time
 import requests
 import logging
+from collections import deque
 from github import Github
 from github import GithubException
+from github.GithubRetry import GithubRetry
+from urllib3.util.retry import Retry
+from github.Commit import Commit
+from src.github.pagination import PER_PAGE
+from src.github.review_batches import (
+    MAX_COMMENTS_PER_REVIEW, MAX_REVIEW_BYTES, RETRY_STATUSES,
+    batch_comments, failure_message, rejects_comments, review_result, split_batch, validate_comments
+)
+from src.utils.metrics import GITHUB_API_LATENCY
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +40,12 @@ class GitHubAPI:
         if not self.private_key:
             raise ValueError("GITHUB_PRIVATE_KEY environment variable is not set")
 
-        # Use the official GitHub Python library for authenticated access
-        self.github = Github(self.get_installation_token())
+        # Use the official GitHub Python library for authenticated access; list endpoints return PER_PAGE items per page.
+        # POST is left out of PyGithub's retries: creating a review is not idempotent, and
+        # post_review_comment retries failed batches itself, a bounded number of times
+        self.token = self.get_installation_token()
+        self.github = Github(self.token, base_url=self.api_url, per_page=PER_PAGE,
+                             retry=GithubRetry(total=10, allowed_methods=Retry.DEFAULT_ALLOWED_METHODS))
 
     def get_installation_token(self):
         # Generate a JWT for GitHub App authentication
@@ -56,8 +70,10 @@ class GitHubAPI:
         return token
 
     def get_pull_request(self, repo_name, pr_number):
-        repo = self.github.get_repo(repo_name)
-        return repo.get_pull(pr_number)
+        with GITHUB_API_LATENCY.labels(endpoint="get_repo").time():
+            repo = self.github.get_repo(repo_name)
+        with GITHUB_API_LATENCY.labels(endpoint="get_pull").time():
+            return repo.get_pull(pr_number)
 
     def get_repository(self, repo_name):
         """
@@ -66,14 +82,44 @@ class GitHubAPI:
         :param repo_name: Full name of the repository (e.g., 'owner/repo').
         :return: Repository object.
         """
-        return self.github.get_repo(repo_name)
+        with GITHUB_API_LATENCY.labels(endpoint="get_repo").time():
+            return self.github.get_repo(repo_name)
+
+    def iter_pull_request_diff(self, repo_name, pr_number, chunk_size=64 * 1024):
+        """
+        Stream the raw diff of a pull request.
+
+        Unlike the patches of the file listing, the raw diff is not omitted for large files.
+
+        Args:
+            repo_name (str): Full name of the repository (e.g., 'owner/repo').
+            pr_number (int): The number of the pull request.
+            chunk_size (int): Bytes read per chunk.
+
+        Yields:
+            bytes: Chunks of the diff as they arrive.
+
+        Raises:
+            GithubException: If GitHub refuses the diff, e.g. 406 when it is too large to generate.
+        """
+        url = f"{self.api_url}/repos/{repo_name}/pulls/{pr_number}"
+        headers = {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github.diff"
+        }
+        with GITHUB_API_LATENCY.labels(endpoint="get_diff").time():
+            response = requests.get(url, headers=headers, stream=True, timeout=60)
+        with response:
+            if response.status_code != 200:
+                raise GithubException(response.status_code, response.text, dict(response.headers))
+            yield from response.iter_content(chunk_size=chunk_size)
 
     def get_review_comments(self, repo_name: str, pr_number: int):
         try:
-            repo = self.github.get_repo(repo_name)
-            pull_request = repo.get_pull(pr_number)
-            comments = pull_request.get_review_comments()
-            return [comment for comment in comments]
+            pull_request = self.get_pull_request(repo_name, pr_number)
+            with GITHUB_API_LATENCY.labels(endpoint="get_review_comments").time():
+                comments = pull_request.get_review_comments()
+                return [comment for comment in comments]
         except GithubException as e:
             logger.error(f"GitHubException occurred while fetching review comments: {str(e)}")
             return []
@@ -81,41 +127,106 @@ class GitHubAPI:
             logger.error(f"Exception occurred while fetching review comments: {str(e)}")
             return []
 
-    def post_review_comment(self, repo_name, pr_number, comments) -> dict:
+    def post_review_comment(self, repo_name, pr_number, comments, pull_request=None, commit_id=None,
+                            diff_indexes=None, max_comments=MAX_COMMENTS_PER_REVIEW, max_bytes=MAX_REVIEW_BYTES,
+                            max_retries=2, retry_delay=1.0) -> dict:
+        """
+        Post review comments on a pull request, in as many reviews as their size requires.
+
+        Comments are validated against the diff before anything is sent, then posted in batches
+        of at most max_comments comments and about max_bytes of JSON. A batch rejected with 422 is
+        split in halves until the offending comments are isolated, and a batch failing with 503 is
+        retried, so one bad comment or an unavailable API does not lose the whole review. Other 5xx
+        statuses are not retried, since the review may have been created despite the error.
+
+        Args:
+            repo_name (str): Full name of the repository (e.g., 'owner/repo').
+            pr_number (int): The number of the pull request.
+            comments (list): Review comments as {'path', 'line', 'side', 'body'} dictionaries.
+            pull_request (PullRequest): The already fetched pull request; fetched if omitted.
+            commit_id (str): The reviewed commit; defaults to the head of the pull request.
+            diff_indexes (dict): Optional DiffIndex objects by path, to drop comments on lines outside the diff.
+            max_comments (int): Maximum number of comments per review.
+            max_bytes (int): Approximate maximum JSON size of the comments of one review.
+            max_retries (int): Retries of a batch that failed with 503.
+            retry_delay (float): Seconds before the first retry, doubled for each further retry.
+
+        Returns:
+            dict: The status and message of the operation.
+        """
         try:
             logger.info(f"Attempting to post review comments on PR #{pr_number} in repository '{repo_name}'.")
-            # Get repository and pull request information
-            repo = self.github.get_repo(repo_name)
-            pull_request = repo.get_pull(pr_number)
-            commit_id = pull_request.head.sha
-            commit = repo.get_commit(commit_id)
-
-            logger.debug(f"Posting Comments: {comments}")
-            # Make the request to create a review with comments
-            review = pull_request.create_review(
-                commit=commit,
-                body="Automated code review comments.",
-                event='COMMENT',
-                comments=comments
-            )
-
-            if review.id is not None:
-                logger.info(f"Successfully posted review comments on PR #{pr_number} in repository '{repo_name}'.")
-                return {'status': 'success', 'message': 'Review comments posted successfully'}
+            if pull_request is None:
+                repo = self.get_repository(repo_name)
+                with GITHUB_API_LATENCY.labels(endpoint="get_pull").time():
+                    pull_request = repo.get_pull(pr_number)
+            # create_review only reads commit.sha, so a lazy Commit saves fetching it
+            commit = Commit(pull_request._requester, {}, {"sha": commit_id or pull_request.head.sha}, completed=False)
+
+            if isinstance(comments, list):
+                if diff_indexes is not None:
+                    comments, _ = validate_comments(comments, diff_indexes)
+                    if not comments:
+                        return {'status': 'success', 'message': 'No review comments left to post'}
+                batches = batch_comments(comments, max_comments, max_bytes)
+                total = len(comments)
             else:
-                logger.warning(f"Unknown failure occurred while posting review comments on PR #{pr_number} in repository '{repo_name}'.")
-                return {'status': 'failure', 'message': 'Unknown failure: Review ID is None'}
+                batches = [comments]
+                total = 1
+            logger.debug("Posting %d review comments in %d reviews", total, len(batches))
+
+            posted = 0
+            rejected = 0
+            failures = []
+            pending = deque((batch, 0) for batch in batches)
+            while pending:
+                batch, attempt = pending.popleft()
+                batch_size = len(batch) if isinstance(batch, list) else 1
+                try:
+                    with GITHUB_API_LATENCY.labels(endpoint="create_review").time():
+                        review = pull_request.create_review(
+                            commit=commit,
+                            body="Automated code review comments.",
+                            event='COMMENT',
+                            comments=batch
+                        )
+                except GithubException as e:
+                    logger.error(f"GitHubException occurred while posting a review: {str(e)}")
+                    if e.status == 422 and not rejects_comments(e.data):
+                        # e.g. a stale commit_id: every batch would be rejected the same way
+                        logger.error(f"Validation error data: {e.data}")
+                        failures.append((None, failure_message(e.status, e)))
+                        break
+                    halves = split_batch(batch) if e.status == 422 else []
+                    if halves:
+                        pending.extendleft(reversed([(half, 0) for half in halves]))
+                    elif e.status in RETRY_STATUSES and attempt < max_retries:
+                        time.sleep(retry_delay * 2 ** attempt)
+                        pending.appendleft((batch, attempt + 1))
+                    else:
+                        failures.append((e.status, e))
+                        if e.status == 422:
+                            logger.error(f"Validation error data: {e.data}")
+                            rejected += batch_size
+                        elif e.status == 403:
+                            # Later batches would be refused the same way
+                            break
+                    continue
+
+                if review.id is None:
+                    logger.warning(f"Unknown failure occurred while posting review comments on PR #{pr_number} in repository '{repo_name}'.")
+                    failures.append((None, 'Unknown failure: Review ID is None'))
+                    continue
+                posted += batch_size
+
+            result = review_result(posted, rejected, failures, total)
+            if result['status'] == 'success':
+                logger.info(f"Successfully posted review comments on PR #{pr_number} in repository '{repo_name}'.")
+            return result
 
         except GithubException as e:
             logger.error(f"GitHubException occurred while posting a review: {str(e)}")
-            logger.error(f"Exception data: {e.data}")
-            if e.status == 403:
-                return {'status': 'failure', 'message': 'Forbidden: You may not have permissions to post a comment.'}
-            elif e.status == 422:
-                logger.error(f"Validation error data: {e.data}")
-                return {'status': 'failure', 'message': 'Validation failed: There may be a problem with the request payload.'}
-            else:
-                return {'status': 'failure', 'message': f'GitHub exception occurred: {str(e)}'}
+            return {'status': 'failure', 'message': failure_message(e.status, e)}
         except Exception as e:
             logger.error(f"Exception occurred: {str(e)}")
             logger.error(f"Exception type: {type(e)}")
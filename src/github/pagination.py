@@ -0,0 +1,73 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.metrics import GITHUB_API_LATENCY
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Page size requested from list endpoints; GitHub allows at most 100
+PER_PAGE = 100
+
+_prefetch_executor = None
+_prefetch_lock = threading.Lock()
+
+
+def _get_prefetch_executor():
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        with _prefetch_lock:
+            if _prefetch_executor is None:
+                _prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="github-prefetch")
+    return _prefetch_executor
+
+
+def _fetch_page(paginated_list, page, endpoint):
+    with GITHUB_API_LATENCY.labels(endpoint=endpoint).time():
+        return paginated_list.get_page(page)
+
+
+def iter_paginated(paginated_list, endpoint, per_page=PER_PAGE, prefetch=False, first_page=0, pages=None):
+    """
+    Yield the items of a PyGithub PaginatedList, requesting each page exactly once.
+
+    Pages are requested by index, so no request is spent on totalCount; a page shorter
+    than per_page is the last one. With prefetch, the next page is requested on a
+    background thread while the items of the current one are being consumed.
+
+    Args:
+        paginated_list (PaginatedList): The list, e.g. pull_request.get_files().
+        endpoint (str): The endpoint label for the github_api_call_seconds metric.
+        per_page (int): The page size the Github client was created with.
+        prefetch (bool): Whether to request the next page before the current one is consumed.
+        first_page (int): The index of the first page to request; earlier items are skipped without requests.
+        pages (int): Optional number of pages to request at most.
+
+    Yields:
+        The items of the list, in order.
+    """
+    page = first_page
+    pending = _get_prefetch_executor().submit(_fetch_page, paginated_list, page, endpoint) if prefetch else None
+    try:
+        while True:
+            with span(f"{endpoint}_page", page=page) as page_span:
+                if pending is not None:
+                    items = pending.result()
+                else:
+                    items = _fetch_page(paginated_list, page, endpoint)
+                page_span.set_attribute("count", len(items))
+
+            last_page = len(items) < per_page or (pages is not None and page + 1 >= first_page + pages)
+            pending = None
+            if prefetch and not last_page:
+                pending = _get_prefetch_executor().submit(_fetch_page, paginated_list, page + 1, endpoint)
+
+            yield from items
+            if last_page:
+                return
+            page += 1
+    finally:
+        # Abandoned iteration: drop a prefetched page nobody will read
+        if pending is not None:
+            pending.cancel()
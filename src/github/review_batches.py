@@ -0,0 +1,141 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# GitHub rejects very large reviews with 422, so comments are posted in bounded batches
+MAX_COMMENTS_PER_REVIEW = 50
+MAX_REVIEW_BYTES = 256 * 1024
+
+# Statuses worth retrying a batch for: 503 means the review was not created. A 500, 502 or 504 may
+# come after it was, and creating a review is not idempotent, so those batches fail instead
+RETRY_STATUSES = frozenset({503})
+
+
+def validate_comments(comments, diff_indexes):
+    """
+    Drop review comments GitHub would reject because their line is not part of the diff.
+
+    Args:
+        comments (list): Review comments as {'path', 'line', 'side', 'body'} dictionaries.
+        diff_indexes (dict): DiffIndex objects by path. Comments on paths without an index are kept.
+
+    Returns:
+        tuple: (comments that can be posted, comments that were dropped).
+    """
+    valid = []
+    dropped = []
+    for comment in comments:
+        diff_index = diff_indexes.get(comment.get('path'))
+        line = comment.get('line')
+        if diff_index is not None and not (isinstance(line, int) and diff_index.is_commentable(line)):
+            dropped.append(comment)
+        else:
+            valid.append(comment)
+    if dropped:
+        logger.warning(f"Dropping {len(dropped)} review comments on lines outside the diff")
+    return valid, dropped
+
+
+def batch_comments(comments, max_comments=MAX_COMMENTS_PER_REVIEW, max_bytes=MAX_REVIEW_BYTES):
+    """
+    Split review comments into batches of at most max_comments comments and about max_bytes of JSON.
+
+    A single comment larger than max_bytes gets a batch of its own.
+
+    Returns:
+        list: The batches, in order; a single empty batch if there are no comments.
+    """
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for comment in comments:
+        size = len(json.dumps(comment).encode('utf-8'))
+        if batch and (len(batch) >= max_comments or batch_bytes + size > max_bytes):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(comment)
+        batch_bytes += size
+    if batch or not batches:
+        batches.append(batch)
+    return batches
+
+
+def split_batch(batch):
+    """
+    Split a rejected batch in two, so the comments GitHub accepts can still be posted.
+
+    Returns:
+        list: Two halves, or an empty list if the batch cannot be split further.
+    """
+    if not isinstance(batch, list) or len(batch) < 2:
+        return []
+    middle = len(batch) // 2
+    return [batch[:middle], batch[middle:]]
+
+
+# Words in the details of a 422 that point at individual comments rather than the whole review
+_COMMENT_ERROR_WORDS = ("line", "path", "position", "side", "diff", "comment", "thread")
+
+
+def rejects_comments(error_data):
+    """
+    Tell whether a 422 response rejected comments of the review, so splitting the batch can isolate them.
+
+    Errors about the review itself, such as a commit_id that is not part of the pull request,
+    fail every batch the same way. A 422 without details is assumed to be about the comments.
+
+    Args:
+        error_data: The body of the 422 response (GithubException.data).
+
+    Returns:
+        bool: False if the details name a problem that no comment is responsible for.
+    """
+    if not isinstance(error_data, dict) or not error_data.get('errors'):
+        return True
+    details = " ".join(str(error.get('message') or error.get('field') or error) if isinstance(error, dict) else str(error)
+                       for error in error_data['errors']).lower()
+    return any(word in details for word in _COMMENT_ERROR_WORDS)
+
+
+def failure_message(status, error):
+    """
+    Describe a failed create_review request the way post_review_comment reports it.
+    """
+    if status is None:
+        return str(error)
+    if status == 403:
+        return 'Forbidden: You may not have permissions to post a comment.'
+    if status == 422:
+        return 'Validation failed: There may be a problem with the request payload.'
+    return f'GitHub exception occurred: {str(error)}'
+
+
+def review_result(posted, rejected, failures, total):
+    """
+    Summarize the outcome of posting a review in batches.
+
+    Comments GitHub rejected one by one (422) do not fail the review if others were posted;
+    any other failure does.
+
+    Args:
+        posted (int): The number of comments posted.
+        rejected (int): The number of comments rejected individually with 422.
+        failures (list): (status, error) tuples of the batches that could not be posted.
+        total (int): The number of comments to post.
+
+    Returns:
+        dict: The status and message of the operation.
+    """
+    blocking = [(status, error) for status, error in failures if status != 422]
+    if not failures or (not blocking and posted):
+        if rejected:
+            logger.warning(f"GitHub rejected {rejected} of {total} review comments")
+            return {'status': 'success', 'message': f'Review comments posted successfully ({rejected} rejected)'}
+        return {'status': 'success', 'message': 'Review comments posted successfully'}
+    status, error = (blocking or failures)[0]
+    message = failure_message(status, error)
+    if posted:
+        message = f'Posted {posted} of {total} comments. {message}'
+    return {'status': 'failure', 'message': message}
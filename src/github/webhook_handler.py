@@ -1,30 +1,44 @@
-from flask import Flask, request, jsonify
-from flasgger import Swagger
+from flask import Flask, request, jsonify, Response, url_for
 import os
 import logging
-from src.agents.pr_review_agent import PRReviewAgent
+from typing import TYPE_CHECKING
+from src.utils.metrics import REVIEW_QUEUE_DEPTH, WEBHOOK_LATENCY, render_metrics
+from src.utils.tracing import start_trace
+from src.github.webhook_recorder import get_recorder
 
-# Initialize Flask and Swagger
+if TYPE_CHECKING:
+    # Only needed for annotations; importing the agent pulls in PyGithub
+    from src.agents.pr_review_agent import PRReviewAgent
+    from src.agents.review_scheduler import ReviewScheduler
+
+# Initialize Flask
 app = Flask(__name__)
-Swagger(app)
 
-# Configure the logger
+# Handlers are set up by configure_logging (src.utils.logger)
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # Logs will be printed to the console
-    ]
-)
 
 GITHUB_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET', '')
 
 # Placeholder for the ReviewAgent instance and the review label
-review_agent: PRReviewAgent = None
+review_agent: "PRReviewAgent" = None
 review_label = "ready-to-review"  # Default label
 
-def set_review_agent(agent: PRReviewAgent):
+# Optional scheduler running reviews cheapest first; without it reviews run on the request thread
+review_scheduler: "ReviewScheduler" = None
+respond_async = False
+
+def enable_swagger():
+    """
+    Serve the Swagger UI at /apidocs.
+
+    flasgger and its dependencies take longer to import than Flask itself, so they are only
+    imported when the UI is enabled (swagger.enabled in config.yaml or SWAGGER_ENABLED).
+    """
+    from flasgger import Swagger
+    Swagger(app)
+    logger.info("Swagger UI enabled at /apidocs")
+
+def set_review_agent(agent: "PRReviewAgent"):
     global review_agent
     review_agent = agent
 
@@ -32,6 +46,19 @@ def set_review_label(label):
     global review_label
     review_label = label
 
+def set_review_scheduler(scheduler: "ReviewScheduler", respond_immediately=False):
+    """
+    Queue reviews on a scheduler instead of running them on the request thread.
+
+    Args:
+        scheduler (ReviewScheduler): The scheduler, or None to review on the request thread.
+        respond_immediately (bool): Answer 202 with a job status URL as soon as the review is queued,
+                                    instead of waiting for it to complete.
+    """
+    global review_scheduler, respond_async
+    review_scheduler = scheduler
+    respond_async = respond_immediately
+
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """
@@ -53,21 +80,71 @@ def webhook():
         description: Invalid signature
     """
 
+    # Record the delivery for replay (WEBHOOK_RECORD_PATH) before anything can reject it
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.record(request.headers, request.get_data())
+
     # Process the incoming webhook payload
     event = request.headers.get('X-GitHub-Event')
-    payload = request.json
+    delivery_id = request.headers.get('X-GitHub-Delivery')
+    with WEBHOOK_LATENCY.labels(event=event or 'unknown').time(), \
+            start_trace("webhook", delivery_id=delivery_id, event=event or 'unknown'):
+        payload = request.json
 
-    logger.info(f"Received GitHub event: {event}")
-    logger.debug(f"Payload: {payload}")
+        logger.info(f"Received GitHub event: {event}")
+        # Lazy %-formatting: the payload is only rendered if the record is kept, and then bounded
+        logger.debug("Payload: %s", payload)
 
-    if event == 'pull_request':
-        action = payload.get('action')
-        logger.info(f"Pull request action: {action}")
-        if action in ['opened', 'synchronize', 'reopened']:
-            return handle_pull_request(payload)
+        if event == 'pull_request':
+            action = payload.get('action')
+            logger.info(f"Pull request action: {action}")
+            if action in ['opened', 'synchronize', 'reopened']:
+                return handle_pull_request(payload)
 
-    logger.info("Event not processed")
-    return 'Event not processed', 200
+        logger.info("Event not processed")
+        return 'Event not processed', 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus Metrics Endpoint
+    Exposes review pipeline metrics in the Prometheus text exposition format.
+    ---
+    tags:
+      - Monitoring
+    responses:
+      200:
+        description: Metrics rendered successfully
+    """
+    payload, content_type = render_metrics()
+    return Response(payload, mimetype=content_type)
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Review Job Status Endpoint
+    Reports the status of a review queued by the review scheduler.
+    ---
+    tags:
+      - Webhook
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: The job is queued, running, or finished (status success or failure)
+      404:
+        description: Unknown job
+    """
+    job = review_scheduler.get_job(job_id) if review_scheduler is not None else None
+    if job is None:
+        return jsonify({'status': 'unknown', 'message': 'Job not found'}), 404
+    return jsonify(job.to_dict()), 200
 
 
 def handle_pull_request(payload):
@@ -85,10 +162,26 @@ def handle_pull_request(payload):
         logger.info(f"Pull request #{pr_number} does not have the label '{review_label}'. Skipping review.")
         return jsonify({'status': 'skipped', 'message': f'Pull request does not have the label "{review_label}".'}), 200
 
+    # Queue the review so small pull requests are not stuck behind large ones
+    if review_scheduler is not None:
+        job = review_scheduler.submit(payload, delivery_id=request.headers.get('X-GitHub-Delivery'))
+        if respond_async:
+            status_url = url_for('job_status', job_id=job.job_id)
+            response = jsonify({'status': 'queued', 'job_id': job.job_id, 'status_url': status_url})
+            response.headers['Location'] = status_url
+            return response, 202
+        review_response = job.future.result()
+        logger.info(f"Review completed for pull request #{pr_number} with response: {review_response}")
+        return jsonify(review_response), 200 if review_response['status'] == 'success' else 500
+
     # Perform the review with the review agent
     if review_agent is not None:
         logger.info(f"Performing review on pull request #{pr_number} for repository '{repo_name}'.")
-        review_response = review_agent.perform_code_review(repo_name, pr_number)
+        REVIEW_QUEUE_DEPTH.inc()
+        try:
+            review_response = review_agent.perform_code_review(repo_name, pr_number)
+        finally:
+            REVIEW_QUEUE_DEPTH.dec()
         logger.info(f"Review completed for pull request #{pr_number} with response: {review_response}")
 
         if review_response['status'] == 'success':
@@ -101,4 +194,7 @@ def handle_pull_request(payload):
         return jsonify({'status': 'failure', 'message': 'Review agent not initialized'}), 500
 
 if __name__ == "__main__":
+    from src.utils.logger import configure_logging
+    configure_logging(log_level="DEBUG")
+    enable_swagger()
     app.run(debug=True, port=8888)
@@ -0,0 +1,139 @@
+import os
+import gzip
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Headers needed to replay a delivery; others (e.g. proxy headers) are not recorded
+RECORDED_HEADER_PREFIXES = ("x-github-", "x-hub-")
+RECORDED_HEADERS = ("content-type", "user-agent")
+
+_STOP = object()
+
+
+class WebhookRecorder:
+    def __init__(self, path, queue_size=1000):
+        """
+        Append webhook deliveries (headers and raw body) to a JSON lines file, gzip-compressed if the
+        path ends with '.gz'.
+
+        Deliveries are written by a background thread, so recording adds no disk I/O to the request.
+        When the writer falls queue_size deliveries behind, further deliveries are not recorded.
+
+        Args:
+            path (str): The recording file; new deliveries are appended.
+            queue_size (int): Deliveries waiting to be written.
+        """
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(path, 'ab') if path.endswith('.gz') else open(path, 'ab')
+        self._thread = threading.Thread(target=self._write, name="webhook-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, headers, body, received_at=None):
+        """
+        Queue a delivery for recording.
+
+        Args:
+            headers (Mapping): The request headers.
+            body (bytes): The raw request body.
+            received_at (float): When the delivery arrived (time.time()), defaults to now.
+        """
+        entry = (received_at or time.time(),
+                 {name: value for name, value in headers.items() if _is_recorded(name)},
+                 body)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Webhook recording queue is full; {self.dropped} deliveries not recorded")
+
+    def close(self):
+        """
+        Write the queued deliveries and close the file.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+    def _write(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            received_at, headers, body = entry
+            line = json.dumps({'time': received_at, 'headers': headers,
+                               'body': body.decode('utf-8', errors='replace')}, separators=(',', ':'))
+            try:
+                self._file.write(line.encode('utf-8') + b'\n')
+                self._file.flush()
+            except OSError as e:
+                logger.error(f"Could not record webhook delivery to '{self.path}': {str(e)}")
+
+
+def _is_recorded(name):
+    name = name.lower()
+    return name in RECORDED_HEADERS or name.startswith(RECORDED_HEADER_PREFIXES)
+
+
+def read_recording(path):
+    """
+    Read the deliveries of a recording in arrival order.
+
+    Args:
+        path (str): A file written by WebhookRecorder.
+
+    Yields:
+        dict: {'time': float, 'headers': dict, 'body': bytes} for every delivery.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as recording:
+        for line in recording:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            entry['body'] = entry['body'].encode('utf-8')
+            yield entry
+
+
+_recorder = None
+
+
+def configure_recording(config):
+    """
+    Configure the process-wide webhook recorder from the 'webhook_recording' section of the application config.
+
+    Args:
+        config (dict): The recording configuration, e.g. {'path': './recordings/webhooks.jsonl.gz'};
+                       WEBHOOK_RECORD_PATH takes precedence. Recording is off without a path.
+    """
+    global _recorder
+    config = config or {}
+    path = os.getenv('WEBHOOK_RECORD_PATH', config.get('path') or '')
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    if path:
+        _recorder = WebhookRecorder(path, config.get('queue_size', 1000))
+        logger.info(f"Recording webhook deliveries to '{path}'")
+
+
+def get_recorder():
+    return _recorder
+
+
+@atexit.register
+def _close_recorder():
+    if _recorder is not None:
+        _recorder.close()
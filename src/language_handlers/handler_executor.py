@@ -0,0 +1,287 @@
+import os
+import time
+import logging
+import threading
+import concurrent.futures
+from concurrent.futures import BrokenExecutor, Future
+from src.language_handlers import spell_dictionary
+from src.language_handlers.registry import registry
+from src.utils.config_loader import thaw
+from src.utils.metrics import SPELLCHECK_LATENCY
+from src.utils.profiling import configure_profiling, profile
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewTask:
+    """
+    A single file to check with a language handler, small enough to be sent to a worker process.
+    """
+
+    __slots__ = ("handler", "path", "content", "line_ranges", "repo_name", "extra_words", "profile_name")
+
+    def __init__(self, handler, path, content, line_ranges=None, repo_name=None, extra_words=None,
+                 profile_name=None):
+        """
+        Args:
+            handler (str): Name of the registered language handler, e.g. 'markdown'.
+            path (str): Path of the file in the repository; results are keyed by it.
+            content (str): The content of the Markdown file.
+            line_ranges (list): Inclusive (start, end) line ranges to check, or None for the whole file.
+            repo_name (str): Repository in 'owner/repo' format, selects the correction cache.
+            extra_words (frozenset): Lower-cased words treated as correctly spelled.
+            profile_name (str): Name of the profiled section, defaults to 'spell_check-<path>'.
+        """
+        self.handler = handler
+        self.path = path
+        self.content = content
+        self.line_ranges = line_ranges
+        self.repo_name = repo_name
+        self.extra_words = extra_words
+        self.profile_name = profile_name or f"spell_check-{path}"
+
+
+def run_task(task):
+    """
+    Check one file with its registered handler, loading the handler on first use in this process.
+
+    Args:
+        task (ReviewTask): The file to check.
+
+    Returns:
+        list: Review comments with 'line' and 'comment' keys.
+    """
+    handler = registry.get_handler(task.handler)
+    with profile(task.profile_name):
+        return handler.review(
+            task.content,
+            line_ranges=task.line_ranges,
+            correction_cache=spell_dictionary.get_correction_cache(task.repo_name),
+            extra_words=task.extra_words
+        )
+
+
+def merge_results(chunk_results):
+    """
+    Merge per-chunk results into comments grouped by path and ordered by line.
+
+    Args:
+        chunk_results (iterable): Lists of (path, comments, seconds) tuples.
+
+    Returns:
+        dict: Maps each path to its comments, sorted by line number.
+    """
+    merged = {}
+    for results in chunk_results:
+        for path, comments, _ in results:
+            merged.setdefault(path, []).extend(comments)
+    for comments in merged.values():
+        comments.sort(key=lambda comment: comment['line'])
+    return merged
+
+
+class InlineHandlerExecutor:
+    """
+    Runs handlers on the calling thread. This is the default backend.
+    """
+
+    def submit(self, tasks):
+        """
+        Spell check the files right away.
+
+        Args:
+            tasks (list): ReviewTask objects.
+
+        Returns:
+            Future: Already resolved with a dict mapping each path to its comments.
+        """
+        future = Future()
+        try:
+            results = [(task.path, run_task(task), None) for task in tasks]
+            future.set_result(merge_results([results]))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self):
+        pass
+
+
+class ProcessHandlerExecutor:
+    """
+    Runs handlers in a pool of worker processes so CPU-bound reviews are not serialized by the GIL.
+    """
+
+    def __init__(self, workers=None, chunk_size=4, start_method=None, spell_check_config=None,
+                 profiling_config=None):
+        """
+        Initialize the process pool. Worker processes are started on first use.
+
+        Args:
+            workers (int): Number of worker processes. Defaults to the CPU count.
+            chunk_size (int): Number of files sent to a worker in one task.
+            start_method (str): multiprocessing start method. Defaults to 'forkserver' where
+                                available, because forking a threaded web server is unsafe.
+            spell_check_config (dict): The 'spell_check' config section, applied in each worker.
+            profiling_config (dict): The 'profiling' config section, applied in each worker.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        # multiprocessing is imported here so the inline backend never loads it
+        import multiprocessing
+
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.start_method = start_method
+        self._initargs = (spell_check_config or {}, profiling_config or {})
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+
+    def _create_pool(self):
+        import multiprocessing
+
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_initialize_worker,
+            initargs=self._initargs
+        )
+
+    def submit(self, tasks):
+        """
+        Split the files into chunks and submit them to the worker processes.
+
+        Larger files are submitted first so a single big file does not end up last in the queue.
+
+        Args:
+            tasks (list): ReviewTask objects.
+
+        Returns:
+            Future: Resolves to a dict mapping each path to its comments, sorted by line.
+        """
+        ordered = sorted(tasks, key=lambda task: len(task.content), reverse=True)
+        chunks = [ordered[index:index + self.chunk_size] for index in range(0, len(ordered), self.chunk_size)]
+        chunk_futures = []
+        for chunk in chunks:
+            pool = self._pool
+            try:
+                chunk_futures.append((chunk, pool, pool.submit(_run_chunk, chunk)))
+            except BrokenExecutor:
+                chunk_futures.append((chunk, pool, None))
+
+        future = Future()
+        if not chunk_futures:
+            future.set_result({})
+            return future
+
+        remaining = [len(chunk_futures)]
+        lock = threading.Lock()
+
+        def on_chunk_done(_=None):
+            with lock:
+                remaining[0] -= 1
+                done = remaining[0] == 0
+            if not done:
+                return
+            # Done callbacks run on the pool's management thread; checking files of a dead worker
+            # there would stall the results of every other chunk, so that is done on its own thread
+            if any(_is_broken(chunk_future) for _, _, chunk_future in chunk_futures):
+                threading.Thread(target=self._resolve, args=(future, chunk_futures),
+                                 name="spellcheck-fallback", daemon=True).start()
+            else:
+                self._resolve(future, chunk_futures)
+
+        for _, _, chunk_future in chunk_futures:
+            if chunk_future is None:
+                on_chunk_done()
+            else:
+                chunk_future.add_done_callback(on_chunk_done)
+        return future
+
+    def _resolve(self, future, chunk_futures):
+        chunk_results = []
+        try:
+            for chunk, pool, chunk_future in chunk_futures:
+                try:
+                    if chunk_future is None:
+                        raise BrokenExecutor("the pool was broken when the chunk was submitted")
+                    results = chunk_future.result()
+                except BrokenExecutor:
+                    logger.error("A spell check worker process died, checking its files in the calling process")
+                    self._replace_pool(pool)
+                    results = self._run_inline(chunk)
+                for _, _, seconds in results:
+                    SPELLCHECK_LATENCY.observe(seconds)
+                chunk_results.append(results)
+            future.set_result(merge_results(chunk_results))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _replace_pool(self, broken_pool):
+        # Later reviews get a fresh pool; concurrent reviews that saw the same broken pool replace it once
+        with self._lock:
+            if self._pool is broken_pool:
+                broken_pool.shutdown(wait=False)
+                self._pool = self._create_pool()
+
+    def _run_inline(self, chunk):
+        return _run_chunk(chunk)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+def create_handler_executor(config):
+    """
+    Create the handler execution backend from the application config.
+
+    The backend is selected by the 'review' section, e.g.
+    {'executor': 'process', 'workers': 4, 'chunk_size': 4}, and can be overridden
+    with the REVIEW_EXECUTOR and REVIEW_WORKERS environment variables.
+
+    Args:
+        config (dict): The application configuration.
+
+    Returns:
+        InlineHandlerExecutor or ProcessHandlerExecutor: The configured backend.
+    """
+    config = config or {}
+    review_config = config.get('review') or {}
+    backend = os.getenv('REVIEW_EXECUTOR', review_config.get('executor') or 'inline').lower()
+    if backend == 'inline':
+        return InlineHandlerExecutor()
+    if backend != 'process':
+        raise ValueError(f"Unknown review executor '{backend}', expected 'inline' or 'process'")
+
+    workers = os.getenv('REVIEW_WORKERS', review_config.get('workers'))
+    executor = ProcessHandlerExecutor(
+        workers=int(workers) if workers else None,
+        chunk_size=int(review_config.get('chunk_size', 4)),
+        start_method=review_config.get('start_method'),
+        spell_check_config=thaw(config.get('spell_check')),
+        profiling_config=thaw(config.get('profiling'))
+    )
+    logger.info(f"Spell checking in {executor.workers} worker processes ({executor.start_method})")
+    return executor
+
+
+def _is_broken(chunk_future):
+    return chunk_future is None or (not chunk_future.cancelled()
+                                    and isinstance(chunk_future.exception(), BrokenExecutor))
+
+
+def _initialize_worker(spell_check_config, profiling_config):
+    spell_dictionary.configure_correction_cache(spell_check_config)
+    configure_profiling(profiling_config)
+    spell_dictionary.preload()
+
+
+def _run_chunk(tasks):
+    results = []
+    for task in tasks:
+        start = time.perf_counter()
+        comments = run_task(task)
+        results.append((task.path, comments, time.perf_counter() - start))
+    return results
@@ -0,0 +1,230 @@
+import re
+
+PROSE = "prose"
+CODE_FENCE = "code_fence"
+TABLE = "table"
+FRONT_MATTER = "front_matter"
+HTML = "html"
+BLANK = "blank"
+
+# Kinds whose text is natural language and worth spell checking
+TEXT_KINDS = frozenset((PROSE, TABLE))
+
+_FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_TABLE_DELIMITER_PATTERN = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+_HTML_BLOCK_TAGS = (
+    "address|article|aside|blockquote|body|center|details|dialog|dd|div|dl|dt|fieldset|figcaption|figure|"
+    "footer|form|h[1-6]|head|header|hr|html|iframe|legend|li|main|menu|nav|ol|p|picture|pre|script|section|"
+    "style|summary|table|tbody|td|tfoot|th|thead|tr|ul"
+)
+# HTML blocks: comments, processing instructions, block-level tags, or a line holding a single complete tag
+_HTML_BLOCK_PATTERN = re.compile(
+    r'^ {0,3}(?:<!--|<\?|<![A-Za-z]|<!\[CDATA\['
+    r'|</?(?:' + _HTML_BLOCK_TAGS + r')(?:\s|/?>|$)'
+    r'|</?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>]*)?/?>\s*$)',
+    re.IGNORECASE
+)
+_HTML_COMMENT_END = "-->"
+
+# Inline constructs that are masked out of text lines before tokenizing
+_INLINE_PATTERN = re.compile(
+    r'(`+).*?\1'                               # inline code spans
+    r'|<(?:https?|ftp|mailto):[^>\s]*>'         # autolinks
+    r'|\b(?:https?|ftp)://[^\s<>()]+'           # bare URLs
+    r'|\bwww\.[^\s<>()]+'                       # bare www. links
+    r'|\]\([^)\s]*(?:\s+"[^"]*")?\)'            # inline link and image targets
+    r'|\]\[[^\]]*\]'                            # reference link labels
+    r'|^\s{0,3}\[[^\]]+\]:\s*\S+.*$'            # link reference definitions
+    r'|</?[A-Za-z][^<>]*>'                      # inline HTML tags
+    r'|&#?[A-Za-z0-9]+;'                        # HTML entities
+)
+
+
+class Block:
+    """
+    A contiguous range of lines of the same kind.
+    """
+
+    __slots__ = ("kind", "start_line", "end_line")
+
+    def __init__(self, kind, start_line, end_line):
+        self.kind = kind
+        self.start_line = start_line
+        self.end_line = end_line
+
+    def __repr__(self):
+        return f"Block({self.kind!r}, {self.start_line}, {self.end_line})"
+
+    def __eq__(self, other):
+        return (isinstance(other, Block) and
+                (self.kind, self.start_line, self.end_line) == (other.kind, other.start_line, other.end_line))
+
+
+class MarkdownDocument:
+    def __init__(self, text):
+        """
+        Parse a Markdown document into line-range blocks in a single pass.
+
+        Lines are classified as prose, fenced code, tables, front matter, HTML blocks or blank lines.
+        Indented code blocks are treated as prose, because indented prose is common in the documents
+        this reviewer sees and is worth checking.
+
+        Args:
+            text (str): The content of the Markdown file.
+        """
+        self.lines = text.splitlines()
+        self.line_kinds = self._classify(self.lines)
+        self.blocks = self._group(self.line_kinds)
+
+    def kind(self, line_number):
+        """
+        Return the kind of a 1-based line number.
+        """
+        return self.line_kinds[line_number - 1]
+
+    def iter_blocks(self, kinds=None):
+        """
+        Iterate over blocks, optionally restricted to the given kinds.
+
+        Args:
+            kinds (iterable): Kinds to include, e.g. TEXT_KINDS. Defaults to all kinds.
+        """
+        for block in self.blocks:
+            if kinds is None or block.kind in kinds:
+                yield block
+
+    def block_text(self, block):
+        """
+        Return the raw text of a block.
+        """
+        return "\n".join(self.lines[block.start_line - 1:block.end_line])
+
+    def text_line_numbers(self, line_numbers=None):
+        """
+        Filter line numbers down to lines containing natural-language text.
+
+        Args:
+            line_numbers (iterable): Ascending 1-based line numbers. Defaults to every line.
+
+        Returns:
+            generator: The line numbers whose kind is in TEXT_KINDS.
+        """
+        if line_numbers is None:
+            line_numbers = range(1, len(self.lines) + 1)
+        line_kinds = self.line_kinds
+        for line_number in line_numbers:
+            if line_kinds[line_number - 1] in TEXT_KINDS:
+                yield line_number
+
+    def prose_text(self, line_number):
+        """
+        Return a text line with inline code, URLs, link targets and inline HTML replaced by spaces.
+
+        Args:
+            line_number (int): The 1-based line number.
+
+        Returns:
+            str: The masked line, with the same length as the original.
+        """
+        line = self.lines[line_number - 1]
+        if '`' not in line and '<' not in line and '](' not in line and '][' not in line \
+                and '://' not in line and 'www.' not in line and '&' not in line and ']:' not in line:
+            return line
+        return _INLINE_PATTERN.sub(lambda match: " " * len(match.group(0)), line)
+
+    @staticmethod
+    def _classify(lines):
+        kinds = [PROSE] * len(lines)
+        line_count = len(lines)
+        index = 0
+
+        # Front matter must start on the first line
+        if line_count and lines[0].rstrip() in ("---", "+++"):
+            delimiter = lines[0].rstrip()
+            closing = ("---", "...") if delimiter == "---" else ("+++",)
+            for end in range(1, line_count):
+                if lines[end].rstrip() in closing:
+                    for position in range(end + 1):
+                        kinds[position] = FRONT_MATTER
+                    index = end + 1
+                    break
+
+        fence = None
+        html_until_comment_end = False
+        in_html = False
+        in_table = False
+        while index < line_count:
+            line = lines[index]
+            stripped = line.strip()
+
+            if fence is not None:
+                kinds[index] = CODE_FENCE
+                match = _FENCE_PATTERN.match(line)
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) \
+                        and not line[match.end():].strip():
+                    fence = None
+                index += 1
+                continue
+
+            if html_until_comment_end:
+                kinds[index] = HTML
+                if _HTML_COMMENT_END in line:
+                    html_until_comment_end = False
+                index += 1
+                continue
+
+            if not stripped:
+                kinds[index] = BLANK
+                in_html = in_table = False
+                index += 1
+                continue
+
+            if in_html:
+                kinds[index] = HTML
+                index += 1
+                continue
+
+            match = _FENCE_PATTERN.match(line)
+            if match:
+                fence = match.group(1)
+                kinds[index] = CODE_FENCE
+                in_table = False
+                index += 1
+                continue
+
+            if _HTML_BLOCK_PATTERN.match(line):
+                kinds[index] = HTML
+                in_table = False
+                if stripped.startswith("<!--"):
+                    html_until_comment_end = _HTML_COMMENT_END not in stripped[4:]
+                else:
+                    in_html = True
+                index += 1
+                continue
+
+            if in_table and '|' in line:
+                kinds[index] = TABLE
+                index += 1
+                continue
+            in_table = False
+
+            if '|' in line and index + 1 < line_count and '-' in lines[index + 1] \
+                    and _TABLE_DELIMITER_PATTERN.match(lines[index + 1]):
+                kinds[index] = TABLE
+                kinds[index + 1] = TABLE
+                in_table = True
+                index += 2
+                continue
+
+            index += 1
+        return kinds
+
+    @staticmethod
+    def _group(line_kinds):
+        blocks = []
+        for index, kind in enumerate(line_kinds, start=1):
+            if blocks and blocks[-1].kind == kind:
+                blocks[-1].end_line = index
+            else:
+                blocks.append(Block(kind, index, index))
+        return blocks
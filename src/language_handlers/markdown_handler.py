@@ -1,67 +1,70 @@
 import re
 import logging
-from spellchecker import SpellChecker
+from src.language_handlers.markdown_document import MarkdownDocument
+from src.language_handlers.spell_dictionary import get_correction_cache, get_spell_checker
+from src.utils.metrics import SPELLCHECK_LATENCY
 
 logger = logging.getLogger(__name__)
 
+_WORD_PATTERN = re.compile(r'\b\w+\b')
+_UPPERCASE_PATTERN = re.compile(r'[A-Z]')
+_CAMEL_CASE_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z]|[A-Z]$|$)|[A-Z]?[a-z]+')
+
 class MarkdownHandler:
     def __init__(self):
-        self.spell = SpellChecker()
-        known_words = ['Markdown', 'ibm', 'github', 'watsonx', 'llm','llms', 'pr', 'prs', 'app', 'codebase', 'multi', 'golang', 'postgres',
-                       'postgresql', 'api', 'apis', 'webhook', 'webhooks', 'json', 'yaml', 'yml', 'cli', 'docker', 'github', 'git',
-                       'jenkins', 'kubernetes', 'slack', 'python', 'java', 'javascript', 'nodejs', 'node', 'js', 'ruby', 'rails', 'php',
-                       'csharp', 'c#', 'dotnet', 'dot', 'net', 'c++', 'cpp', 'objective-c', 'swift', 'go', 'golang', 'rust', 'scala', 'kotlin', 'typescript',
-                       'html', 'css', 'scss', 'sass', 'less', 'elasticsearch', 'elk', 'logstash', 'kibana', 'prometheus', 'grafana', 'influxdb', 'telegraf', 'mongodb',
-                       'cloudant', 'couchdb', 'cassandra', 'redis', 'rabbitmq', 'kafka', 'activemq', 'nats', 'mqtt', 'mqtt', 'postgresql', 'mysql', 'mariadb', 'sqlite',
-                       'mssql', 'oracle', 'db2', 'sybase', 'informix', 'teradata', 'snowflake', 'redshift', 'bigquery', 'athena', 'dynamodb', 'cosmosdb', 'couchbase', 'riak',
-                       'hbase', 'cassandra', 'neo4j', 'arangodb', 'orientdb', 'dgraph', 'fauna', 'faunadb', 'cockroachdb', 'spanner', 'firestore', 'firebasedb', 'firebase', 'realm',
-                       'etc', 'py', 'md', 'yaml', 'yml', 'json', 'toml', 'ini', 'xml', 'html', 'css', 'scss', 'sass', 'less', 'src', 'dist', 'build', 'bin', 'lib', 'node_modules',
-                       'db', 'config', 'metadata', 'plaintext', 'watson', 'sql', 'api', 'apis', 'cli', 'sdk', 'dev', 'prod', 'test', 'qa', 'uat', 'prod','txt','readme','utils','util',
-                       'ruamel', 'subfolder', 'subfolders', 'subdirectory', 'subdirectories', 'submodule', 'submodules', 'subrepo', 'subrepos', 'subrepository', 'subrepositories',
-                       'runtime', 'runtimes', 'env', 'envs', 'environment', 'environments', 'config', 'configs', 'configuration', 'configurations', 'param', 'params', 'parameter',
-                       'hardcoded', 'hardcode', 'hardcoding', 'hardcodes', 'softcoded', 'softcode', 'softcoding', 'softcodes', 'variable', 'variables', 'var', 'vars', 'constant',]
-        for word in known_words:
-            self.spell.word_frequency.add(word)
-
-    def review(self, file_content):
+        # The dictionary is built once per process and shared by every handler
+        self.spell = get_spell_checker()
+
+    @SPELLCHECK_LATENCY.time()
+    def review(self, file_content, line_ranges=None, correction_cache=None, extra_words=None):
         """
         Perform a spell check on the provided Markdown file content.
 
+        Only prose and table text is checked: code fences, front matter, HTML blocks,
+        inline code, URLs and link targets are skipped. The document is tokenized once,
+        the unique tokens are checked against the dictionary in a single call and each
+        unknown word is corrected only once, however often it appears.
+
         :param file_content: The content of the Markdown file.
+        :param line_ranges: Optional iterable of inclusive (start, end) line ranges to check.
+                            Lines outside the ranges are not tokenized. Defaults to the whole file.
+        :param correction_cache: Optional LRUCache of corrections shared across reviews,
+                                 e.g. get_correction_cache(repo_name). Defaults to the shared cache.
+        :param extra_words: Optional set of lower-cased words treated as correctly spelled,
+                            e.g. a repository wordlist.
         :return: List of review comments.
         """
         logger.info("Starting Markdown review")
+        document = MarkdownDocument(file_content)
+        line_numbers = document.text_line_numbers(_iter_line_numbers(line_ranges, len(document.lines)))
+        line_tokens = self._tokenize(document, line_numbers)
+
+        unique_tokens = set()
+        for _, tokens in line_tokens:
+            unique_tokens.update(tokens)
+        unknown_words = self.spell.unknown(unique_tokens)
+        if extra_words:
+            unknown_words -= extra_words
+
+        if correction_cache is None:
+            correction_cache = get_correction_cache()
+
         comments = []
-        lines = file_content.splitlines()
-
-        for line_number, line in enumerate(lines, start=1):
-            words = re.findall(r'\b\w+\b', line)
-            split_words = []
-            for word in words:
-                split = False
-                # Split snake_case words
-                if '_' in word:
-                    split_words.extend(word.split('_'))
-                    split = True
-                # Split kebab-case words
-                if '-' in word:
-                    split_words.extend(word.split('-'))
-                    split = True
-                # Split CamelCase words
-                if re.search(r'[A-Z]', word):
-                    split = True
-                    split_words.extend(re.findall(r'[A-Z]+(?=[A-Z][a-z]|[A-Z]$|$)|[A-Z]?[a-z]+', word))
-                # Add the original word only if it wasn't split
-                if not split:
-                    split_words.append(word)
-
-            misspelled = self.spell.unknown(split_words)
-            for word in misspelled:
-                if len(word) == 1 and word.lower() not in ('a', 'i'):
+        corrections = {}
+        for line_number, tokens in line_tokens:
+            seen = set()
+            for token in tokens:
+                word = token.lower()
+                if word in seen or word not in unknown_words:
+                    continue
+                seen.add(word)
+                if len(word) == 1 and word not in ('a', 'i'):
                     continue  # Skip single-letter words like 's', 'P', 'R'
 
-                correction = self.spell.correction(word)
-                if correction != None:
+                if word not in corrections:
+                    corrections[word] = correction_cache.get_or_compute(word, self.spell.correction)
+                correction = corrections[word]
+                if correction is not None:
                     comments.append({
                         'line': line_number,
                         'comment': f"Possible spelling mistake: '{word}'. Did you mean '{correction}'?"
@@ -72,8 +75,85 @@ class MarkdownHandler:
                         'comment': f"Is this a spelling mistake?: '{word}'"
                     })
 
+        correction_cache.save()
+
         logger.info(f"Markdown review found {len(comments)} issues.")
-        for comment in comments:
-            logger.debug(f"Comment: {comment}")
-        logger.debug(f"Markdown review complete.")
-        return comments
\ No newline at end of file
+        if logger.isEnabledFor(logging.DEBUG):
+            for comment in comments:
+                logger.debug("Comment: %s", comment)
+        logger.debug("Markdown review complete.")
+        return comments
+
+    @staticmethod
+    def _tokenize(document, line_numbers):
+        """
+        Split the selected lines into the words that should be spell checked.
+
+        snake_case, kebab-case and CamelCase words are split into their parts.
+        Splitting is memoized per distinct word, so repeated words cost one lookup.
+
+        :param document: The parsed MarkdownDocument.
+        :param line_numbers: Ascending 1-based line numbers of text lines to tokenize.
+        :return: List of (line number, tokens) tuples for lines containing words.
+        """
+        split_cache = {}
+        line_tokens = []
+        for line_number in line_numbers:
+            tokens = []
+            for word in _WORD_PATTERN.findall(document.prose_text(line_number)):
+                parts = split_cache.get(word)
+                if parts is None:
+                    parts = split_cache[word] = _split_word(word)
+                tokens.extend(parts)
+            if tokens:
+                line_tokens.append((line_number, tokens))
+        return line_tokens
+
+
+def to_line_ranges(line_numbers):
+    """
+    Collapse line numbers into sorted, inclusive (start, end) ranges.
+
+    :param line_numbers: Iterable of 1-based line numbers.
+    :return: List of (start, end) tuples.
+    """
+    ranges = []
+    for line_number in sorted(set(line_numbers)):
+        if ranges and line_number == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], line_number)
+        else:
+            ranges.append((line_number, line_number))
+    return ranges
+
+
+def _iter_line_numbers(line_ranges, line_count):
+    if line_ranges is None:
+        yield from range(1, line_count + 1)
+        return
+    previous = 0
+    for start, end in sorted(line_ranges):
+        # Clamp to the document and skip lines already covered by an overlapping range
+        for line_number in range(max(start, previous + 1, 1), min(end, line_count) + 1):
+            yield line_number
+        previous = max(previous, end)
+
+
+def _split_word(word):
+    parts = []
+    split = False
+    # Split snake_case words
+    if '_' in word:
+        parts.extend(word.split('_'))
+        split = True
+    # Split kebab-case words
+    if '-' in word:
+        parts.extend(word.split('-'))
+        split = True
+    # Split CamelCase words
+    if _UPPERCASE_PATTERN.search(word):
+        split = True
+        parts.extend(_CAMEL_CASE_PATTERN.findall(word))
+    # Keep the original word only if it wasn't split
+    if not split:
+        parts.append(word)
+    return tuple(parts)
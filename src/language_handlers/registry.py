@@ -0,0 +1,128 @@
+import logging
+import threading
+from fnmatch import fnmatchcase
+from importlib import import_module
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerRegistration:
+    """
+    A language handler and the LLM agent reviewing the same files, named by 'module:Class' strings
+    so neither is imported until a matching file is reviewed.
+    """
+
+    __slots__ = ("name", "patterns", "handler", "llm_agent")
+
+    def __init__(self, name, patterns, handler, llm_agent=None):
+        self.name = name
+        self.patterns = tuple(patterns)
+        self.handler = handler
+        self.llm_agent = llm_agent
+
+
+class HandlerRegistry:
+    def __init__(self):
+        """
+        Map file names to language handlers.
+
+        Patterns of the form '*.ext' (or '.ext') go into a suffix index, so matching a path
+        costs one dictionary lookup per dot in its file name. Any other pattern is matched
+        as a glob against the full path, and globs take precedence over suffixes.
+        """
+        self._registrations = {}
+        self._suffixes = {}
+        self._globs = []
+        self._handlers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, patterns, handler, llm_agent=None):
+        """
+        Register a language handler.
+
+        Args:
+            name (str): The handler name, e.g. 'markdown'.
+            patterns (iterable): Extensions or globs, e.g. ('*.md', 'docs/**/*.txt').
+            handler (str): The handler class as 'module:Class'. Instances must provide
+                           review(file_content, line_ranges=None, correction_cache=None, extra_words=None).
+            llm_agent (str): Optional LLM agent class as 'module:Class', constructed with the GitHubAPI.
+        """
+        registration = HandlerRegistration(name, patterns, handler, llm_agent)
+        with self._lock:
+            self._registrations[name] = registration
+            for pattern in registration.patterns:
+                suffix = _suffix_of(pattern)
+                if suffix is not None:
+                    self._suffixes[suffix] = name
+                else:
+                    self._globs.append((pattern, name))
+
+    def match(self, path):
+        """
+        Return the name of the handler for a file, or None if no handler applies.
+
+        Args:
+            path (str): The path of the file in the repository.
+        """
+        for pattern, name in self._globs:
+            if fnmatchcase(path, pattern):
+                return name
+        file_name = path.rsplit('/', 1)[-1]
+        # Longest suffix first, so '*.tar.gz' wins over '*.gz'
+        position = file_name.find('.', 1)
+        while position != -1:
+            name = self._suffixes.get(file_name[position:])
+            if name is not None:
+                return name
+            position = file_name.find('.', position + 1)
+        return None
+
+    def get(self, name):
+        return self._registrations[name]
+
+    @staticmethod
+    def load_class(target):
+        """
+        Import a 'module:Class' target. Modules are imported once and then found in sys.modules.
+        """
+        module_name, _, class_name = target.partition(':')
+        return getattr(import_module(module_name), class_name)
+
+    def get_handler(self, name):
+        """
+        Return the process-wide handler instance for a name, importing and creating it on first use.
+        """
+        handler = self._handlers.get(name)
+        if handler is None:
+            with self._lock:
+                handler = self._handlers.get(name)
+                if handler is None:
+                    handler = self.load_class(self._registrations[name].handler)()
+                    self._handlers[name] = handler
+                    logger.info(f"Loaded the {name} handler")
+        return handler
+
+    def create_llm_agent(self, name, github_api):
+        """
+        Create the LLM agent registered for a handler, or return None if it has none.
+        """
+        target = self._registrations[name].llm_agent
+        if target is None:
+            return None
+        return self.load_class(target)(github_api)
+
+
+def _suffix_of(pattern):
+    if pattern.startswith('*.'):
+        pattern = pattern[1:]
+    if pattern.startswith('.') and not any(character in pattern for character in '*?[/'):
+        return pattern
+    return None
+
+
+registry = HandlerRegistry()
+registry.register(
+    "markdown", ("*.md",),
+    handler="src.language_handlers.markdown_handler:MarkdownHandler",
+    llm_agent="src.agents.markdown_llm_agent:MarkdownLLMAgent"
+)
@@ -0,0 +1,248 @@
+import os
+import gzip
+import json
+import stat
+import hashlib
+import logging
+import pkgutil
+import tempfile
+import threading
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from spellchecker import SpellChecker
+from src.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE = "en"
+_CACHE_FORMAT_VERSION = 2
+
+# Project vocabulary that is always treated as correctly spelled
+KNOWN_WORDS = ('Markdown', 'ibm', 'github', 'watsonx', 'llm','llms', 'pr', 'prs', 'app', 'codebase', 'multi', 'golang', 'postgres',
+               'postgresql', 'api', 'apis', 'webhook', 'webhooks', 'json', 'yaml', 'yml', 'cli', 'docker', 'github', 'git',
+               'jenkins', 'kubernetes', 'slack', 'python', 'java', 'javascript', 'nodejs', 'node', 'js', 'ruby', 'rails', 'php',
+               'csharp', 'c#', 'dotnet', 'dot', 'net', 'c++', 'cpp', 'objective-c', 'swift', 'go', 'golang', 'rust', 'scala', 'kotlin', 'typescript',
+               'html', 'css', 'scss', 'sass', 'less', 'elasticsearch', 'elk', 'logstash', 'kibana', 'prometheus', 'grafana', 'influxdb', 'telegraf', 'mongodb',
+               'cloudant', 'couchdb', 'cassandra', 'redis', 'rabbitmq', 'kafka', 'activemq', 'nats', 'mqtt', 'mqtt', 'postgresql', 'mysql', 'mariadb', 'sqlite',
+               'mssql', 'oracle', 'db2', 'sybase', 'informix', 'teradata', 'snowflake', 'redshift', 'bigquery', 'athena', 'dynamodb', 'cosmosdb', 'couchbase', 'riak',
+               'hbase', 'cassandra', 'neo4j', 'arangodb', 'orientdb', 'dgraph', 'fauna', 'faunadb', 'cockroachdb', 'spanner', 'firestore', 'firebasedb', 'firebase', 'realm',
+               'etc', 'py', 'md', 'yaml', 'yml', 'json', 'toml', 'ini', 'xml', 'html', 'css', 'scss', 'sass', 'less', 'src', 'dist', 'build', 'bin', 'lib', 'node_modules',
+               'db', 'config', 'metadata', 'plaintext', 'watson', 'sql', 'api', 'apis', 'cli', 'sdk', 'dev', 'prod', 'test', 'qa', 'uat', 'prod','txt','readme','utils','util',
+               'ruamel', 'subfolder', 'subfolders', 'subdirectory', 'subdirectories', 'submodule', 'submodules', 'subrepo', 'subrepos', 'subrepository', 'subrepositories',
+               'runtime', 'runtimes', 'env', 'envs', 'environment', 'environments', 'config', 'configs', 'configuration', 'configurations', 'param', 'params', 'parameter',
+               'hardcoded', 'hardcode', 'hardcoding', 'hardcodes', 'softcoded', 'softcode', 'softcoding', 'softcodes', 'variable', 'variables', 'var', 'vars', 'constant',)
+
+_spell_checker = None
+_lock = threading.Lock()
+
+_correction_cache_size = 10000
+_correction_cache_dir = None
+# Per-repository correction caches, most recently used last; a plain dict so registry
+# lookups are not counted as correction cache hits
+_correction_caches = OrderedDict()
+_max_correction_caches = 256
+_repository_words = LRUCache("repository_wordlists", maxsize=256)
+
+
+def _cache_path():
+    try:
+        library_version = version("pyspellchecker")
+    except PackageNotFoundError:
+        library_version = "unknown"
+    fingerprint = hashlib.sha256(
+        json.dumps([_CACHE_FORMAT_VERSION, LANGUAGE, library_version, KNOWN_WORDS]).encode("utf-8")
+    ).hexdigest()[:16]
+    default_dir = os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.expanduser("~/.cache"), "watsonx-code-reviewer")
+    cache_dir = os.getenv('SPELL_DICTIONARY_CACHE_DIR', default_dir)
+    return os.path.join(cache_dir, f"spell_{LANGUAGE}_{fingerprint}.json")
+
+
+def _is_private(path):
+    """
+    Check that a path is owned by the current user and not writable by anyone else.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    status = os.stat(path)
+    return status.st_uid == os.getuid() and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _build_word_frequencies():
+    """
+    Build the merged word frequency table from the bundled dictionary and KNOWN_WORDS.
+
+    Returns:
+        dict: Lower-cased word to frequency.
+    """
+    compressed = pkgutil.get_data("spellchecker", f"resources/{LANGUAGE}.json.gz")
+    frequencies = json.loads(gzip.decompress(compressed).decode("utf-8"))
+    for word in KNOWN_WORDS:
+        word = word.lower()
+        frequencies[word] = frequencies.get(word, 0) + 1
+    return frequencies
+
+
+def _write_cache(path, frequencies):
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    if not _is_private(cache_dir):
+        raise PermissionError(f"'{cache_dir}' is writable by other users")
+    # Write to a temporary file (created with mode 0600) first so concurrent workers never read a partial cache
+    file_descriptor, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(frequencies, file, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_cache(path):
+    if not (_is_private(os.path.dirname(path)) and _is_private(path)):
+        raise PermissionError("the cache or its directory is not private to the current user")
+    with open(path, encoding="utf-8") as file:
+        frequencies = json.load(file)
+    if not isinstance(frequencies, dict):
+        raise ValueError("the cache does not hold a word frequency table")
+    return frequencies
+
+
+def load_word_frequencies():
+    """
+    Load the merged word frequency table, using the precompiled cache when available.
+
+    The cache is the merged table as uncompressed JSON, keyed by the library version and KNOWN_WORDS,
+    so the gzip-compressed JSON dictionary is only decompressed and parsed once per user. It is kept
+    in a private directory (~/.cache/watsonx-code-reviewer by default, SPELL_DICTIONARY_CACHE_DIR to
+    override) and only read when the file and directory belong to the current user and no one else
+    can write to them.
+
+    Returns:
+        dict: Lower-cased word to frequency.
+    """
+    path = _cache_path()
+    if os.path.exists(path):
+        try:
+            return _read_cache(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable spell dictionary cache '{path}': {str(e)}")
+
+    frequencies = _build_word_frequencies()
+    try:
+        _write_cache(path, frequencies)
+        logger.info(f"Wrote precompiled spell dictionary to '{path}'")
+    except OSError as e:
+        logger.warning(f"Could not write spell dictionary cache '{path}': {str(e)}")
+    return frequencies
+
+
+def get_spell_checker():
+    """
+    Return the process-wide SpellChecker, building it on first use.
+
+    The instance is shared by every MarkdownHandler and must be treated as read-only.
+
+    Returns:
+        SpellChecker: The shared spell checker.
+    """
+    global _spell_checker
+    if _spell_checker is None:
+        with _lock:
+            if _spell_checker is None:
+                spell = SpellChecker(language=None)
+                spell.word_frequency.load_json(load_word_frequencies())
+                _spell_checker = spell
+                logger.info(f"Loaded spell dictionary with {spell.word_frequency.unique_words} words")
+    return _spell_checker
+
+
+def preload():
+    """
+    Build the shared spell checker ahead of time.
+
+    Call this in the parent process before starting workers so forked workers inherit the
+    loaded dictionary through copy-on-write pages instead of each building their own. It is
+    safe to call from a background thread: other callers wait for the same load.
+    """
+    get_spell_checker()
+
+
+def configure_correction_cache(config):
+    """
+    Configure the spelling correction caches from the 'spell_check' section of the application config.
+
+    Args:
+        config (dict): e.g. {'correction_cache_size': 10000, 'correction_cache_dir': './cache/corrections'}.
+    """
+    global _correction_cache_size, _correction_cache_dir
+    config = config or {}
+    _correction_cache_size = int(os.getenv('SPELL_CORRECTION_CACHE_SIZE', config.get('correction_cache_size', 10000)))
+    _correction_cache_dir = os.getenv('SPELL_CORRECTION_CACHE_DIR', config.get('correction_cache_dir'))
+    with _lock:
+        _correction_caches.clear()
+
+
+def get_correction_cache(repo_name=None):
+    """
+    Return the spelling correction cache for a repository.
+
+    Project-specific terms recur in every pull request of a repository, so each repository
+    gets its own bounded cache, persisted to the configured directory when one is set.
+
+    Args:
+        repo_name (str): The repository in 'owner/repo' format, or None for the shared cache.
+
+    Returns:
+        LRUCache: Maps unknown words to their correction (or None when there is no suggestion).
+    """
+    key = repo_name or ""
+    with _lock:
+        cache = _correction_caches.get(key)
+        if cache is None:
+            path = None
+            if _correction_cache_dir:
+                file_name = (repo_name or "_default").replace("/", "__") + ".json"
+                path = os.path.join(_correction_cache_dir, file_name)
+            cache = LRUCache("spell_corrections", maxsize=_correction_cache_size, path=path)
+            _correction_caches[key] = cache
+            while len(_correction_caches) > _max_correction_caches:
+                _correction_caches.popitem(last=False)
+        else:
+            _correction_caches.move_to_end(key)
+    return cache
+
+
+def parse_wordlist(text):
+    """
+    Parse a repository wordlist: whitespace-separated words, with '#' starting a comment.
+
+    Args:
+        text (str): The content of the wordlist file.
+
+    Returns:
+        frozenset: The lower-cased words.
+    """
+    words = set()
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        words.update(word.lower() for word in line.split())
+    return frozenset(words)
+
+
+def get_repository_words(blob_sha, load_text):
+    """
+    Return the words of a repository wordlist, parsing each distinct blob only once.
+
+    The words are kept as an overlay on top of the shared dictionary, so the base
+    dictionary is never copied or rebuilt per repository.
+
+    Args:
+        blob_sha (str): The git blob SHA of the wordlist file.
+        load_text (callable): Returns the wordlist content; only called on a cache miss.
+
+    Returns:
+        frozenset: The lower-cased words.
+    """
+    return _repository_words.get_or_compute(blob_sha, lambda _: parse_wordlist(load_text()))
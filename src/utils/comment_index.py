@@ -0,0 +1,112 @@
+import re
+import hashlib
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_anchor(line):
+    """
+    Normalize the text of the line a comment is anchored to, so re-indentation and
+    trailing whitespace do not make the same line look different.
+    """
+    if not line:
+        return ""
+    return _WHITESPACE_PATTERN.sub(" ", line).strip()
+
+
+def anchor_from_diff_hunk(diff_hunk):
+    """
+    Get the normalized anchor line of an existing review comment.
+
+    GitHub ends the diff_hunk of a review comment with the line the comment is attached to,
+    so its last line identifies the anchor independently of line numbers and commits.
+
+    Args:
+        diff_hunk (str): The diff_hunk of a review comment.
+
+    Returns:
+        str: The normalized anchor line without its diff marker, or "" for an empty hunk.
+    """
+    if not diff_hunk:
+        return ""
+    last_line = diff_hunk.rstrip('\n').rsplit('\n', 1)[-1]
+    if last_line.startswith('@@'):
+        return ""
+    if last_line[:1] in ('+', '-', ' '):
+        last_line = last_line[1:]
+    return normalize_anchor(last_line)
+
+
+def fingerprint(body):
+    """
+    Return a short, whitespace-insensitive fingerprint of a comment body.
+    """
+    normalized = _WHITESPACE_PATTERN.sub(" ", body or "").strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class CommentIndex:
+    def __init__(self):
+        """
+        Index of the review comments of a pull request, keyed by
+        (path, normalized anchor line, body fingerprint).
+
+        Keys do not contain commit SHAs or line numbers, so a comment still matches after
+        new commits are pushed or lines above it are added or removed.
+        """
+        self._keys = set()
+        self._comments_by_path = {}
+
+    @classmethod
+    def from_review_comments(cls, comments):
+        """
+        Build the index from review comments, either PyGithub objects (PRReviewAgent.get_all_review_comments)
+        or the decoded JSON of the REST API (AsyncGitHubAPI.get_review_comments).
+
+        Args:
+            comments (iterable): Objects or dictionaries with path, diff_hunk, body and, optionally, line.
+
+        Returns:
+            CommentIndex: The populated index.
+        """
+        index = cls()
+        for comment in comments:
+            if isinstance(comment, dict):
+                path, diff_hunk, body, line = (comment.get('path'), comment.get('diff_hunk'),
+                                               comment.get('body'), comment.get('line'))
+            else:
+                path, diff_hunk, body, line = (comment.path, comment.diff_hunk, comment.body,
+                                               getattr(comment, 'line', None))
+            index.add(path, anchor_from_diff_hunk(diff_hunk), body, line=line)
+        return index
+
+    @staticmethod
+    def key(path, anchor, body):
+        return (path, normalize_anchor(anchor), fingerprint(body))
+
+    def add(self, path, anchor, body, line=None):
+        """
+        Add a comment to the index.
+
+        Args:
+            path (str): The path of the file the comment is on.
+            anchor (str): The text of the line the comment is anchored to.
+            body (str): The comment body.
+            line (int): Optional line number, only used to describe the comment in comments_for_path.
+        """
+        key = self.key(path, anchor, body)
+        if key not in self._keys:
+            self._keys.add(key)
+            self._comments_by_path.setdefault(path, []).append({'line': line, 'comment': body})
+
+    def contains(self, path, anchor, body):
+        return self.key(path, anchor, body) in self._keys
+
+    def comments_for_path(self, path):
+        """
+        Return the indexed comments of one file as {'line', 'comment'} dictionaries.
+        """
+        return list(self._comments_by_path.get(path, ()))
+
+    def __len__(self):
+        return len(self._keys)
@@ -1,10 +1,20 @@
 import os
+import glob
+import signal
+import logging
+import threading
+from types import MappingProxyType
 from ruamel.yaml import YAML
 
+logger = logging.getLogger(__name__)
+
+CONFIG_FILES = ("config.yaml", "db_config.yaml", "watsonx_models.yaml")
+
 class ConfigLoader:
     def __init__(self, config_dir="config/"):
         self.config_dir = config_dir
-        self.yaml = YAML()  # Create an instance of the YAML class from ruamel.yaml
+        # The safe loader returns plain dicts and lists and is much faster than the round-trip loader
+        self.yaml = YAML(typ='safe')
 
     def load_yaml(self, filename):
         file_path = os.path.join(self.config_dir, filename)
@@ -39,6 +49,196 @@ class ConfigLoader:
         config['models'] = models_config
         return config
 
+    def load_agent_configs(self):
+        """
+        Load every agent configuration in '<config_dir>/agents'.
+
+        Returns:
+            dict: Maps agent names (file names without '.yaml') to their configuration.
+        """
+        agent_configs = {}
+        for path in sorted(glob.glob(os.path.join(self.config_dir, "agents", "*.yaml"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'r') as file:
+                agent_configs[name] = self.yaml.load(file) or {}
+        return agent_configs
+
+    def watched_files(self):
+        return [os.path.join(self.config_dir, filename) for filename in CONFIG_FILES] + \
+            sorted(glob.glob(os.path.join(self.config_dir, "agents", "*.yaml")))
+
+
+def freeze(value):
+    """
+    Return a read-only copy of parsed YAML: mappings become MappingProxyType and lists become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    Return a mutable (and picklable) copy of a frozen configuration value.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot:
+    """
+    An immutable view of the application and agent configuration at one point in time.
+    """
+
+    __slots__ = ("config", "agents", "version", "mtimes")
+
+    def __init__(self, config, agents, version, mtimes):
+        self.config = freeze(config)
+        self.agents = freeze(agents)
+        self.version = version
+        self.mtimes = mtimes
+
+    def agent_config(self, agent_name):
+        """
+        Return the configuration of an agent, or an empty mapping if it has none.
+        """
+        return self.agents.get(agent_name, _EMPTY)
+
+
+_EMPTY = MappingProxyType({})
+_config_dir = "./config"
+_snapshot = None
+_reload_lock = threading.Lock()
+_watcher = None
+_watcher_stop = threading.Event()
+
+
+def _file_mtimes(loader):
+    mtimes = {}
+    for path in loader.watched_files():
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def _load_snapshot(config_dir, version):
+    loader = ConfigLoader(config_dir=config_dir)
+    mtimes = _file_mtimes(loader)
+    return ConfigSnapshot(loader.get_config(), loader.load_agent_configs(), version, mtimes)
+
+
+def get_config_snapshot():
+    """
+    Return the process-wide configuration snapshot, loading it on first use.
+
+    The snapshot is replaced as a whole on reload, so callers holding a reference always see
+    a consistent configuration. Read it again (it is a single global lookup) to pick up reloads.
+
+    Returns:
+        ConfigSnapshot: The current snapshot.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        with _reload_lock:
+            if _snapshot is None:
+                _set_snapshot(_load_snapshot(_config_dir, 1))
+            snapshot = _snapshot
+    return snapshot
+
+
+def _set_snapshot(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def set_config_dir(config_dir):
+    """
+    Set the directory the snapshot is loaded from and drop the current snapshot.
+    """
+    global _config_dir
+    with _reload_lock:
+        _config_dir = config_dir
+        _set_snapshot(None)
+
+
+def reload_config(force=False):
+    """
+    Re-read the configuration files and atomically swap in a new snapshot.
+
+    Args:
+        force (bool): Reload even if no file modification time changed.
+
+    Returns:
+        bool: True if a new snapshot was installed. On a parse error the old snapshot is kept.
+    """
+    with _reload_lock:
+        current = _snapshot
+        if current is not None and not force and _file_mtimes(ConfigLoader(config_dir=_config_dir)) == current.mtimes:
+            return False
+        try:
+            snapshot = _load_snapshot(_config_dir, current.version + 1 if current else 1)
+        except Exception as e:
+            logger.error(f"Keeping the current configuration, reload failed: {str(e)}")
+            return False
+        _set_snapshot(snapshot)
+    logger.info(f"Loaded configuration version {snapshot.version}")
+    return True
+
+
+def install_reload_signal_handler():
+    """
+    Reload the configuration on SIGHUP. Must be called from the main thread.
+    """
+    if not hasattr(signal, 'SIGHUP'):
+        logger.warning("SIGHUP is not available, configuration reload on signal is disabled")
+        return
+
+    def on_sighup(signum, frame):
+        # Reload outside the signal handler, which could otherwise interrupt a holder of the reload lock
+        threading.Thread(target=reload_config, kwargs={'force': True}, name="config-reload", daemon=True).start()
+
+    signal.signal(signal.SIGHUP, on_sighup)
+
+
+def start_config_watcher(interval):
+    """
+    Poll the configuration files for changes in a daemon thread and reload them when they change.
+
+    Args:
+        interval (float): Seconds between checks. Nothing is started when it is 0 or less.
+
+    Returns:
+        threading.Thread: The watcher thread, or None.
+    """
+    global _watcher
+    if interval <= 0 or _watcher is not None:
+        return _watcher
+    _watcher_stop.clear()
+
+    def watch():
+        while not _watcher_stop.wait(interval):
+            reload_config()
+
+    _watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+    _watcher.start()
+    return _watcher
+
+
+def stop_config_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher_stop.set()
+        _watcher.join()
+        _watcher = None
+
+
 # Example usage:
 if __name__ == "__main__":
     config_loader = ConfigLoader()
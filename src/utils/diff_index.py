@@ -0,0 +1,212 @@
+from collections import deque
+from difflib import SequenceMatcher
+from unidiff.patch import PatchSet
+from src.utils.lru_cache import LRUCache
+
+ADDED = "+"
+REMOVED = "-"
+CONTEXT = " "
+
+_diff_indexes = LRUCache("diff_index", maxsize=512)
+
+
+class Hunk:
+    """
+    The position of one hunk of a file patch.
+    """
+
+    __slots__ = ("source_start", "source_length", "target_start", "target_length", "section_header",
+                 "position", "start", "end")
+
+    def __init__(self, source_start, source_length, target_start, target_length, section_header, position):
+        self.source_start = source_start
+        self.source_length = source_length
+        self.target_start = target_start
+        self.target_length = target_length
+        self.section_header = section_header
+        # Diff position of the '@@' header line, counted like GitHub review comment positions
+        self.position = position
+        # Slice of DiffIndex.lines belonging to this hunk
+        self.start = 0
+        self.end = 0
+
+    def __repr__(self):
+        return (f"Hunk(-{self.source_start},{self.source_length} "
+                f"+{self.target_start},{self.target_length} @ {self.position})")
+
+
+class DiffIndex:
+    def __init__(self, patch, path):
+        """
+        Parse the patch of one file once and index it for constant-time lookups.
+
+        Args:
+            patch (str): The unified diff of the file as returned by GitHub (without file headers),
+                         or None for binary or oversized files.
+            path (str): The path of the file in the repository.
+
+        Raises:
+            UnidiffParseError: If the patch cannot be parsed.
+        """
+        self.path = path
+        self.patch_hash = hash(patch)
+        # (kind, text without line break, source line number, target line number) for every diff line
+        self.lines = []
+        self.hunks = []
+        self.added_lines = frozenset()
+        # Sorted, inclusive (start, end) ranges of the added lines
+        self.added_line_ranges = []
+        # Right-side line number -> index of its hunk, for added and context lines
+        self.line_to_hunk = {}
+        # Right-side line number -> diff position, for added and context lines
+        self.positions = {}
+        self._added_text = {}
+        self._changed_parts = None
+        if patch:
+            self._parse(patch)
+
+    def _parse(self, patch):
+        header = f'--- a/{self.path}\n+++ b/{self.path}\n'
+        patch_set = PatchSet(header + patch)
+        added_lines = set()
+        position = 0
+        for patched_file in patch_set:
+            for hunk in patched_file:
+                if self.hunks:
+                    position += 1
+                info = Hunk(hunk.source_start, hunk.source_length, hunk.target_start, hunk.target_length,
+                            hunk.section_header, position)
+                info.start = len(self.lines)
+                hunk_index = len(self.hunks)
+                for line in hunk:
+                    position += 1
+                    text = line.value.rstrip('\n')
+                    self.lines.append((line.line_type, text, line.source_line_no, line.target_line_no))
+                    # Removed lines and '\ No newline at end of file' markers have no right-side line
+                    if line.line_type not in (ADDED, CONTEXT):
+                        continue
+                    self.line_to_hunk[line.target_line_no] = hunk_index
+                    self.positions[line.target_line_no] = position
+                    if line.line_type == ADDED:
+                        added_lines.add(line.target_line_no)
+                        self._added_text[line.target_line_no] = line.value
+                info.end = len(self.lines)
+                self.hunks.append(info)
+        self.added_lines = frozenset(added_lines)
+        for line_number in sorted(added_lines):
+            if self.added_line_ranges and line_number == self.added_line_ranges[-1][1] + 1:
+                self.added_line_ranges[-1] = (self.added_line_ranges[-1][0], line_number)
+            else:
+                self.added_line_ranges.append((line_number, line_number))
+
+    def is_added(self, line_number):
+        return line_number in self.added_lines
+
+    def is_commentable(self, line_number):
+        """
+        Whether a review comment can be anchored to this right-side line, i.e. it is an added or context line.
+        """
+        return line_number in self.line_to_hunk
+
+    def hunk_for_line(self, line_number):
+        """
+        Return the Hunk containing a right-side line, or None if the line is not part of the diff.
+        """
+        index = self.line_to_hunk.get(line_number)
+        return None if index is None else self.hunks[index]
+
+    def added_text(self, line_number):
+        """
+        Return the text of an added line without its line break, or None if the line was not added.
+        """
+        value = self._added_text.get(line_number)
+        return None if value is None else value.rstrip('\n')
+
+    @property
+    def changed_text(self):
+        """
+        The added lines joined into one string, with their line breaks.
+        """
+        return ''.join(self._added_text[line_number] for line_number in sorted(self._added_text))
+
+    @property
+    def changed_parts(self):
+        """
+        The added lines that differ from the removed lines they replace.
+
+        Each added line is paired with the next unpaired removed line of the same run of
+        changes; lines that gain no new words (whitespace-only edits or removed words) are left out.
+
+        Returns:
+            list: Dictionaries with the target 'line' number and the stripped line text as 'changes'.
+        """
+        if self._changed_parts is None:
+            self._changed_parts = self._compute_changed_parts()
+        return self._changed_parts
+
+    def _compute_changed_parts(self):
+        changed_parts = []
+        removed_lines = deque()
+        for hunk in self.hunks:
+            removed_lines.clear()
+            for kind, text, _, target_line_no in self.lines[hunk.start:hunk.end]:
+                if kind == REMOVED:
+                    removed_lines.append(text)
+                elif kind == ADDED:
+                    # Pair the added line with the first unpaired removed line
+                    if removed_lines and not _adds_words(removed_lines.popleft().split(), text.split()):
+                        continue
+                    changed_parts.append({
+                        'line': target_line_no,
+                        'changes': text.strip()
+                    })
+                else:
+                    # Reset if we encounter context lines (or a no-newline marker)
+                    removed_lines.clear()
+        return changed_parts
+
+
+def _adds_words(prev_words, added_words):
+    """
+    Whether a word diff of the two lines contains inserted or replaced words.
+
+    Most pairs are decided without diffing: equal lines add nothing, while a longer added line
+    or one with a word the removed line lacks always adds words. When the removed line has no
+    repeated words, every matching block is forced, so the diff only deletes words exactly when
+    the added words appear in the removed line in the same order. The remaining pairs are
+    diffed with SequenceMatcher, so the result always matches a full word diff.
+    """
+    if prev_words == added_words:
+        return False
+    if len(added_words) > len(prev_words):
+        return True
+    prev_set = set(prev_words)
+    if not prev_set.issuperset(added_words):
+        return True
+    if len(prev_set) == len(prev_words):
+        remaining = iter(prev_words)
+        return not all(word in remaining for word in added_words)
+    matcher = SequenceMatcher(None, prev_words, added_words)
+    # Every added word covered by a matching block means the diff only deletes words
+    return sum(block.size for block in matcher.get_matching_blocks()) != len(added_words)
+
+
+def get_diff_index(path, head_sha, patch):
+    """
+    Return the DiffIndex of a file patch, parsing it only once per (path, head SHA).
+
+    Args:
+        path (str): The path of the file in the repository.
+        head_sha (str): The head commit SHA of the pull request.
+        patch (str): The unified diff of the file.
+
+    Returns:
+        DiffIndex: The cached or newly built index.
+    """
+    key = (path, head_sha)
+    index = _diff_indexes.get(key, None)
+    # The same head can be diffed against a moved base, so the patch must match too
+    if index is None or index.patch_hash != hash(patch):
+        index = DiffIndex(patch, path)
+        _diff_indexes.put(key, index)
+    return index
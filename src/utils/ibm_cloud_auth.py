@@ -1,3 +1,4 @@
+import os
 import requests
 import logging
 
@@ -13,7 +14,7 @@ def get_ibm_bearer_token(api_key):
     Returns:
         str: The bearer token, if successful.
     """
-    url = "https://iam.cloud.ibm.com/identity/token"
+    url = os.getenv('IBM_IAM_URL', "https://iam.cloud.ibm.com/identity/token")
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "Accept": "application/json"
@@ -0,0 +1,182 @@
+import os
+import glob
+import hashlib
+import logging
+import subprocess
+
+from src.utils.raw_diff import split_raw_diff
+
+logger = logging.getLogger(__name__)
+
+PATCH_PATTERNS = ("*.patch", "*.diff")
+CHUNK_SIZE = 64 * 1024
+
+
+class LocalChange:
+    """
+    A change reviewed without GitHub: a patch file or a range of commits in a local git repository.
+    """
+
+    __slots__ = ("name", "source", "head", "_read_diff", "_read_file")
+
+    def __init__(self, name, source, head, read_diff, read_file=None):
+        """
+        Args:
+            name (str): Identifies the change in the output, e.g. the patch file name or 'v1.0..v1.1'.
+            source (str): The patch directory or repository the change comes from.
+            head (str): Identifies the reviewed version, used as the key of cached diff indexes.
+            read_diff (callable): Returns an iterable of byte chunks of the git-style diff.
+            read_file (callable): Optional, returns the content of a file in the reviewed version, or None.
+        """
+        self.name = name
+        self.source = source
+        self.head = head
+        self._read_diff = read_diff
+        self._read_file = read_file
+
+    def iter_patches(self, wanted, max_file_bytes=None):
+        """
+        Yield the per-file patches of the change, like the patch attribute of pull request files.
+
+        Args:
+            wanted (callable): Called with a file path, returns whether its patch should be kept.
+            max_file_bytes (int): Optional size cap per file patch.
+
+        Yields:
+            tuple: (path, patch); deleted and binary files are skipped.
+        """
+        yield from split_raw_diff(self._read_diff(), wanted, max_file_bytes=max_file_bytes)
+
+    def read_file(self, path):
+        """
+        Return the content of a file in the reviewed version, or None if it is not available.
+        """
+        if self._read_file is None:
+            return None
+        return self._read_file(path)
+
+
+def content_from_patch(diff_index):
+    """
+    Rebuild the reviewed version of a file from its patch when the full content is not available.
+
+    Added and context lines keep their line numbers; lines outside the hunks are left empty.
+
+    Args:
+        diff_index (DiffIndex): The parsed patch.
+
+    Returns:
+        str: The partial file content.
+    """
+    lines = {target: text for _, text, _, target in diff_index.lines if target is not None}
+    return ''.join(lines.get(line_number, '') + '\n' for line_number in range(1, max(lines, default=0) + 1))
+
+
+def iter_patch_dir(patch_dir, source_dir=None):
+    """
+    Yield a LocalChange for every '*.patch' and '*.diff' file of a directory, in name order.
+
+    Patches must be in git format ('diff --git' headers), e.g. from 'git diff' or 'git format-patch'.
+
+    Args:
+        patch_dir (str): The directory of patch files.
+        source_dir (str): Optional checkout of the patched version to read full file contents from;
+                          without it, contents are rebuilt from the hunks.
+    """
+    paths = sorted({path for pattern in PATCH_PATTERNS for path in glob.glob(os.path.join(patch_dir, pattern))})
+    if not paths:
+        logger.warning(f"No patch files found in '{patch_dir}'")
+    read_file = _directory_reader(source_dir) if source_dir else None
+    for path in paths:
+        with open(path, 'rb') as patch_file:
+            digest = hashlib.sha1(patch_file.read()).hexdigest()
+        yield LocalChange(os.path.relpath(path, patch_dir), patch_dir, digest,
+                          lambda path=path: _read_chunks(path), read_file)
+
+
+def iter_git_changes(repo_dir, ranges, per_commit=False):
+    """
+    Yield a LocalChange for every commit range of a local git repository.
+
+    Args:
+        repo_dir (str): The repository.
+        ranges (list): 'base..head' ranges, or single commits reviewed against their first parent.
+        per_commit (bool): Review every commit of a range separately instead of the range as a whole.
+    """
+    for revision_range in ranges:
+        if '..' not in revision_range:
+            yield _git_commit_change(repo_dir, revision_range)
+        elif per_commit:
+            for commit in git(repo_dir, 'rev-list', '--reverse', revision_range).split():
+                yield _git_commit_change(repo_dir, commit)
+        else:
+            base, _, head = revision_range.partition('..')
+            head_sha = rev_parse(repo_dir, head or 'HEAD')
+            base_sha = rev_parse(repo_dir, base)
+            yield LocalChange(revision_range, repo_dir, head_sha,
+                              lambda base_sha=base_sha, head_sha=head_sha: _git_stream(
+                                  repo_dir, 'diff', '--no-color', '--no-ext-diff', '-M', base_sha, head_sha),
+                              _git_file_reader(repo_dir, head_sha))
+
+
+def _git_commit_change(repo_dir, commit):
+    sha = rev_parse(repo_dir, commit)
+    # diff-tree compares with the first parent, or with the empty tree for a root commit
+    return LocalChange(sha[:12], repo_dir, sha,
+                       lambda: _git_stream(repo_dir, 'diff-tree', '-p', '-M', '--root', '--no-commit-id',
+                                           '--no-color', '--no-ext-diff', sha),
+                       _git_file_reader(repo_dir, sha))
+
+
+def git(repo_dir, *args):
+    """
+    Run a git command in a repository and return its standard output.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    return subprocess.run(['git', '-C', repo_dir, *args], capture_output=True, text=True, check=True).stdout
+
+
+def rev_parse(repo_dir, revision):
+    return git(repo_dir, 'rev-parse', '--verify', f'{revision}^{{commit}}').strip()
+
+
+def _git_stream(repo_dir, *args):
+    """
+    Stream the output of a git command in chunks, so large diffs are not held in memory.
+    """
+    process = subprocess.Popen(['git', '-C', repo_dir, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        yield from iter(lambda: process.stdout.read(CHUNK_SIZE), b'')
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        # A consumer that stops early closes the pipe, which may end git with SIGPIPE
+        if process.wait() > 0:
+            raise subprocess.CalledProcessError(process.returncode, ['git', *args], stderr=stderr)
+
+
+def _git_file_reader(repo_dir, sha):
+    def read_file(path):
+        result = subprocess.run(['git', '-C', repo_dir, 'show', f'{sha}:{path}'], capture_output=True)
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode('utf-8', errors='replace')
+    return read_file
+
+
+def _directory_reader(source_dir):
+    def read_file(path):
+        try:
+            with open(os.path.join(source_dir, path), 'rb') as source_file:
+                return source_file.read().decode('utf-8', errors='replace')
+        except OSError:
+            return None
+    return read_file
+
+
+def _read_chunks(path):
+    with open(path, 'rb') as patch_file:
+        yield from iter(lambda: patch_file.read(CHUNK_SIZE), b'')
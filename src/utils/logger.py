@@ -0,0 +1,235 @@
+import os
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import reprlib
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.utils.metrics import LOG_RECORDS_DROPPED
+from src.utils.tracing import current_trace_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_lock = threading.Lock()
+
+
+class _BoundedArgument:
+    """
+    A log argument replaced by its bounded text, so a huge payload is never rendered in full.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    __repr__ = __str__
+
+
+class AsyncQueueHandler(QueueHandler):
+    def __init__(self, log_queue, max_field_chars=2000):
+        """
+        Hand log records to a QueueListener instead of writing them on the calling thread.
+
+        The standard QueueHandler formats every message before enqueueing it. This one only
+        replaces container arguments by a bounded repr (reprlib) and truncates long strings, so formatting
+        happens on the listener thread and large payloads cost the caller a bounded amount
+        of work. When the queue is full the record is dropped and counted in
+        log_records_dropped_total rather than blocking the request.
+
+        Args:
+            log_queue (queue.Queue): The queue shared with the listener.
+            max_field_chars (int): Maximum length of a string argument or argument repr.
+        """
+        super().__init__(log_queue)
+        self.max_field_chars = max_field_chars
+        self._repr = reprlib.Repr()
+        self._repr.maxstring = max_field_chars
+        self._repr.maxother = max_field_chars
+        self._repr.maxlevel = 4
+        self._repr.maxdict = self._repr.maxlist = self._repr.maxtuple = self._repr.maxset = 20
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if isinstance(record.args, tuple):
+            record.args = tuple(self._bound(argument) for argument in record.args)
+        elif isinstance(record.args, dict):
+            if '%(' in str(record.msg):
+                record.args = {key: self._bound(value) for key, value in record.args.items()}
+            else:
+                # logger.debug("Payload: %s", payload) with a dict payload: LogRecord unwraps it into args
+                record.args = (self._bound(record.args),)
+        if record.exc_info:
+            # Tracebacks reference frames of the calling thread; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.trace_id = current_trace_id()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def _bound(self, argument):
+        if argument is None or isinstance(argument, (bool, int, float)):
+            return argument
+        if isinstance(argument, (dict, list, tuple, set, frozenset)):
+            return _BoundedArgument(self._repr.repr(argument))
+        # Exceptions, paths and other objects are logged with str(), like the standard handler does
+        text = argument if isinstance(argument, str) else str(argument)
+        if len(text) <= self.max_field_chars:
+            return argument
+        return _BoundedArgument(truncate(text, self.max_field_chars))
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, debug_sample_rate=1.0):
+        """
+        Keep only a fraction of DEBUG records; records of other levels always pass.
+
+        Args:
+            debug_sample_rate (float): Fraction of DEBUG records to keep, from 0.0 to 1.0.
+        """
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.debug_sample_rate >= 1.0:
+            return True
+        return random.random() < self.debug_sample_rate
+
+
+class TruncatingFilter(logging.Filter):
+    def __init__(self, max_message_chars=10000):
+        """
+        Truncate formatted messages, e.g. f-strings that embed a payload, before they are written.
+
+        Args:
+            max_message_chars (int): Maximum length of a message.
+        """
+        super().__init__()
+        self.max_message_chars = max_message_chars
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_message_chars:
+            record.msg = truncate(message, self.max_message_chars)
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+def configure_logging(config=None, log_level=None):
+    """
+    Route all logging through a queue to a background listener thread.
+
+    Request threads only enqueue records; the listener formats them (as text or JSON) and
+    writes them to the console and, optionally, a file. Calling this again replaces the
+    previous configuration.
+
+    Args:
+        config (dict): The 'logging' section of config.yaml:
+                       format ('text' or 'json', LOG_FORMAT), file (path or None),
+                       console (bool), queue_size, max_field_chars, max_message_chars
+                       and debug_sample_rate.
+        log_level (str): The root log level, e.g. the top-level log_level (LOG_LEVEL takes precedence).
+
+    Returns:
+        QueueListener: The running listener.
+    """
+    global _listener
+    config = config or {}
+    level = os.getenv('LOG_LEVEL', log_level or config.get('level') or 'INFO').upper()
+    log_format = os.getenv('LOG_FORMAT', config.get('format', 'text')).lower()
+    if log_format not in ('text', 'json'):
+        raise ValueError(f"Unknown log format '{log_format}', expected 'text' or 'json'")
+
+    formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+    truncating_filter = TruncatingFilter(config.get('max_message_chars', 10000))
+    handlers = []
+    if config.get('console', True):
+        handlers.append(logging.StreamHandler())
+    if config.get('file'):
+        handlers.append(logging.FileHandler(config['file']))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(truncating_filter)
+
+    log_queue = queue.Queue(maxsize=config.get('queue_size', 10000))
+    queue_handler = AsyncQueueHandler(log_queue, config.get('max_field_chars', 2000))
+    queue_handler.addFilter(SamplingFilter(config.get('debug_sample_rate', 1.0)))
+
+    with _lock:
+        _stop_listener()
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if isinstance(existing, AsyncQueueHandler):
+                root.removeHandler(existing)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """
+    Write out the queued records, stop the listener thread and detach the queue handler.
+    """
+    with _lock:
+        _stop_listener()
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if isinstance(existing, AsyncQueueHandler):
+                root.removeHandler(existing)
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
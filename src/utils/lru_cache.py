@@ -0,0 +1,137 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from src.utils.metrics import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, name, maxsize=1024, path=None):
+        """
+        Initialize a bounded, thread-safe least-recently-used cache.
+
+        Args:
+            name (str): Name reported in the cache_requests_total metric.
+            maxsize (int): Maximum number of entries kept before the least recently used is evicted.
+            path (str): Optional JSON file the cache is loaded from and saved to.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.name = name
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=MISSING):
+        """
+        Look up a key, marking it as recently used.
+
+        Args:
+            key: The key to look up.
+            default: Returned when the key is not cached. Defaults to MISSING so cached None values can be told apart.
+
+        Returns:
+            The cached value, or default.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                hit = False
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+        record_cache_access(self.name, hit)
+        return value if hit else default
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entry when the cache is full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: The key to look up.
+            compute (callable): Called with the key to produce the value on a miss.
+        """
+        value = self.get(key)
+        if value is MISSING:
+            value = compute(key)
+            self.put(key, value)
+        return value
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._dirty = True
+
+    def load(self):
+        """
+        Load entries from the cache file, keeping the most recently used ones when it exceeds maxsize.
+        """
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file '{self.path}': {str(e)}")
+            return
+        with self._lock:
+            for key, value in entries[-self.maxsize:]:
+                self._data[key] = value
+            self._dirty = False
+
+    def save(self):
+        """
+        Write the entries to the cache file, oldest first, if anything changed since the last save.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._data.items())
+            self._dirty = False
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save cache file '{self.path}': {str(e)}")
@@ -0,0 +1,96 @@
+import logging
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+# Byte-size buckets for file contents fetched from GitHub (1 KiB .. 16 MiB)
+_BYTE_BUCKETS = tuple(1024 * (4 ** exponent) for exponent in range(8))
+
+WEBHOOK_LATENCY = Histogram(
+    "webhook_request_seconds",
+    "Time spent handling a GitHub webhook delivery.",
+    ["event"],
+)
+
+GITHUB_API_LATENCY = Histogram(
+    "github_api_call_seconds",
+    "Latency of GitHub API calls made by the reviewer.",
+    ["endpoint"],
+)
+
+GITHUB_CONTENT_BYTES = Histogram(
+    "github_get_contents_bytes",
+    "Size of file contents fetched with get_contents.",
+    buckets=_BYTE_BUCKETS,
+)
+
+SPELLCHECK_LATENCY = Histogram(
+    "markdown_spellcheck_seconds",
+    "Time spent spell checking a single Markdown file.",
+)
+
+WATSONX_LATENCY = Histogram(
+    "watsonx_request_seconds",
+    "Latency of WatsonX text generation requests.",
+    ["model"],
+)
+
+WATSONX_TOKENS = Counter(
+    "watsonx_tokens_total",
+    "Tokens consumed by WatsonX text generation requests.",
+    ["model", "kind"],
+)
+
+REVIEW_QUEUE_DEPTH = Gauge(
+    "review_queue_depth",
+    "Number of pull request reviews waiting or in progress.",
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups performed by the review pipeline.",
+    ["cache", "result"],
+)
+
+
+def record_cache_access(cache_name, hit):
+    """
+    Record a cache lookup so hit ratios can be derived from cache_requests_total.
+
+    Args:
+        cache_name (str): The name of the cache being queried.
+        hit (bool): Whether the lookup was answered from the cache.
+    """
+    CACHE_REQUESTS.labels(cache=cache_name, result="hit" if hit else "miss").inc()
+
+
+def record_watsonx_usage(model_id, response_data):
+    """
+    Record token usage reported by a WatsonX text generation response.
+
+    Args:
+        model_id (str): The model the request was sent to.
+        response_data (dict): The decoded JSON response from WatsonX.
+    """
+    for result in response_data.get("results", []) or []:
+        input_tokens = result.get("input_token_count")
+        generated_tokens = result.get("generated_token_count")
+        if input_tokens:
+            WATSONX_TOKENS.labels(model=model_id, kind="input").inc(input_tokens)
+        if generated_tokens:
+            WATSONX_TOKENS.labels(model=model_id, kind="generated").inc(generated_tokens)
+
+
+def render_metrics():
+    """
+    Render all registered metrics in the Prometheus text exposition format.
+
+    Returns:
+        tuple: The encoded metrics payload and its content type.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,124 @@
+import os
+import re
+import random
+import logging
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    def __init__(self, enabled=False, output_dir="./profiles", use_tracemalloc=False, sample_rate=1.0, top=25):
+        """
+        Initialize the Profiler.
+
+        Args:
+            enabled (bool): Whether profiling is active.
+            output_dir (str): Directory the stats files are written to.
+            use_tracemalloc (bool): Also record allocations with tracemalloc.
+            sample_rate (float): Fraction of sections that are profiled (0..1).
+            top (int): Number of allocation sites written to the tracemalloc report.
+        """
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.use_tracemalloc = use_tracemalloc
+        self.sample_rate = sample_rate
+        self.top = top
+
+    def should_profile(self):
+        return self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def _path(self, name, suffix):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+        return os.path.join(self.output_dir, f"{safe_name}{suffix}")
+
+    @contextmanager
+    def profile(self, name):
+        """
+        Profile the enclosed block and dump its stats files.
+
+        Writes '<name>.prof' (cProfile, readable with pstats or snakeviz) and, when
+        tracemalloc is enabled, '<name>.tracemalloc.txt' with the top allocation sites.
+        tracemalloc is process wide, so allocations from concurrent threads are included.
+
+        Args:
+            name (str): Name of the profiled section, used for the file names.
+        """
+        if not self.should_profile():
+            yield
+            return
+
+        started_tracemalloc = False
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracemalloc = True
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot() if self.use_tracemalloc and tracemalloc.is_tracing() else None
+            if started_tracemalloc:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                peak = None
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                profiler.dump_stats(self._path(name, ".prof"))
+                if snapshot is not None:
+                    self._write_allocations(name, snapshot, peak)
+                logger.info(f"Wrote profile for '{name}' to {self.output_dir}")
+            except OSError as e:
+                logger.error(f"Failed to write profile for '{name}': {str(e)}")
+
+    def _write_allocations(self, name, snapshot, peak):
+        statistics = snapshot.statistics("lineno")
+        with open(self._path(name, ".tracemalloc.txt"), "w") as file:
+            if peak is not None:
+                file.write(f"Peak traced memory: {peak} bytes\n")
+            file.write(f"Total allocated: {sum(stat.size for stat in statistics)} bytes "
+                       f"in {sum(stat.count for stat in statistics)} blocks\n\n")
+            for stat in statistics[:self.top]:
+                file.write(f"{stat}\n")
+
+
+_profiler = Profiler()
+
+
+def configure_profiling(config):
+    """
+    Configure the process-wide profiler from the 'profiling' section of the application config.
+
+    Args:
+        config (dict): The profiling configuration, e.g. {'enabled': True, 'tracemalloc': True}.
+    """
+    global _profiler
+    config = config or {}
+    enabled = os.getenv('PROFILING_ENABLED', str(config.get('enabled', False))).lower() in ('1', 'true', 'yes')
+    _profiler = Profiler(
+        enabled=enabled,
+        output_dir=os.getenv('PROFILING_OUTPUT_DIR', config.get('output_dir', './profiles')),
+        use_tracemalloc=bool(config.get('tracemalloc', False)),
+        sample_rate=float(config.get('sample_rate', 1.0)),
+        top=int(config.get('top', 25)),
+    )
+    logger.info(f"Profiling {'enabled' if enabled else 'disabled'}")
+
+
+def get_profiler():
+    return _profiler
+
+
+def profile(name):
+    """
+    Profile the enclosed block with the process-wide profiler.
+
+    Args:
+        name (str): Name of the profiled section.
+    """
+    return _profiler.profile(name)
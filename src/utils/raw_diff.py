@@ -0,0 +1,198 @@
+import codecs
+import logging
+
+logger = logging.getLogger(__name__)
+
+_FILE_HEADER = b'diff --git '
+_HUNK_HEADER = b'@@'
+
+
+class RawDiffSplitter:
+    def __init__(self, wanted, max_file_bytes=None, max_bytes=None, limit=None):
+        """
+        Split a raw pull request diff (application/vnd.github.diff) into per-file patches as it streams in.
+
+        Chunks are split into lines as they arrive, and only the hunks of wanted files are kept,
+        so the whole diff is never held in memory. Each patch starts at its first '@@' header,
+        like the patch attribute of a pull request file.
+
+        Args:
+            wanted (callable): Called with a file path, returns whether its patch should be kept.
+            max_file_bytes (int): Optional size cap per file. Hunks past the cap are dropped whole,
+                                  so a capped patch still ends on a hunk boundary.
+            max_bytes (int): Optional cap on the bytes of the diff to read, after which the splitter is done.
+            limit (int): Optional number of files to collect, after which the splitter is done.
+        """
+        self.wanted = wanted
+        self.max_file_bytes = max_file_bytes
+        self.max_bytes = max_bytes
+        self.limit = limit
+        self.found = 0
+        self.read = 0
+        self.truncated = []
+        self._buffer = b''
+        self._header_lines = None
+        self._path = None
+        self._keep = False
+        self._hunks = []
+        self._hunk = None
+        self._size = 0
+        self._capped = False
+
+    @property
+    def found_all(self):
+        return self.limit is not None and self.found >= self.limit
+
+    @property
+    def exhausted(self):
+        return self.max_bytes is not None and self.read > self.max_bytes
+
+    @property
+    def done(self):
+        """
+        Whether reading the diff can stop: all files were found or max_bytes were read.
+        """
+        return self.found_all or self.exhausted
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of the raw diff.
+
+        Returns:
+            list: (path, patch) tuples for the files completed by this chunk.
+        """
+        completed = []
+        self.read += len(chunk)
+        lines = (self._buffer + chunk).split(b'\n')
+        self._buffer = lines.pop()
+        for line in lines:
+            if self.found_all:
+                break
+            self._feed_line(line, completed)
+        return completed
+
+    def close(self):
+        """
+        Finish the diff. If reading stopped at max_bytes, the last, possibly partial hunk is dropped.
+
+        Returns:
+            list: (path, patch) tuples for the files completed by the end of the diff.
+        """
+        completed = []
+        if self.found_all:
+            return completed
+        if self.exhausted:
+            logger.warning(f"Raw diff exceeds {self.max_bytes} bytes; the remaining files are not reviewed")
+            self._hunk = None
+        elif self._buffer:
+            self._feed_line(self._buffer, completed)
+        self._buffer = b''
+        self._finish_file(completed)
+        return completed
+
+    def _feed_line(self, line, completed):
+        if line.startswith(_FILE_HEADER):
+            self._finish_file(completed)
+            self._header_lines = [line]
+            return
+        if self._header_lines is not None:
+            if not line.startswith(_HUNK_HEADER):
+                self._header_lines.append(line)
+                return
+            self._path = _path_from_header(self._header_lines)
+            self._header_lines = None
+            self._keep = self._path is not None and self.wanted(self._path)
+        if not self._keep or self._capped:
+            return
+        if line.startswith(_HUNK_HEADER):
+            self._finish_hunk()
+            if self._capped:
+                return
+            self._hunk = [line]
+        elif self._hunk is not None:
+            self._hunk.append(line)
+
+    def _finish_hunk(self):
+        if self._hunk is None:
+            return
+        size = sum(len(line) + 1 for line in self._hunk)
+        if self.max_file_bytes is not None and self._size + size > self.max_file_bytes:
+            self._capped = True
+        else:
+            self._hunks.extend(self._hunk)
+            self._size += size
+        self._hunk = None
+
+    def _finish_file(self, completed):
+        if self._keep:
+            self._finish_hunk()
+            if self._capped:
+                logger.warning(f"Patch of '{self._path}' exceeds {self.max_file_bytes} bytes; later hunks are skipped")
+                self.truncated.append(self._path)
+            if self._hunks:
+                patch = b'\n'.join(self._hunks).decode('utf-8', errors='replace') + '\n'
+                completed.append((self._path, patch))
+                self.found += 1
+        self._header_lines = None
+        self._path = None
+        self._keep = False
+        self._hunks = []
+        self._hunk = None
+        self._size = 0
+        self._capped = False
+
+
+def _path_from_header(header_lines):
+    """
+    Get the path of a file in the head commit from its 'diff --git' header lines.
+
+    Returns:
+        str: The path, or None for deleted files.
+    """
+    target = None
+    for line in header_lines:
+        if line.startswith(b'+++ '):
+            target = _unquote(line[4:].rstrip(b'\t\r'))
+            if target == b'/dev/null':
+                return None
+            target = target[2:] if target.startswith(b'b/') else target
+            break
+        if line.startswith(b'rename to '):
+            target = _unquote(line[len(b'rename to '):].rstrip(b'\r'))
+    if target is None:
+        # No '+++' line (e.g. a mode change only): fall back to the 'b/' half of the header
+        _, separator, target = header_lines[0].rstrip(b'\r').rpartition(b' b/')
+        if not separator:
+            return None
+    return target.decode('utf-8', errors='replace')
+
+
+def _unquote(path):
+    """
+    Undo git's C-style quoting of paths with special characters, e.g. "b/caf\\303\\251.md".
+    """
+    if len(path) >= 2 and path.startswith(b'"') and path.endswith(b'"'):
+        return codecs.escape_decode(path[1:-1])[0]
+    return path
+
+
+def split_raw_diff(chunks, wanted, max_file_bytes=None, max_bytes=None, limit=None):
+    """
+    Yield the per-file patches of a raw diff read from an iterable of byte chunks.
+
+    Args:
+        chunks (iterable): Byte chunks of the diff, e.g. a streamed HTTP response body.
+        wanted (callable): Called with a file path, returns whether its patch should be kept.
+        max_file_bytes (int): Optional size cap per file patch.
+        max_bytes (int): Optional cap on the bytes read from the diff; reading stops there.
+        limit (int): Optional number of files to collect before reading stops.
+
+    Yields:
+        tuple: (path, patch) for every wanted file, in diff order.
+    """
+    splitter = RawDiffSplitter(wanted, max_file_bytes=max_file_bytes, max_bytes=max_bytes, limit=limit)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+        if splitter.done:
+            break
+    yield from splitter.close()
@@ -0,0 +1,298 @@
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("chrome", "otlp")
+
+
+class Span:
+    """
+    A single timed stage of a review, recorded relative to its parent span.
+    """
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "thread_id")
+
+    def __init__(self, name, parent_id=None, attributes=None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.thread_id = threading.get_ident()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+
+
+class _NoOpSpan:
+    """
+    Shared span used when tracing is disabled, so instrumentation costs a single check.
+    """
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NOOP_SPAN = _NoOpSpan()
+
+
+class Trace:
+    """
+    All spans recorded while handling one webhook delivery or review.
+    """
+
+    def __init__(self, name, delivery_id=None):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.delivery_id = delivery_id
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+
+_current_trace: ContextVar = ContextVar("current_trace", default=None)
+_current_span: ContextVar = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, enabled=False, output_dir="./traces", export_format="chrome"):
+        """
+        Initialize the Tracer.
+
+        Args:
+            enabled (bool): Whether spans are recorded at all.
+            output_dir (str): Directory the finished traces are written to.
+            export_format (str): Either 'chrome' (trace-event JSON) or 'otlp' (OTLP/JSON).
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported trace export format: {export_format}")
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.export_format = export_format
+
+    def export(self, trace):
+        """
+        Write a finished trace to the output directory, named after its delivery id and trace id.
+
+        Args:
+            trace (Trace): The trace to export.
+
+        Returns:
+            str: The path of the written file.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        # The delivery id comes from a request header, so only a sanitized copy goes into the file name
+        name = trace.trace_id
+        if trace.delivery_id:
+            name = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', trace.delivery_id)}-{trace.trace_id}"
+        file_name = f"{name}.{self.export_format}.json"
+        path = os.path.join(self.output_dir, file_name)
+        if self.export_format == "otlp":
+            document = to_otlp_json(trace)
+        else:
+            document = to_chrome_trace(trace)
+        with open(path, "w") as file:
+            json.dump(document, file)
+        logger.info(f"Exported trace {trace.trace_id} with {len(trace.spans)} spans to {path}")
+        return path
+
+
+_tracer = Tracer()
+
+
+def configure_tracing(config):
+    """
+    Configure the process-wide tracer from the 'tracing' section of the application config.
+
+    Args:
+        config (dict): The tracing configuration, e.g. {'enabled': True, 'output_dir': './traces', 'format': 'chrome'}.
+    """
+    global _tracer
+    config = config or {}
+    enabled = os.getenv('TRACING_ENABLED', str(config.get('enabled', False))).lower() in ('1', 'true', 'yes')
+    _tracer = Tracer(
+        enabled=enabled,
+        output_dir=os.getenv('TRACING_OUTPUT_DIR', config.get('output_dir', './traces')),
+        export_format=os.getenv('TRACING_FORMAT', config.get('format', 'chrome')),
+    )
+    logger.info(f"Tracing {'enabled' if enabled else 'disabled'}")
+
+
+def get_tracer():
+    return _tracer
+
+
+@contextmanager
+def _record_span(trace, name, attributes):
+    parent = _current_span.get()
+    span = Span(name, parent_id=parent.span_id if parent else None, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.set_attribute("error", str(e))
+        raise
+    finally:
+        span.finish()
+        _current_span.reset(token)
+        trace.add_span(span)
+
+
+def span(name, **attributes):
+    """
+    Time a stage of the current trace.
+
+    Returns a shared no-op context manager when no trace is active, so
+    instrumented code pays almost nothing while tracing is disabled.
+
+    Args:
+        name (str): The name of the stage.
+        **attributes: Attributes attached to the span.
+
+    Returns:
+        A context manager yielding the span.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _record_span(trace, name, attributes)
+
+
+def current_trace_id():
+    """
+    Return the id of the trace active in this context, or None when no trace is being recorded.
+    """
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def start_trace(name, delivery_id=None, **attributes):
+    """
+    Start a new trace, or a child span if a trace is already active.
+
+    The trace is exported when the outermost context exits.
+
+    Args:
+        name (str): The name of the root span.
+        delivery_id (str): The GitHub delivery id used to correlate the trace.
+        **attributes: Attributes attached to the root span.
+    """
+    tracer = _tracer
+    if not tracer.enabled:
+        yield _NOOP_SPAN
+        return
+
+    if _current_trace.get() is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+
+    trace = Trace(name, delivery_id=delivery_id)
+    if delivery_id:
+        attributes["delivery_id"] = delivery_id
+    trace_token = _current_trace.set(trace)
+    try:
+        with _record_span(trace, name, attributes) as root:
+            yield root
+    finally:
+        _current_trace.reset(trace_token)
+        try:
+            tracer.export(trace)
+        except OSError as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {str(e)}")
+
+
+def to_chrome_trace(trace):
+    """
+    Convert a trace to the Chrome trace-event format (viewable in chrome://tracing or Perfetto).
+
+    Args:
+        trace (Trace): The trace to convert.
+
+    Returns:
+        dict: The trace-event document.
+    """
+    events = []
+    for recorded in sorted(trace.spans, key=lambda s: s.start_ns):
+        events.append({
+            "name": recorded.name,
+            "cat": trace.name,
+            "ph": "X",
+            "ts": recorded.start_ns / 1000,
+            "dur": (recorded.end_ns - recorded.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": recorded.thread_id,
+            "args": dict(recorded.attributes, status=recorded.status),
+        })
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"trace_id": trace.trace_id, "delivery_id": trace.delivery_id},
+    }
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(trace):
+    """
+    Convert a trace to the OTLP/JSON encoding accepted by OpenTelemetry collectors.
+
+    Args:
+        trace (Trace): The trace to convert.
+
+    Returns:
+        dict: The OTLP 'resourceSpans' document.
+    """
+    spans = []
+    for recorded in trace.spans:
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": recorded.span_id,
+            "name": recorded.name,
+            "kind": 1,
+            "startTimeUnixNano": str(recorded.start_ns),
+            "endTimeUnixNano": str(recorded.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in recorded.attributes.items()],
+            "status": {"code": 2 if recorded.status == "error" else 1},
+        }
+        if recorded.parent_id:
+            otlp_span["parentSpanId"] = recorded.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "watsonx-code-reviewer"}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
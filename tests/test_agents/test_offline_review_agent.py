@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch
+
+from src.agents.offline_review_agent import OfflineReviewAgent
+from src.utils.local_diffs import LocalChange
+
+PATCH = b"""diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -1,2 +1,3 @@
+ line one
++Thiss is a tesst line
+ line two
+diff --git a/script.py b/script.py
+--- a/script.py
++++ b/script.py
+@@ -1 +1,2 @@
+ import os
++import sys
+"""
+CONTENT = "line one\nThiss is a tesst line\nline two\n"
+
+
+@pytest.fixture
+def agent():
+    with patch('src.agents.markdown_llm_agent.MarkdownLLMAgent') as mock_llm_agent:
+        mock_llm_agent.return_value.review.return_value = [{'line': 2, 'comment': 'Reword this line.'}]
+        yield OfflineReviewAgent()
+
+def make_change(name='change-1', files=None, diff=PATCH):
+    files = files if files is not None else {'README.md': CONTENT}
+    return LocalChange(name, 'patches', f'head-{name}', lambda: [diff], files.get)
+
+def test_review_change_returns_handler_and_llm_comments(agent):
+    result = agent.review_change(make_change())
+
+    assert result['status'] == 'success'
+    assert result['files'] == 1
+    assert [comment['body'] for comment in result['comments']] == [
+        "Possible spelling mistake: 'thiss'. Did you mean 'this'?",
+        "Possible spelling mistake: 'tesst'. Did you mean 'test'?",
+        "Reword this line.",
+    ]
+    assert {comment['path'] for comment in result['comments']} == {'README.md'}
+
+def test_review_change_without_llm_runs_only_handlers(agent):
+    agent.use_llm = False
+    result = agent.review_change(make_change())
+    assert "Reword this line." not in [comment['body'] for comment in result['comments']]
+
+def test_review_change_rebuilds_content_from_the_patch(agent):
+    agent.use_llm = False
+    result = agent.review_change(make_change(files={}))
+    assert [comment['line'] for comment in result['comments']] == [2, 2]
+
+def test_review_change_uses_the_wordlist_of_the_change(agent):
+    agent.use_llm = False
+    result = agent.review_change(make_change(files={'README.md': CONTENT, '.wordlist.txt': "thiss tesst\n"}))
+    assert result['comments'] == []
+
+def test_review_change_reports_failures(agent):
+    def broken_diff():
+        raise OSError("unreadable")
+    result = agent.review_change(LocalChange('broken', 'patches', 'head', broken_diff))
+    assert result == {'status': 'failure', 'change': 'broken', 'message': 'Exception occurred: unreadable'}
+
+def test_review_changes_yields_results_in_input_order(agent):
+    agent.use_llm = False
+    names = [f"change-{index}" for index in range(10)]
+    results = list(agent.review_changes((make_change(name) for name in names), workers=3))
+    assert [result['change'] for result in results] == names
@@ -0,0 +1,254 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from github import GithubException
+
+from src.agents.pr_review_agent import PRReviewAgent
+from src.github.github_api import GitHubAPI
+
+PATCH = "@@ -1,2 +1,3 @@\n line one\n+Thiss is a tesst line\n line two\n"
+CONTENT = b"line one\nThiss is a tesst line\nline two\n"
+
+
+@pytest.fixture
+def mock_github_api():
+    return MagicMock(spec=GitHubAPI)
+
+@pytest.fixture
+def agent(mock_github_api):
+    with patch('src.agents.markdown_llm_agent.MarkdownLLMAgent') as mock_llm_agent:
+        mock_llm_agent.return_value.review.return_value = []
+        yield PRReviewAgent(github_api=mock_github_api)
+
+def make_paginated(items, per_page=100):
+    paginated = MagicMock()
+    paginated.__iter__.side_effect = lambda: iter(items)
+    paginated.get_page.side_effect = lambda page: items[page * per_page:(page + 1) * per_page]
+    paginated.totalCount = len(items)
+    return paginated
+
+def make_pull_request(files, comments=()):
+    pull_request = MagicMock()
+    pull_request.head.sha = 'abc123'
+    pull_request.get_files.return_value = make_paginated(list(files))
+    pull_request.get_review_comments.return_value = make_paginated(list(comments))
+    return pull_request
+
+def make_file(filename='README.md', patch=PATCH):
+    file = MagicMock()
+    file.filename = filename
+    file.patch = patch
+    return file
+
+def make_repo(contents, wordlist=None, wordlist_sha='wordlist-sha'):
+    repo = MagicMock()
+
+    def get_contents(path, ref=None):
+        if path == '.wordlist.txt':
+            if wordlist is None:
+                raise GithubException(404, {'message': 'Not Found'}, None)
+            wordlist_file = MagicMock()
+            wordlist_file.sha = wordlist_sha
+            wordlist_file.decoded_content = wordlist
+            return wordlist_file
+        content_file = MagicMock()
+        content_file.decoded_content = contents[path]
+        return content_file
+
+    repo.get_contents.side_effect = get_contents
+    return repo
+
+def posted_bodies(mock_github_api):
+    comments = mock_github_api.post_review_comment.call_args[0][2]
+    return [comment['body'] for comment in comments]
+
+def test_perform_code_review_posts_spelling_comments_on_changed_lines(agent, mock_github_api):
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file()])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT})
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    result = agent.perform_code_review('test/repo', 1)
+
+    assert result == {'status': 'success', 'message': 'Review comments posted successfully'}
+    assert sorted(posted_bodies(mock_github_api)) == [
+        "Possible spelling mistake: 'tesst'. Did you mean 'test'?",
+        "Possible spelling mistake: 'thiss'. Did you mean 'this'?",
+    ]
+
+def test_perform_code_review_skips_non_markdown_files(agent, mock_github_api):
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file('script.py')])
+    mock_github_api.get_repository.return_value = make_repo({})
+
+    result = agent.perform_code_review('test/repo', 2)
+
+    assert result == {'status': 'success', 'message': 'No issues found'}
+    mock_github_api.post_review_comment.assert_not_called()
+
+def test_perform_code_review_reports_exceptions(agent, mock_github_api):
+    mock_github_api.get_pull_request.side_effect = Exception('Repository not found')
+
+    result = agent.perform_code_review('test/repo', 3)
+
+    assert result['status'] == 'failure'
+    assert 'Repository not found' in result['message']
+
+def test_repository_wordlist_suppresses_known_words(agent, mock_github_api):
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file()])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT}, wordlist=b"# Project terms\ntesst\n", wordlist_sha='tesst-sha')
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    agent.perform_code_review('test/repo', 4)
+
+    assert posted_bodies(mock_github_api) == ["Possible spelling mistake: 'thiss'. Did you mean 'this'?"]
+
+def test_get_repository_words_parses_each_blob_once(agent, mocker):
+    parse = mocker.patch('src.language_handlers.spell_dictionary.parse_wordlist', return_value=frozenset({'alpha'}))
+    repo = make_repo({}, wordlist=b"alpha\n", wordlist_sha='parse-once-sha')
+
+    assert agent.get_repository_words(repo, 'head-1') == frozenset({'alpha'})
+    assert agent.get_repository_words(repo, 'head-2') == frozenset({'alpha'})
+    assert parse.call_count == 1
+
+def test_get_repository_words_without_wordlist(agent):
+    assert agent.get_repository_words(make_repo({}), 'head') == frozenset()
+
+def test_existing_comments_are_not_reposted_after_lines_shift(agent, mock_github_api):
+    shifted_patch = "@@ -1,3 +1,5 @@\n+New opening line\n+\n line one\n Thiss is a tesst line\n line two\n"
+    shifted_content = b"New opening line\n\nline one\nThiss is a tesst line\nline two\n"
+    existing = MagicMock()
+    existing.path = 'README.md'
+    existing.commit_id = 'old-sha'
+    existing.diff_hunk = "@@ -1,2 +1,3 @@\n line one\n+Thiss is a tesst line"
+    existing.body = "Possible spelling mistake: 'thiss'. Did you mean 'this'?"
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file(patch=shifted_patch)], [existing])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': shifted_content})
+    agent.get_llm_agent('markdown').review.return_value = [
+        {'line': 4, 'comment': "Possible spelling mistake: 'thiss'. Did you mean 'this'?"},
+        {'line': 1, 'comment': "Consider a clearer opening."},
+        {'line': 1, 'comment': "Consider a clearer opening."},
+    ]
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    result = agent.perform_code_review('test/repo', 1)
+
+    assert result['status'] == 'success'
+    assert posted_bodies(mock_github_api) == ["Consider a clearer opening."]
+
+def test_perform_code_review_async_matches_the_synchronous_review(agent, mock_github_api):
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file()])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT})
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+    agent.perform_code_review('test/repo', 1)
+    expected = mock_github_api.post_review_comment.call_args[0][2]
+
+    async_github_api = MagicMock()
+    async_github_api.get_pull_request = AsyncMock(return_value={'head': {'sha': 'abc123'}})
+    async_github_api.get_review_comments = AsyncMock(return_value=[])
+    async_github_api.get_files = AsyncMock(return_value=[
+        {'filename': 'README.md', 'patch': PATCH}, {'filename': 'main.py', 'patch': PATCH}
+    ])
+
+    async def get_contents(repo_name, path, ref):
+        if path == '.wordlist.txt':
+            raise GithubException(404, {'message': 'Not Found'}, None)
+        return 'blob-sha', CONTENT
+
+    async_github_api.get_contents = AsyncMock(side_effect=get_contents)
+    async_github_api.post_review_comment = AsyncMock(return_value={'status': 'success'})
+    agent.async_github_api = async_github_api
+
+    result = asyncio.run(agent.perform_code_review_async('test/repo', 1))
+
+    assert result == {'status': 'success', 'message': 'Review comments posted successfully'}
+    async_github_api.post_review_comment.assert_awaited_once()
+    assert async_github_api.post_review_comment.await_args.args == ('test/repo', 1, expected)
+    assert async_github_api.post_review_comment.await_args.kwargs['commit_id'] == 'abc123'
+    fetched = [call.args[1] for call in async_github_api.get_contents.await_args_list]
+    assert sorted(fetched) == ['.wordlist.txt', 'README.md']
+
+def test_perform_code_review_async_requires_a_client(agent):
+    result = asyncio.run(agent.perform_code_review_async('test/repo', 1))
+
+    assert result['status'] == 'failure'
+
+def test_files_on_later_pages_are_reviewed_and_each_page_is_requested_once(agent, mock_github_api):
+    files = [make_file(filename=f"docs/{number}.md") for number in range(250)]
+    pull_request = make_pull_request(files)
+    mock_github_api.get_pull_request.return_value = pull_request
+    mock_github_api.get_repository.return_value = make_repo({f"docs/{number}.md": CONTENT for number in range(250)})
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    agent.perform_code_review('test/repo', 1)
+
+    comments = mock_github_api.post_review_comment.call_args[0][2]
+    assert {comment['path'] for comment in comments} == {file.filename for file in files}
+    paginated_files = pull_request.get_files.return_value
+    assert [call.args[0] for call in paginated_files.get_page.call_args_list] == [0, 1, 2]
+
+def test_a_file_range_reviews_only_its_files_and_requests_only_their_pages(agent, mock_github_api):
+    files = [make_file(filename=f"docs/{number}.md") for number in range(250)]
+    pull_request = make_pull_request(files)
+    mock_github_api.get_pull_request.return_value = pull_request
+    mock_github_api.get_repository.return_value = make_repo({f"docs/{number}.md": CONTENT for number in range(250)})
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    agent.perform_code_review('test/repo', 1, file_range=(150, 200))
+
+    comments = mock_github_api.post_review_comment.call_args[0][2]
+    assert {comment['path'] for comment in comments} == {f"docs/{number}.md" for number in range(150, 200)}
+    paginated_files = pull_request.get_files.return_value
+    assert [call.args[0] for call in paginated_files.get_page.call_args_list] == [1]
+
+def test_a_batch_planned_for_an_older_head_is_not_reviewed(agent, mock_github_api):
+    pull_request = make_pull_request([make_file()])
+    pull_request.changed_files = 250
+    mock_github_api.get_pull_request.return_value = pull_request
+
+    result = agent.perform_code_review('test/repo', 1, file_range=(0, 100), head_sha='old-sha')
+
+    assert result == {'status': 'stale', 'message': 'Head moved to abc123', 'head_sha': 'abc123', 'changed_files': 250}
+    pull_request.get_files.assert_not_called()
+    mock_github_api.post_review_comment.assert_not_called()
+
+def stream(data):
+    yield data
+
+def test_omitted_patches_are_read_from_the_raw_diff(agent, mock_github_api):
+    raw_diff = (b"diff --git a/README.md b/README.md\n--- a/README.md\n+++ b/README.md\n" + PATCH.encode('utf-8'))
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file(patch=None)])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT})
+    mock_github_api.iter_pull_request_diff.return_value = stream(raw_diff)
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    result = agent.perform_code_review('test/repo', 1)
+
+    assert result['status'] == 'success'
+    assert [comment['line'] for comment in mock_github_api.post_review_comment.call_args[0][2]] == [2, 2]
+
+def test_files_past_a_capped_listing_are_read_from_the_raw_diff(agent, mock_github_api):
+    raw_diff = b"".join(
+        b"diff --git a/%s b/%s\n--- a/%s\n+++ b/%s\n" % ((name,) * 4) + PATCH.encode('utf-8')
+        for name in (b"README.md", b"main.py", b"docs/unlisted.md")
+    )
+    pull_request = make_pull_request([make_file()])
+    pull_request.changed_files = 3
+    mock_github_api.get_pull_request.return_value = pull_request
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT, 'docs/unlisted.md': CONTENT})
+    mock_github_api.iter_pull_request_diff.return_value = stream(raw_diff)
+    mock_github_api.post_review_comment.return_value = {'status': 'success'}
+
+    agent.perform_code_review('test/repo', 1)
+
+    comments = mock_github_api.post_review_comment.call_args[0][2]
+    assert sorted({comment['path'] for comment in comments}) == ['README.md', 'docs/unlisted.md']
+
+def test_files_missing_from_the_raw_diff_are_still_reviewed(agent, mock_github_api):
+    mock_github_api.get_pull_request.return_value = make_pull_request([make_file(patch=None)])
+    mock_github_api.get_repository.return_value = make_repo({'README.md': CONTENT})
+    mock_github_api.iter_pull_request_diff.side_effect = GithubException(406, {'message': 'Too large'}, None)
+
+    result = agent.perform_code_review('test/repo', 1)
+
+    assert result == {'status': 'success', 'message': 'No issues found'}
+    assert agent.get_llm_agent('markdown').review.call_args.kwargs['changed_text'] is None
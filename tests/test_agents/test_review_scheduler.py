@@ -0,0 +1,290 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from src.agents.review_scheduler import ReviewScheduler, create_review_scheduler, estimate_cost
+from src.github.webhook_handler import app, set_review_scheduler
+
+
+def make_payload(number, additions=10, deletions=0, changed_files=1, labels=(), repo='test/repo', head_sha='head-1'):
+    return {
+        'action': 'synchronize',
+        'number': number,
+        'repository': {'full_name': repo},
+        'pull_request': {
+            'head': {'sha': head_sha},
+            'additions': additions,
+            'deletions': deletions,
+            'changed_files': changed_files,
+            'labels': [{'name': name} for name in ('ready-to-review',) + tuple(labels)],
+        },
+    }
+
+class RecordingAgent:
+    """
+    Records the reviews it performs; the first review waits until release() so others queue up behind it.
+    """
+
+    def __init__(self, result=None):
+        self.calls = []
+        self.heads = []
+        self.result = result or {'status': 'success', 'message': 'No issues found'}
+        self._gate = threading.Event()
+        self._started = threading.Event()
+
+    def perform_code_review(self, repo_name, pr_number, file_range=None, head_sha=None):
+        if not self._started.is_set():
+            self._started.set()
+            self._gate.wait(5)
+        self.calls.append((pr_number, file_range))
+        self.heads.append(head_sha)
+        return self.result
+
+    def wait_until_busy(self):
+        assert self._started.wait(5)
+
+    def release(self):
+        self._gate.set()
+
+@pytest.fixture
+def agent():
+    return RecordingAgent()
+
+@pytest.fixture
+def scheduler(agent):
+    scheduler = ReviewScheduler(agent, workers=1, split_files=200, batch_files=100)
+    yield scheduler
+    agent.release()
+    scheduler.shutdown()
+
+def busy(scheduler, agent):
+    job = scheduler.submit(make_payload(0))
+    agent.wait_until_busy()
+    return job
+
+def test_estimate_cost_counts_lines_files_and_label_weights():
+    assert estimate_cost(make_payload(1, additions=30, deletions=20, changed_files=2)) == 150
+    assert estimate_cost(make_payload(1, additions=30, deletions=20, changed_files=2, labels=('priority/high',)),
+                         label_weights={'priority/high': 0.1}) == 15
+    assert estimate_cost({'number': 1, 'pull_request': {}}) == 50
+
+def test_plan_batches_splits_large_pull_requests(scheduler):
+    assert scheduler.plan_batches(200) == [None]
+    assert scheduler.plan_batches(None) == [None]
+    assert scheduler.plan_batches(250) == [(0, 100), (100, 200), (200, None)]
+    assert scheduler.plan_batches(5000) == [None]
+
+def test_small_reviews_run_before_large_ones(scheduler, agent):
+    first = busy(scheduler, agent)
+    large = scheduler.submit(make_payload(1, additions=5000, changed_files=150))
+    small = scheduler.submit(make_payload(2, additions=1))
+    agent.release()
+
+    assert large.future.result(5)['status'] == 'success'
+    assert small.future.result(5)['status'] == 'success'
+    assert first.future.result(5)['status'] == 'success'
+    assert [number for number, _ in agent.calls] == [0, 2, 1]
+
+def test_aging_keeps_submission_order_when_waiting_dominates(agent):
+    scheduler = ReviewScheduler(agent, workers=1, aging_per_second=1e12)
+    try:
+        busy(scheduler, agent)
+        large = scheduler.submit(make_payload(1, additions=5000))
+        small = scheduler.submit(make_payload(2, additions=1))
+        agent.release()
+        large.future.result(5)
+        small.future.result(5)
+    finally:
+        scheduler.shutdown()
+    assert [number for number, _ in agent.calls] == [0, 1, 2]
+
+def test_label_weights_raise_priority(agent):
+    scheduler = ReviewScheduler(agent, workers=1, label_weights={'priority/high': 0.001})
+    try:
+        busy(scheduler, agent)
+        normal = scheduler.submit(make_payload(1, additions=10))
+        urgent = scheduler.submit(make_payload(2, additions=5000, labels=('priority/high',)))
+        agent.release()
+        normal.future.result(5)
+        urgent.future.result(5)
+    finally:
+        scheduler.shutdown()
+    assert [number for number, _ in agent.calls] == [0, 2, 1]
+
+def test_giant_pull_requests_are_split_into_interleaved_batches(scheduler, agent):
+    busy(scheduler, agent)
+    giant = scheduler.submit(make_payload(1, additions=30000, changed_files=300))
+    small = scheduler.submit(make_payload(2, additions=1))
+    agent.release()
+
+    result = giant.future.result(5)
+    small.future.result(5)
+
+    assert result == {'status': 'success', 'message': 'No issues found'}
+    assert agent.calls[1] == (2, None)
+    assert sorted(file_range for number, file_range in agent.calls if number == 1) == [(0, 100), (100, 200), (200, None)]
+    assert giant.to_dict()['batches_done'] == 3
+    assert {head for (number, _), head in zip(agent.calls, agent.heads) if number == 1} == {'head-1'}
+
+def test_pull_requests_without_a_known_head_are_not_split(scheduler):
+    job = scheduler.submit(make_payload(1, changed_files=300, head_sha=None))
+    assert job.file_ranges == [None]
+
+def test_batches_are_planned_again_when_the_head_moves():
+    class MovingAgent(RecordingAgent):
+        def perform_code_review(self, repo_name, pr_number, file_range=None, head_sha=None):
+            super().perform_code_review(repo_name, pr_number, file_range, head_sha)
+            if head_sha != 'head-2':
+                return {'status': 'stale', 'message': 'Head moved to head-2', 'head_sha': 'head-2', 'changed_files': 450}
+            return {'status': 'success', 'message': 'No issues found'}
+
+    agent = MovingAgent()
+    agent.release()
+    scheduler = ReviewScheduler(agent, workers=1)
+    try:
+        job = scheduler.submit(make_payload(1, changed_files=250))
+        assert job.future.result(5) == {'status': 'success', 'message': 'No issues found'}
+    finally:
+        scheduler.shutdown()
+
+    # The batches planned for head-1 are dropped after the first one finds the new head
+    assert agent.heads.count('head-1') == 1
+    assert sorted(file_range for (_, file_range), head in zip(agent.calls, agent.heads)
+                  if head == 'head-2') == [(0, 100), (100, 200), (200, 300), (300, 400), (400, None)]
+    assert job.to_dict()['head_sha'] == 'head-2'
+
+class PushedAgent(RecordingAgent):
+    """
+    Reviews pull requests whose head moves to `head` once a delivery for it arrives.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.head = 'head-1'
+
+    def perform_code_review(self, repo_name, pr_number, file_range=None, head_sha=None):
+        current = self.head
+        super().perform_code_review(repo_name, pr_number, file_range, head_sha)
+        if head_sha != current:
+            return {'status': 'stale', 'message': f'Head moved to {current}', 'head_sha': current, 'changed_files': 450}
+        return {'status': 'success', 'message': 'Review comments posted successfully'}
+
+def test_resubmit_while_the_first_batch_is_running():
+    agent = PushedAgent()
+    scheduler = ReviewScheduler(agent, workers=1)
+    try:
+        job = scheduler.submit(make_payload(1, changed_files=450))
+        agent.wait_until_busy()
+        agent.head = 'head-2'
+        assert scheduler.submit(make_payload(1, changed_files=450, head_sha='head-2')) is job
+        agent.release()
+        assert job.future.result(5) == {'status': 'success', 'message': 'Review comments posted successfully'}
+    finally:
+        scheduler.shutdown()
+
+    # The running batch finishes at head-1, the next one finds head-2 and the pull request is planned once more
+    assert agent.heads == ['head-1', 'head-1'] + ['head-2'] * 5
+    assert sorted(agent.calls[2:]) == [(1, (0, 100)), (1, (100, 200)), (1, (200, 300)), (1, (300, 400)),
+                                      (1, (400, None))]
+    # The batch posted at head-1 counts with the five posted at head-2
+    assert job.to_dict()['batches'] == job.to_dict()['batches_done'] == 6
+
+def test_resubmit_with_a_new_head_reviews_an_unsplit_pull_request_again(scheduler, agent):
+    job = scheduler.submit(make_payload(1))
+    agent.wait_until_busy()
+    assert scheduler.submit(make_payload(1, head_sha='head-2')) is job
+    agent.release()
+    assert job.future.result(5)['status'] == 'success'
+    assert agent.heads == [None, None]
+
+def test_batch_failures_fail_the_job():
+    agent = RecordingAgent({'status': 'failure', 'message': 'Exception occurred: boom'})
+    agent.release()
+    scheduler = ReviewScheduler(agent, workers=2)
+    try:
+        job = scheduler.submit(make_payload(1, changed_files=250))
+        assert job.future.result(5) == {'status': 'failure', 'message': 'Exception occurred: boom'}
+    finally:
+        scheduler.shutdown()
+
+def test_queued_review_of_the_same_pull_request_is_reused(scheduler, agent):
+    busy(scheduler, agent)
+    queued = scheduler.submit(make_payload(1))
+    assert scheduler.submit(make_payload(1)) is queued
+    assert scheduler.submit(make_payload(1, repo='other/repo')) is not queued
+    assert scheduler.get_job(queued.job_id) is queued
+
+def test_shutdown_fails_queued_reviews(agent):
+    scheduler = ReviewScheduler(agent, workers=1)
+    busy(scheduler, agent)
+    queued = scheduler.submit(make_payload(1))
+    scheduler.shutdown(wait=False)
+    agent.release()
+    assert queued.future.result(5) == {'status': 'failure', 'message': 'Review scheduler shut down'}
+
+def test_only_finished_jobs_are_evicted(agent, mocker):
+    record = mocker.patch('src.utils.lru_cache.record_cache_access')
+    scheduler = ReviewScheduler(agent, workers=1, max_jobs=1)
+    try:
+        running = busy(scheduler, agent)
+        queued = [scheduler.submit(make_payload(number)) for number in range(1, 4)]
+        assert all(scheduler.get_job(job.job_id) is job for job in [running] + queued)
+
+        agent.release()
+        for job in queued:
+            job.future.result(5)
+        assert [scheduler.get_job(job.job_id) for job in [running] + queued] == [None, None, None, queued[-1]]
+    finally:
+        scheduler.shutdown()
+    record.assert_not_called()
+
+def test_shutdown_resets_the_queue_depth(agent):
+    from src.utils.metrics import REVIEW_QUEUE_DEPTH
+
+    scheduler = ReviewScheduler(agent, workers=1)
+    busy(scheduler, agent)
+    scheduler.submit(make_payload(1))
+    scheduler.submit(make_payload(2))
+    scheduler.shutdown(wait=False)
+    agent.release()
+    scheduler.shutdown()
+
+    assert REVIEW_QUEUE_DEPTH._value.get() == 0
+
+def test_create_review_scheduler_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('REVIEW_SCHEDULER_ENABLED', 'false')
+    assert create_review_scheduler(MagicMock(), {'review': {'scheduler': {'enabled': True}}}) is None
+
+@pytest.fixture
+def client(scheduler):
+    yield app.test_client()
+    set_review_scheduler(None)
+
+def post_webhook(client, payload):
+    return client.post('/webhook', json=payload, headers={'X-GitHub-Event': 'pull_request'})
+
+def test_webhook_waits_for_the_scheduled_review(client, scheduler, agent):
+    set_review_scheduler(scheduler)
+    agent.release()
+    response = post_webhook(client, make_payload(1))
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'success', 'message': 'No issues found'}
+
+def test_webhook_answers_202_with_a_job_status_url(client, scheduler, agent):
+    set_review_scheduler(scheduler, respond_immediately=True)
+    busy(scheduler, agent)
+
+    response = post_webhook(client, make_payload(1))
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['status'] == 'queued'
+    assert response.headers['Location'].endswith(f"/jobs/{body['job_id']}")
+    assert client.get(body['status_url']).get_json()['status'] == 'queued'
+
+    agent.release()
+    scheduler.get_job(body['job_id']).future.result(5)
+    assert client.get(body['status_url']).get_json()['status'] == 'success'
+
+def test_job_status_of_unknown_job_is_404(client):
+    assert client.get('/jobs/missing').status_code == 404
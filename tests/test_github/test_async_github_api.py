@@ -0,0 +1,152 @@
+import base64
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from github import GithubException
+
+from src.github.async_github_api import AsyncGitHubAPI
+
+FILES = [{'filename': f"docs/{number}.md", 'patch': "@@ -1 +1 @@\n-a\n+b\n"} for number in range(5)]
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode("utf-8")
+
+@pytest.fixture(autouse=True)
+def clear_github_env(monkeypatch):
+    for name in ('GITHUB_APP_ID', 'GITHUB_INSTALLATION_ID', 'GITHUB_PRIVATE_KEY', 'GITHUB_API_URL'):
+        monkeypatch.delenv(name, raising=False)
+
+def make_app(calls):
+    async def token(request):
+        calls.append('token')
+        return web.json_response({'token': 'installation-token', 'expires_at': '2099-01-01T00:00:00Z'}, status=201)
+
+    async def pull(request):
+        calls.append('pull')
+        assert request.headers['Authorization'] == 'token installation-token'
+        return web.json_response({'number': 7, 'head': {'sha': 'abc123'}})
+
+    async def files(request):
+        calls.append('files')
+        per_page = int(request.query['per_page'])
+        page = int(request.query.get('page', 1))
+        headers = {}
+        if page * per_page < len(FILES):
+            headers['Link'] = f'<{request.url.with_query(per_page=per_page, page=page + 1)}>; rel="next"'
+        return web.json_response(FILES[(page - 1) * per_page:page * per_page], headers=headers)
+
+    async def contents(request):
+        calls.append('contents')
+        path = request.match_info['path']
+        if path == 'missing.md':
+            return web.json_response({'message': 'Not Found'}, status=404)
+        if path == 'large.md':
+            if request.headers['Accept'] == 'application/vnd.github.raw':
+                return web.Response(body=b"raw content")
+            return web.json_response({'sha': 'large-sha', 'encoding': 'none', 'content': ''})
+        assert request.query['ref'] == 'abc123'
+        return web.json_response({'sha': 'blob-sha', 'encoding': 'base64',
+                                  'content': base64.b64encode(b"# Title\n").decode('ascii')})
+
+    async def review(request):
+        payload = await request.json()
+        calls.append(('review', payload))
+        if not payload['comments']:
+            return web.json_response({'message': 'Validation Failed'}, status=422)
+        if payload['comments'][0]['body'] == 'Flaky' and calls.count(('review', payload)) == 1:
+            return web.Response(text="<html><body>503 Service Unavailable</body></html>", status=503,
+                                content_type='text/html')
+        return web.json_response({'id': 1})
+
+    app = web.Application()
+    app.router.add_post('/app/installations/1/access_tokens', token)
+    app.router.add_get('/repos/owner/repo/pulls/7', pull)
+    app.router.add_get('/repos/owner/repo/pulls/7/files', files)
+    app.router.add_get('/repos/owner/repo/contents/{path:.+}', contents)
+    app.router.add_post('/repos/owner/repo/pulls/7/reviews', review)
+    return app
+
+def run_with_client(private_key, scenario):
+    calls = []
+
+    async def run():
+        async with TestServer(make_app(calls)) as server:
+            async with AsyncGitHubAPI(app_id='1', installation_id='1', private_key=private_key,
+                                      api_url=str(server.make_url(''))) as api:
+                return await scenario(api)
+
+    return asyncio.run(run()), calls
+
+def test_requests_share_one_installation_token(private_key):
+    async def scenario(api):
+        return await asyncio.gather(*(api.get_pull_request('owner/repo', 7) for _ in range(5)))
+
+    pull_requests, calls = run_with_client(private_key, scenario)
+
+    assert [pull_request['head']['sha'] for pull_request in pull_requests] == ['abc123'] * 5
+    assert calls.count('token') == 1
+
+def test_get_files_follows_pagination_links(private_key):
+    async def scenario(api):
+        return [file async for file in api.paginate('/repos/owner/repo/pulls/7/files', 'get_files', per_page=2)]
+
+    files, calls = run_with_client(private_key, scenario)
+
+    assert files == FILES
+    assert calls.count('files') == 3
+
+def test_get_contents_decodes_inline_and_raw_content(private_key):
+    async def scenario(api):
+        return (await api.get_contents('owner/repo', 'docs/a.md', 'abc123'),
+                await api.get_contents('owner/repo', 'large.md', 'abc123'))
+
+    (inline, raw), _ = run_with_client(private_key, scenario)
+
+    assert inline == ('blob-sha', b"# Title\n")
+    assert raw == ('large-sha', b"raw content")
+
+def test_errors_are_raised_as_github_exceptions(private_key):
+    async def scenario(api):
+        with pytest.raises(GithubException) as error:
+            await api.get_contents('owner/repo', 'missing.md', 'abc123')
+        return error.value.status
+
+    status, _ = run_with_client(private_key, scenario)
+
+    assert status == 404
+
+def test_post_review_comment(private_key):
+    comments = [{'path': 'docs/0.md', 'line': 1, 'side': 'RIGHT', 'body': 'Typo'}]
+
+    async def scenario(api):
+        return (await api.post_review_comment('owner/repo', 7, comments),
+                await api.post_review_comment('owner/repo', 7, [], commit_id='abc123'))
+
+    (posted, rejected), calls = run_with_client(private_key, scenario)
+
+    assert posted == {'status': 'success', 'message': 'Review comments posted successfully'}
+    assert rejected['status'] == 'failure' and rejected['message'].startswith('Validation failed')
+    assert ('review', {'commit_id': 'abc123', 'body': 'Automated code review comments.',
+                       'event': 'COMMENT', 'comments': comments}) in calls
+
+def test_gateway_errors_with_html_bodies_are_retried(private_key):
+    comments = [{'path': 'docs/0.md', 'line': 1, 'side': 'RIGHT', 'body': 'Flaky'}]
+
+    async def scenario(api):
+        return await api.post_review_comment('owner/repo', 7, comments, commit_id='abc123', retry_delay=0)
+
+    result, calls = run_with_client(private_key, scenario)
+
+    assert result == {'status': 'success', 'message': 'Review comments posted successfully'}
+    assert sum(1 for call in calls if call[0] == 'review') == 2
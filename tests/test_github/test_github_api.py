@@ -82,3 +82,105 @@ def test_post_review_comment(github_api):
     response = github_api.post_review_comment("test/repo", 1, "This is a test review comment.")
     assert response['status'] == 'failure'
     assert 'Validation failed' in response['message']
+
+def make_comments(count, path="README.md"):
+    return [{'path': path, 'line': line, 'side': 'RIGHT', 'body': f"Comment {line}"} for line in range(1, count + 1)]
+
+def posted_batches(pull_request):
+    return [call.kwargs['comments'] for call in pull_request.create_review.call_args_list]
+
+def test_post_review_comment_reuses_the_pull_request_and_posts_in_batches(github_api):
+    pull_request = MagicMock()
+    pull_request.create_review.return_value.id = 1
+
+    response = github_api.post_review_comment("test/repo", 1, make_comments(120), pull_request=pull_request,
+                                              commit_id='abc123', max_comments=50)
+
+    assert response == {'status': 'success', 'message': 'Review comments posted successfully'}
+    assert [len(batch) for batch in posted_batches(pull_request)] == [50, 50, 20]
+    assert pull_request.create_review.call_args.kwargs['commit'].sha == 'abc123'
+    github_api.github.get_repo.assert_not_called()
+
+def test_post_review_comment_isolates_rejected_comments(github_api):
+    pull_request = MagicMock()
+    accepted = []
+
+    def create_review(commit, body, event, comments):
+        if any(comment['line'] == 7 for comment in comments):
+            raise GithubException(422, {'message': 'Validation Failed'}, None)
+        accepted.extend(comment['line'] for comment in comments)
+        return MagicMock(id=1)
+
+    pull_request.create_review.side_effect = create_review
+
+    response = github_api.post_review_comment("test/repo", 1, make_comments(10), pull_request=pull_request)
+
+    assert response == {'status': 'success', 'message': 'Review comments posted successfully (1 rejected)'}
+    assert accepted == [1, 2, 3, 4, 5, 6, 8, 9, 10]
+
+def test_post_review_comment_retries_only_failed_batches(github_api):
+    pull_request = MagicMock()
+    pull_request.create_review.side_effect = [
+        MagicMock(id=1),
+        GithubException(503, {'message': 'Service Unavailable'}, None),
+        MagicMock(id=2),
+    ]
+
+    response = github_api.post_review_comment("test/repo", 1, make_comments(4), pull_request=pull_request,
+                                              max_comments=2, retry_delay=0)
+
+    assert response['status'] == 'success'
+    assert [[comment['line'] for comment in batch] for batch in posted_batches(pull_request)] == [[1, 2], [3, 4], [3, 4]]
+
+def test_post_review_comment_does_not_retry_reviews_that_may_have_been_created(github_api):
+    pull_request = MagicMock()
+    pull_request.create_review.side_effect = [
+        MagicMock(id=1),
+        GithubException(502, {'message': 'Bad Gateway'}, None),
+        MagicMock(id=2),
+    ]
+
+    response = github_api.post_review_comment("test/repo", 1, make_comments(6), pull_request=pull_request,
+                                              max_comments=2, retry_delay=0)
+
+    assert response['status'] == 'failure'
+    assert [[comment['line'] for comment in batch] for batch in posted_batches(pull_request)] == [[1, 2], [3, 4], [5, 6]]
+
+def test_pygithub_does_not_retry_posts():
+    with patch('src.github.github_api.Github') as mock_github, \
+            patch('src.github.github_api.requests.post') as mock_post, \
+            patch.dict(os.environ, {'GITHUB_APP_ID': '1', 'GITHUB_INSTALLATION_ID': '1',
+                                    'GITHUB_PRIVATE_KEY': generate_test_private_key()}):
+        mock_post.return_value.status_code = 201
+        mock_post.return_value.json.return_value = {'token': 'token'}
+        GitHubAPI()
+
+    retry = mock_github.call_args.kwargs['retry']
+    assert 'GET' in retry.allowed_methods
+    assert 'POST' not in retry.allowed_methods
+
+def test_review_level_validation_errors_are_not_bisected(github_api):
+    pull_request = MagicMock()
+    pull_request.create_review.side_effect = GithubException(
+        422, {'message': 'Unprocessable Entity', 'errors': ['Commit could not be resolved']}, None)
+
+    response = github_api.post_review_comment("test/repo", 1, make_comments(40), pull_request=pull_request,
+                                              max_comments=20)
+
+    assert response['status'] == 'failure'
+    assert response['message'].startswith('Validation failed')
+    assert pull_request.create_review.call_count == 1
+
+def test_post_review_comment_drops_comments_outside_the_diff(github_api):
+    from src.utils.diff_index import DiffIndex
+
+    pull_request = MagicMock()
+    pull_request.create_review.return_value.id = 1
+    diff_index = DiffIndex("@@ -1,2 +1,3 @@\n line one\n+added\n line two\n", "README.md")
+    comments = make_comments(5) + [{'path': 'README.md', 'line': None, 'side': 'RIGHT', 'body': 'No line'}]
+
+    response = github_api.post_review_comment("test/repo", 1, comments, pull_request=pull_request,
+                                              diff_indexes={'README.md': diff_index})
+
+    assert response['status'] == 'success'
+    assert [comment['line'] for comment in posted_batches(pull_request)[0]] == [1, 2, 3]
@@ -0,0 +1,58 @@
+import threading
+from unittest.mock import MagicMock
+
+from src.github.pagination import iter_paginated
+
+
+def make_paginated(item_count, per_page):
+    items = list(range(item_count))
+    paginated = MagicMock()
+    paginated.get_page.side_effect = lambda page: items[page * per_page:(page + 1) * per_page]
+    return paginated, items
+
+def requested_pages(paginated):
+    return [call.args[0] for call in paginated.get_page.call_args_list]
+
+def test_each_page_is_requested_once():
+    paginated, items = make_paginated(25, per_page=10)
+
+    assert list(iter_paginated(paginated, "get_files", per_page=10)) == items
+    assert requested_pages(paginated) == [0, 1, 2]
+
+def test_a_full_last_page_costs_one_empty_request():
+    paginated, items = make_paginated(20, per_page=10)
+
+    assert list(iter_paginated(paginated, "get_files", per_page=10)) == items
+    assert requested_pages(paginated) == [0, 1, 2]
+
+def test_prefetch_requests_the_next_page_before_the_current_one_is_consumed():
+    paginated, items = make_paginated(25, per_page=10)
+    second_page_requested = threading.Event()
+    get_page = paginated.get_page.side_effect
+
+    def record(page):
+        if page == 1:
+            second_page_requested.set()
+        return get_page(page)
+
+    paginated.get_page.side_effect = record
+    iterator = iter_paginated(paginated, "get_files", per_page=10, prefetch=True)
+
+    assert next(iterator) == 0
+    assert second_page_requested.wait(timeout=5)
+    assert [0] + list(iterator) == items
+    assert requested_pages(paginated) == [0, 1, 2]
+
+def test_no_page_is_requested_until_iteration_starts():
+    paginated, _ = make_paginated(5, per_page=10)
+
+    iterator = iter_paginated(paginated, "get_files", per_page=10)
+
+    assert paginated.get_page.call_count == 0
+    assert list(iterator) == [0, 1, 2, 3, 4]
+
+def test_first_page_and_pages_limit_the_requested_pages():
+    paginated, items = make_paginated(45, per_page=10)
+
+    assert list(iter_paginated(paginated, "get_files", per_page=10, prefetch=True, first_page=1, pages=2)) == items[10:30]
+    assert requested_pages(paginated) == [1, 2]
@@ -0,0 +1,33 @@
+from src.github.review_batches import batch_comments, rejects_comments, review_result, split_batch
+
+
+def make_comment(line, body="Typo"):
+    return {'path': 'README.md', 'line': line, 'side': 'RIGHT', 'body': body}
+
+def test_batches_are_bounded_by_count_and_size():
+    comments = [make_comment(line) for line in range(7)] + [make_comment(7, "x" * 500), make_comment(8)]
+
+    batches = batch_comments(comments, max_comments=3, max_bytes=400)
+
+    assert [[comment['line'] for comment in batch] for batch in batches] == [[0, 1, 2], [3, 4, 5], [6], [7], [8]]
+
+def test_no_comments_make_one_empty_batch():
+    assert batch_comments([]) == [[]]
+
+def test_split_batch():
+    assert split_batch([1, 2, 3]) == [[1], [2, 3]]
+    assert split_batch([1]) == []
+
+def test_review_result():
+    assert review_result(3, 0, [], 3)['status'] == 'success'
+    assert review_result(2, 1, [(422, None)], 3)['status'] == 'success'
+    assert review_result(0, 1, [(422, None)], 1)['message'].startswith('Validation failed')
+    assert review_result(2, 0, [(403, None)], 4)['message'] == \
+        'Posted 2 of 4 comments. Forbidden: You may not have permissions to post a comment.'
+
+def test_rejects_comments():
+    assert rejects_comments({'message': 'Validation Failed'})
+    assert rejects_comments({'message': 'Unprocessable Entity',
+                             'errors': ['Pull request review thread line must be part of the diff']})
+    assert rejects_comments({'errors': [{'resource': 'PullRequestReviewComment', 'field': 'path', 'code': 'invalid'}]})
+    assert not rejects_comments({'message': 'Unprocessable Entity', 'errors': ['Commit could not be resolved']})
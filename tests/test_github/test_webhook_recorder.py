@@ -0,0 +1,77 @@
+import json
+import pytest
+
+from src.github.webhook_recorder import WebhookRecorder, configure_recording, get_recorder, read_recording
+from src.github.webhook_handler import app
+
+HEADERS = {
+    'X-GitHub-Event': 'pull_request',
+    'X-GitHub-Delivery': 'delivery-1',
+    'X-Hub-Signature-256': 'sha256=abc',
+    'Content-Type': 'application/json',
+    'Authorization': 'Bearer secret',
+    'X-Forwarded-For': '10.0.0.1',
+}
+
+
+@pytest.fixture
+def no_recording(monkeypatch):
+    monkeypatch.delenv('WEBHOOK_RECORD_PATH', raising=False)
+    yield
+    configure_recording({})
+
+@pytest.mark.parametrize("name", ["webhooks.jsonl", "webhooks.jsonl.gz"])
+def test_recorder_round_trips_deliveries(tmp_path, name):
+    path = str(tmp_path / "recordings" / name)
+    recorder = WebhookRecorder(path)
+    recorder.record(HEADERS, b'{"action": "opened"}', received_at=100.0)
+    recorder.record(HEADERS, 'café'.encode('utf-8'), received_at=101.5)
+    recorder.close()
+
+    deliveries = list(read_recording(path))
+
+    assert [delivery['time'] for delivery in deliveries] == [100.0, 101.5]
+    assert deliveries[0]['body'] == b'{"action": "opened"}'
+    assert deliveries[1]['body'] == 'café'.encode('utf-8')
+    assert deliveries[0]['headers'] == {
+        'X-GitHub-Event': 'pull_request',
+        'X-GitHub-Delivery': 'delivery-1',
+        'X-Hub-Signature-256': 'sha256=abc',
+        'Content-Type': 'application/json',
+    }
+
+def test_recorder_appends_to_existing_recordings(tmp_path):
+    path = str(tmp_path / "webhooks.jsonl.gz")
+    for body in (b'first', b'second'):
+        recorder = WebhookRecorder(path)
+        recorder.record(HEADERS, body)
+        recorder.close()
+    assert [delivery['body'] for delivery in read_recording(path)] == [b'first', b'second']
+
+def test_recorder_drops_deliveries_when_the_queue_is_full(tmp_path):
+    recorder = WebhookRecorder(str(tmp_path / "webhooks.jsonl"), queue_size=1)
+    # Without a writer thread the queue is never drained
+    recorder.close()
+    recorder.record(HEADERS, b'queued')
+    recorder.record(HEADERS, b'dropped')
+    assert recorder.dropped == 1
+
+def test_recording_is_off_without_a_path(no_recording):
+    configure_recording({})
+    assert get_recorder() is None
+
+def test_webhook_records_deliveries(tmp_path, no_recording, monkeypatch):
+    path = str(tmp_path / "webhooks.jsonl")
+    monkeypatch.setenv('WEBHOOK_RECORD_PATH', path)
+    configure_recording({})
+    body = json.dumps({'action': 'closed', 'number': 1})
+
+    response = app.test_client().post('/webhook', data=body, headers={
+        'X-GitHub-Event': 'pull_request', 'X-GitHub-Delivery': 'delivery-2', 'Content-Type': 'application/json'})
+    get_recorder().close()
+
+    assert response.status_code == 200
+    delivery, = read_recording(path)
+    assert delivery['body'] == body.encode('utf-8')
+    headers = {name.lower(): value for name, value in delivery['headers'].items()}
+    assert headers['x-github-delivery'] == 'delivery-2'
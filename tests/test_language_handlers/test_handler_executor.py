@@ -0,0 +1,104 @@
+import threading
+import pytest
+from concurrent.futures import BrokenExecutor, Future
+from unittest.mock import MagicMock
+
+from src.language_handlers.handler_executor import (
+    InlineHandlerExecutor, ProcessHandlerExecutor, ReviewTask, create_handler_executor, merge_results
+)
+from src.language_handlers.registry import registry
+
+
+def make_tasks():
+    return [
+        ReviewTask("markdown", "docs/a.md", "This is a tesst.\nAll good.\nAnother mistaek.\n"),
+        ReviewTask("markdown", "docs/b.md", "Nothing wrong here.\n"),
+        ReviewTask("markdown", "docs/c.md", "Fine line.\nteh typo\n", line_ranges=[(2, 2)]),
+        ReviewTask("markdown", "README.md", "Some wrongg words and more wrongg words.\n" * 3,
+                   extra_words=frozenset({"wrongg"})),
+    ]
+
+def test_merge_results_groups_by_path_and_sorts_by_line():
+    merged = merge_results([
+        [("a.md", [{'line': 5, 'comment': 'x'}], 0.1)],
+        [("a.md", [{'line': 2, 'comment': 'y'}], 0.1), ("b.md", [], 0.1)],
+    ])
+
+    assert merged == {
+        "a.md": [{'line': 2, 'comment': 'y'}, {'line': 5, 'comment': 'x'}],
+        "b.md": [],
+    }
+
+def test_inline_executor_returns_comments_by_path():
+    executor = InlineHandlerExecutor()
+
+    results = executor.submit(make_tasks()).result()
+
+    assert [comment['line'] for comment in results["docs/a.md"]] == [1, 3]
+    assert results["docs/b.md"] == []
+    assert [comment['line'] for comment in results["docs/c.md"]] == [2]
+    assert results["README.md"] == []
+
+def test_inline_executor_reports_errors_through_the_future(mocker):
+    executor = InlineHandlerExecutor()
+    mocker.patch.object(registry.get_handler("markdown"), 'review', side_effect=RuntimeError("boom"))
+
+    future = executor.submit(make_tasks())
+
+    with pytest.raises(RuntimeError, match="boom"):
+        future.result()
+
+def test_process_executor_matches_inline_results():
+    expected = InlineHandlerExecutor().submit(make_tasks()).result()
+    executor = ProcessHandlerExecutor(workers=2, chunk_size=1)
+    try:
+        results = executor.submit(make_tasks()).result(timeout=60)
+    finally:
+        executor.shutdown()
+
+    assert results == expected
+
+def test_process_executor_handles_no_tasks():
+    executor = ProcessHandlerExecutor(workers=1)
+    try:
+        assert executor.submit([]).result() == {}
+    finally:
+        executor.shutdown()
+
+def test_files_of_a_dead_worker_are_not_checked_on_the_pool_thread(mocker):
+    executor = ProcessHandlerExecutor(workers=1, chunk_size=4)
+    chunk_future = Future()
+    executor._pool = MagicMock()
+    executor._pool.submit.return_value = chunk_future
+    mocker.patch.object(executor, '_create_pool', return_value=MagicMock())
+    threads = []
+    run_inline = executor._run_inline
+    mocker.patch.object(executor, '_run_inline',
+                        side_effect=lambda chunk: threads.append(threading.current_thread().name) or run_inline(chunk))
+
+    future = executor.submit(make_tasks())
+    pool_thread = threading.Thread(target=chunk_future.set_exception, args=(BrokenExecutor("worker died"),),
+                                   name="pool-management")
+    pool_thread.start()
+    pool_thread.join()
+
+    assert future.result(timeout=30) == InlineHandlerExecutor().submit(make_tasks()).result()
+    assert threads == ["spellcheck-fallback"]
+
+def test_create_handler_executor_selects_backend(monkeypatch):
+    monkeypatch.delenv('REVIEW_EXECUTOR', raising=False)
+    monkeypatch.delenv('REVIEW_WORKERS', raising=False)
+
+    assert isinstance(create_handler_executor({}), InlineHandlerExecutor)
+
+    executor = create_handler_executor({'review': {'executor': 'process', 'workers': 3, 'chunk_size': 2}})
+    try:
+        assert isinstance(executor, ProcessHandlerExecutor)
+        assert executor.workers == 3
+        assert executor.chunk_size == 2
+    finally:
+        executor.shutdown()
+
+    monkeypatch.setenv('REVIEW_EXECUTOR', 'bogus')
+    with pytest.raises(ValueError):
+        create_handler_executor({})
@@ -0,0 +1,83 @@
+from src.language_handlers.markdown_document import (
+    BLANK, CODE_FENCE, FRONT_MATTER, HTML, PROSE, TABLE, Block, MarkdownDocument
+)
+
+DOCUMENT = """---
+title: Example
+---
+# Heading
+Prose line.
+
+```python
+def function(): pass
+```
+
+| Name | Value |
+| ---- | :---: |
+| one  | two   |
+
+<div align="center">
+  <img src="logo.png">
+</div>
+
+~~~~
+```
+still code
+~~~~
+After the fence.
+"""
+
+
+def test_blocks_are_classified_by_kind():
+    document = MarkdownDocument(DOCUMENT)
+    assert document.blocks == [
+        Block(FRONT_MATTER, 1, 3),
+        Block(PROSE, 4, 5),
+        Block(BLANK, 6, 6),
+        Block(CODE_FENCE, 7, 9),
+        Block(BLANK, 10, 10),
+        Block(TABLE, 11, 13),
+        Block(BLANK, 14, 14),
+        Block(HTML, 15, 17),
+        Block(BLANK, 18, 18),
+        Block(CODE_FENCE, 19, 22),
+        Block(PROSE, 23, 23),
+    ]
+
+def test_text_line_numbers_skips_non_prose():
+    document = MarkdownDocument(DOCUMENT)
+    assert list(document.text_line_numbers()) == [4, 5, 11, 12, 13, 23]
+    assert list(document.text_line_numbers([1, 5, 8, 12])) == [5, 12]
+
+def test_iter_blocks_and_block_text():
+    document = MarkdownDocument(DOCUMENT)
+    code = list(document.iter_blocks({CODE_FENCE}))
+    assert document.block_text(code[0]) == "```python\ndef function(): pass\n```"
+
+def test_unclosed_front_matter_is_prose():
+    document = MarkdownDocument("---\nNot front matter\n")
+    assert document.line_kinds == [PROSE, PROSE]
+
+def test_multiline_html_comment():
+    document = MarkdownDocument("<!-- start\nstill comment\n\nend -->\nText\n")
+    assert document.line_kinds == [HTML, HTML, HTML, HTML, PROSE]
+
+def test_inline_html_line_with_text_is_prose():
+    document = MarkdownDocument("<b>Bold</b> text continues\n")
+    assert document.line_kinds == [PROSE]
+
+def test_prose_text_masks_inline_constructs():
+    line = ("Run `pip instal` from https://exampel.com/pth or <https://autolnk.io>, "
+            "see [the docs](./docz/setpu.md \"Titel\") and <kbd>Ctrl</kbd>&nbsp;now.")
+    document = MarkdownDocument(line)
+    masked = document.prose_text(1)
+
+    assert len(masked) == len(line)
+    for hidden in ("instal", "exampel", "autolnk", "docz", "setpu", "Titel", "kbd", "nbsp"):
+        assert hidden not in masked
+    for kept in ("Run", "from", "the docs", "Ctrl", "now"):
+        assert kept in masked
+
+def test_link_reference_definitions_are_masked():
+    document = MarkdownDocument("[docs]: https://exampel.com/refrence\n")
+    assert document.prose_text(1).strip() == ""
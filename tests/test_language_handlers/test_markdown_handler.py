@@ -0,0 +1,83 @@
+import pytest
+from spellchecker import SpellChecker
+
+from src.language_handlers.markdown_handler import MarkdownHandler, to_line_ranges
+from src.utils.lru_cache import LRUCache
+
+
+@pytest.fixture(scope="module")
+def handler():
+    return MarkdownHandler()
+
+def test_review_flags_misspellings_with_line_numbers(handler):
+    content = "# Markdown Header\nThis is a tesst file.\nAll good here.\n"
+    comments = handler.review(content)
+    assert comments == [{
+        'line': 2,
+        'comment': "Possible spelling mistake: 'tesst'. Did you mean 'test'?"
+    }]
+
+def test_review_reports_repeated_typos_on_every_line(handler, mocker):
+    content = "teh first line\nteh second line\nno typo\nteh and teh again\n"
+    correction = mocker.spy(SpellChecker, 'correction')
+
+    comments = handler.review(content, correction_cache=LRUCache("test", maxsize=10))
+
+    assert [comment['line'] for comment in comments] == [1, 2, 4]
+    assert correction.call_count == 1
+
+def test_review_reuses_corrections_across_reviews(handler, mocker):
+    cache = LRUCache("test", maxsize=10)
+    correction = mocker.spy(SpellChecker, 'correction')
+
+    first = handler.review("a wrongg word\n", correction_cache=cache)
+    second = handler.review("another wrongg word\n", correction_cache=cache)
+
+    assert first[0]['comment'] == second[0]['comment']
+    assert correction.call_count == 1
+    assert cache.hits == 1
+
+def test_review_splits_identifiers(handler):
+    comments = handler.review("Use snake_case_wrod and CamelCaseTpyo here.\n")
+    flagged = {comment['comment'] for comment in comments}
+    assert any("'wrod'" in comment for comment in flagged)
+    assert any("'tpyo'" in comment for comment in flagged)
+
+def test_review_skips_single_letters_and_numbers(handler):
+    assert handler.review("A list of 3 items: x, y and 1e5.\n") == []
+
+def test_review_checks_only_requested_line_ranges(handler, mocker):
+    content = "teh first\nclean line\nsecnd typo\nthrid typo\nlast linne\n"
+    tokenize = mocker.spy(MarkdownHandler, '_tokenize')
+
+    comments = handler.review(content, line_ranges=[(3, 4), (4, 4), (9, 12)])
+
+    assert [comment['line'] for comment in comments] == [3, 4]
+    assert [line_number for line_number, _ in tokenize.spy_return] == [3, 4]
+
+def test_review_with_empty_line_ranges_checks_nothing(handler):
+    assert handler.review("teh typo\n", line_ranges=[]) == []
+
+def test_to_line_ranges_collapses_consecutive_lines():
+    assert to_line_ranges({7, 1, 2, 3, 5, 6}) == [(1, 3), (5, 7)]
+    assert to_line_ranges([]) == []
+
+def test_review_ignores_code_urls_and_link_targets(handler):
+    content = (
+        "Start with `inlne_code` and https://exampel.com/pth.\n"
+        "```\n"
+        "fnuc = undefinedd()\n"
+        "```\n"
+        "See [guide](./docz/setpu.md) for a tesst.\n"
+    )
+    comments = handler.review(content)
+    assert [(comment['line'], comment['comment']) for comment in comments] == [
+        (5, "Possible spelling mistake: 'tesst'. Did you mean 'test'?")
+    ]
+
+def test_review_accepts_extra_words(handler):
+    content = "Deploy with kubectll and flurb.\n"
+    comments = handler.review(content, extra_words=frozenset({'kubectll'}))
+    assert [comment['comment'] for comment in comments] == [
+        "Possible spelling mistake: 'flurb'. Did you mean 'blurb'?"
+    ]
@@ -0,0 +1,50 @@
+import sys
+import subprocess
+
+import pytest
+
+from src.language_handlers.registry import HandlerRegistry, registry
+
+
+@pytest.fixture
+def handler_registry():
+    handler_registry = HandlerRegistry()
+    handler_registry.register("markdown", ("*.md", ".markdown"), handler="collections:OrderedDict")
+    handler_registry.register("archive", ("*.tar.gz",), handler="collections:Counter")
+    handler_registry.register("notes", ("docs/notes/*.txt",), handler="collections:deque",
+                              llm_agent="collections:UserList")
+    return handler_registry
+
+def test_match_by_suffix(handler_registry):
+    assert handler_registry.match("README.md") == "markdown"
+    assert handler_registry.match("docs/guide.v2.md") == "markdown"
+    assert handler_registry.match("docs/guide.markdown") == "markdown"
+    assert handler_registry.match("release.tar.gz") == "archive"
+    assert handler_registry.match("app.py") is None
+    assert handler_registry.match("Makefile") is None
+    assert handler_registry.match("README.MD") is None
+
+def test_globs_take_precedence(handler_registry):
+    assert handler_registry.match("docs/notes/today.txt") == "notes"
+    assert handler_registry.match("docs/other/today.txt") is None
+
+def test_handlers_are_created_once_on_first_use(handler_registry):
+    handler = handler_registry.get_handler("markdown")
+
+    assert type(handler).__name__ == "OrderedDict"
+    assert handler_registry.get_handler("markdown") is handler
+
+def test_create_llm_agent(handler_registry):
+    assert handler_registry.create_llm_agent("markdown", object()) is None
+    assert list(handler_registry.create_llm_agent("notes", [1, 2])) == [1, 2]
+
+def test_default_registry_reviews_markdown():
+    assert registry.match("docs/index.md") == "markdown"
+    assert registry.get("markdown").handler == "src.language_handlers.markdown_handler:MarkdownHandler"
+
+def test_importing_the_review_agent_does_not_load_handlers():
+    code = ("import sys, src.agents.pr_review_agent; "
+            "print('src.language_handlers.markdown_handler' in sys.modules, 'src.agents.markdown_llm_agent' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.split() == ["False", "False"]
@@ -0,0 +1,81 @@
+import os
+
+from src.language_handlers import spell_dictionary
+from src.language_handlers.markdown_handler import MarkdownHandler
+
+
+def test_load_word_frequencies_writes_and_reuses_cache(tmp_path, mocker):
+    mocker.patch.dict(os.environ, {'SPELL_DICTIONARY_CACHE_DIR': str(tmp_path)})
+    build = mocker.spy(spell_dictionary, '_build_word_frequencies')
+
+    first = spell_dictionary.load_word_frequencies()
+    cache_files = list(tmp_path.glob("spell_en_*.json"))
+    second = spell_dictionary.load_word_frequencies()
+
+    assert len(cache_files) == 1
+    assert build.call_count == 1
+    assert first == second
+    assert 'watsonx' in first
+    assert first['node_modules'] >= 1
+
+def test_unreadable_cache_is_rebuilt(tmp_path, mocker):
+    mocker.patch.dict(os.environ, {'SPELL_DICTIONARY_CACHE_DIR': str(tmp_path)})
+    path = spell_dictionary._cache_path()
+    with open(path, "wb") as file:
+        file.write(b"not a word table")
+
+    frequencies = spell_dictionary.load_word_frequencies()
+
+    assert 'the' in frequencies
+    assert spell_dictionary._read_cache(path) == frequencies
+
+def test_cache_is_written_to_a_private_directory(tmp_path, mocker):
+    cache_dir = tmp_path / "cache"
+    mocker.patch.dict(os.environ, {'SPELL_DICTIONARY_CACHE_DIR': str(cache_dir)})
+
+    spell_dictionary.load_word_frequencies()
+
+    [path] = cache_dir.iterdir()
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+
+def test_cache_writable_by_others_is_not_read(tmp_path, mocker):
+    mocker.patch.dict(os.environ, {'SPELL_DICTIONARY_CACHE_DIR': str(tmp_path)})
+    spell_dictionary.load_word_frequencies()
+    path = spell_dictionary._cache_path()
+    os.chmod(path, 0o666)
+    build = mocker.spy(spell_dictionary, '_build_word_frequencies')
+
+    assert 'the' in spell_dictionary.load_word_frequencies()
+    assert build.call_count == 1
+
+def test_spell_checker_is_shared_between_handlers():
+    assert MarkdownHandler().spell is MarkdownHandler().spell
+    assert spell_dictionary.get_spell_checker().known(['kubernetes', 'Markdown']) == {'kubernetes', 'markdown'}
+
+def test_correction_caches_are_per_repository_and_persisted(tmp_path):
+    spell_dictionary.configure_correction_cache({'correction_cache_size': 5, 'correction_cache_dir': str(tmp_path)})
+    try:
+        cache = spell_dictionary.get_correction_cache("owner/repo")
+        assert spell_dictionary.get_correction_cache("owner/repo") is cache
+        assert spell_dictionary.get_correction_cache("owner/other") is not cache
+        assert cache.maxsize == 5
+
+        cache.put("teh", "the")
+        cache.save()
+        assert (tmp_path / "owner__repo.json").exists()
+    finally:
+        spell_dictionary.configure_correction_cache({})
+
+def test_correction_cache_lookups_are_not_recorded_as_cache_requests(mocker):
+    record = mocker.patch('src.utils.lru_cache.record_cache_access')
+    spell_dictionary.configure_correction_cache({})
+
+    spell_dictionary.get_correction_cache("owner/repo")
+    spell_dictionary.get_correction_cache("owner/repo")
+
+    record.assert_not_called()
+
+def test_parse_wordlist_ignores_comments_and_blank_lines():
+    text = "# Product names\nWatsonX  Granite\n\nsmee # relay tool\n"
+    assert spell_dictionary.parse_wordlist(text) == frozenset({'watsonx', 'granite', 'smee'})
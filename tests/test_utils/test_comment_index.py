@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from src.utils.comment_index import CommentIndex, anchor_from_diff_hunk, fingerprint, normalize_anchor
+
+
+def make_comment(path, diff_hunk, body, line=None):
+    return SimpleNamespace(path=path, diff_hunk=diff_hunk, body=body, line=line)
+
+def test_anchor_from_diff_hunk_uses_last_line():
+    diff_hunk = "@@ -1,2 +1,3 @@\n line one\n+Thiss is   a tesst line  \n"
+
+    assert anchor_from_diff_hunk(diff_hunk) == "Thiss is a tesst line"
+    assert anchor_from_diff_hunk("@@ -1 +1 @@") == ""
+    assert anchor_from_diff_hunk(None) == ""
+
+def test_fingerprint_ignores_whitespace():
+    assert fingerprint("Possible  spelling mistake\n") == fingerprint("Possible spelling mistake")
+    assert fingerprint("Possible spelling mistake") != fingerprint("Another comment")
+
+def test_index_matches_after_line_shift_and_new_commit():
+    index = CommentIndex.from_review_comments([
+        make_comment("README.md", "@@ -1,2 +1,3 @@\n line one\n+Thiss is a tesst line", "Fix 'thiss'", line=2),
+    ])
+
+    # The same line, now further down and reindented, with the same comment
+    assert index.contains("README.md", "    Thiss is a tesst line", "Fix 'thiss'")
+    assert not index.contains("README.md", "Thiss is a tesst line", "Fix 'tesst'")
+    assert not index.contains("docs/other.md", "Thiss is a tesst line", "Fix 'thiss'")
+    assert len(index) == 1
+
+def test_comments_for_path():
+    index = CommentIndex()
+    index.add("a.md", "first", "one", line=1)
+    index.add("a.md", "first", "one", line=1)
+    index.add("b.md", "second", "two")
+
+    assert index.comments_for_path("a.md") == [{'line': 1, 'comment': "one"}]
+    assert index.comments_for_path("missing.md") == []
+    assert normalize_anchor("  a \t b ") == "a b"
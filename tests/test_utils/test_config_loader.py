@@ -1,7 +1,10 @@
 import os
+import time
 import pytest
 from ruamel.yaml import YAML
-from src.utils.config_loader import ConfigLoader
+from src.utils.config_loader import (
+    ConfigLoader, get_config_snapshot, reload_config, set_config_dir, start_config_watcher, stop_config_watcher, thaw
+)
 
 yaml = YAML()
 
@@ -63,3 +66,67 @@ def test_invalid_yaml_file(config_loader, mocker):
 
     with pytest.raises(ValueError):
         config_loader.get_config()
+
+@pytest.fixture
+def config_dir(tmp_path):
+    # A minimal configuration directory; the snapshot is pointed back at ./config afterwards
+    (tmp_path / "agents").mkdir()
+    (tmp_path / "config.yaml").write_text("app_name: test\nreview:\n  chunk_size: 2\n")
+    (tmp_path / "db_config.yaml").write_text(open("tests/test_data/valid_db_config.yaml").read())
+    (tmp_path / "watsonx_models.yaml").write_text("watsonx:\n  api_url: http://localhost\n")
+    (tmp_path / "agents" / "test_agent.yaml").write_text("prompt: first\nparameters:\n  stop_sequences: []\n")
+    set_config_dir(str(tmp_path))
+    yield tmp_path
+    stop_config_watcher()
+    set_config_dir("./config")
+
+def test_snapshot_is_loaded_once_and_read_only(config_dir, mocker):
+    get_config = mocker.spy(ConfigLoader, 'get_config')
+
+    snapshot = get_config_snapshot()
+
+    assert get_config_snapshot() is snapshot
+    assert get_config.call_count == 1
+    assert snapshot.config['review']['chunk_size'] == 2
+    assert snapshot.config['models']['watsonx']['api_url'] == "http://localhost"
+    assert snapshot.agent_config("test_agent")['prompt'] == "first"
+    assert snapshot.agent_config("missing") == {}
+    with pytest.raises(TypeError):
+        snapshot.config['review']['chunk_size'] = 3
+    assert thaw(snapshot.agent_config("test_agent")['parameters']) == {'stop_sequences': []}
+
+def test_reload_swaps_the_snapshot_when_files_change(config_dir):
+    snapshot = get_config_snapshot()
+
+    assert not reload_config()
+
+    agent_file = config_dir / "agents" / "test_agent.yaml"
+    agent_file.write_text("prompt: second\n")
+    os.utime(agent_file, ns=(0, 0))
+
+    assert reload_config()
+    assert get_config_snapshot().version == snapshot.version + 1
+    assert get_config_snapshot().agent_config("test_agent")['prompt'] == "second"
+    # Holders of the old snapshot keep a consistent view
+    assert snapshot.agent_config("test_agent")['prompt'] == "first"
+
+def test_reload_keeps_the_snapshot_on_errors(config_dir):
+    snapshot = get_config_snapshot()
+    (config_dir / "config.yaml").write_text("app_name: [unterminated\n")
+
+    assert not reload_config(force=True)
+    assert get_config_snapshot() is snapshot
+
+def test_config_watcher_reloads_changed_files(config_dir):
+    get_config_snapshot()
+    start_config_watcher(0.01)
+
+    config_file = config_dir / "config.yaml"
+    config_file.write_text("app_name: watched\n")
+    os.utime(config_file, ns=(0, 0))
+
+    for _ in range(500):
+        if get_config_snapshot().config['app_name'] == "watched":
+            break
+        time.sleep(0.01)
+    assert get_config_snapshot().config['app_name'] == "watched"
@@ -0,0 +1,87 @@
+from src.utils.diff_index import DiffIndex, get_diff_index
+
+PATCH = (
+    "@@ -1,4 +1,4 @@\n"
+    " # Title\n"
+    "-This is teh old line.\n"
+    "+This is the new line.\n"
+    " Unchanged\n"
+    " Also unchanged\n"
+    "@@ -10,3 +10,4 @@ Section\n"
+    " Context\n"
+    "+Brand new line\n"
+    "-Dropped  words here\n"
+    "+Dropped words\n"
+    " End\n"
+)
+
+
+def test_added_lines_and_text():
+    index = DiffIndex(PATCH, "README.md")
+
+    assert index.added_lines == {2, 11, 12}
+    assert index.is_added(2)
+    assert not index.is_added(1)
+    assert index.added_text(11) == "Brand new line"
+    assert index.added_text(1) is None
+    assert index.changed_text == "This is the new line.\nBrand new line\nDropped words\n"
+
+def test_hunks_and_positions():
+    index = DiffIndex(PATCH, "README.md")
+
+    assert len(index.hunks) == 2
+    assert index.hunk_for_line(3) is index.hunks[0]
+    assert index.hunk_for_line(11) is index.hunks[1]
+    assert index.hunk_for_line(7) is None
+    assert index.hunks[1].section_header == "Section"
+    # Positions count lines below the first '@@' header, including removed lines and later headers
+    assert index.positions[1] == 1
+    assert index.positions[2] == 3
+    assert index.hunks[1].position == 6
+    assert index.positions[10] == 7
+    assert index.positions[12] == 10
+
+def test_is_commentable_covers_added_and_context_lines():
+    index = DiffIndex(PATCH, "README.md")
+
+    assert index.is_commentable(1)
+    assert index.is_commentable(11)
+    assert not index.is_commentable(5)
+    assert not index.is_commentable(100)
+
+def test_changed_parts_skips_lines_without_new_words():
+    index = DiffIndex(PATCH, "README.md")
+
+    assert index.changed_parts == [
+        {'line': 2, 'changes': "This is the new line."},
+        {'line': 11, 'changes': "Brand new line"},
+    ]
+
+def test_empty_patch():
+    index = DiffIndex(None, "image.png")
+
+    assert index.added_lines == frozenset()
+    assert index.hunks == []
+    assert index.changed_parts == []
+
+def test_get_diff_index_parses_once_per_head_and_patch():
+    first = get_diff_index("docs/a.md", "sha-1", PATCH)
+
+    assert get_diff_index("docs/a.md", "sha-1", PATCH) is first
+    assert get_diff_index("docs/a.md", "sha-2", PATCH) is not first
+
+    rebased = get_diff_index("docs/a.md", "sha-1", "@@ -1 +1 @@\n-a\n+b\n")
+    assert rebased is not first
+    assert rebased.added_lines == {1}
+
+def test_changed_parts_pairs_long_runs_in_order():
+    before = [f"line {number} alpha beta" for number in range(300)]
+    after = [line.replace("alpha", "gamma") if number % 3 == 0 else
+             line.replace(" beta", "") if number % 3 == 1 else f"  {line}"
+             for number, line in enumerate(before)]
+    patch = "@@ -1,300 +1,300 @@\n" + "".join(f"-{line}\n" for line in before) + "".join(f"+{line}\n" for line in after)
+
+    parts = DiffIndex(patch, "long.md").changed_parts
+
+    assert [part['line'] for part in parts] == list(range(1, 301, 3))
+    assert parts[1] == {'line': 4, 'changes': "line 3 gamma beta"}
@@ -0,0 +1,81 @@
+import subprocess
+import pytest
+
+from src.utils.diff_index import DiffIndex
+from src.utils.local_diffs import content_from_patch, iter_git_changes, iter_patch_dir
+
+
+def run_git(repo, *args):
+    subprocess.run(['git', '-C', str(repo), *args], check=True, capture_output=True)
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    run_git(repo, 'init', '-q')
+    run_git(repo, 'config', 'user.email', 'dev@example.com')
+    run_git(repo, 'config', 'user.name', 'Dev')
+    for message, files in (("one", {"README.md": "# Title\n"}),
+                           ("two", {"README.md": "# Title\n\nSecond line.\n", "guide.md": "Guide\n"}),
+                           ("three", {"README.md": "# Title\n\nSecond line.\nThird line.\n"})):
+        for name, content in files.items():
+            (repo / name).write_text(content)
+        run_git(repo, 'add', '.')
+        run_git(repo, 'commit', '-q', '-m', message)
+    return repo
+
+def patches_of(change):
+    return dict(change.iter_patches(lambda path: True))
+
+def test_git_range_is_one_change_with_head_contents(repo):
+    changes = list(iter_git_changes(str(repo), ['HEAD~2..HEAD']))
+
+    assert [change.name for change in changes] == ['HEAD~2..HEAD']
+    patches = patches_of(changes[0])
+    assert sorted(patches) == ['README.md', 'guide.md']
+    assert patches['README.md'].startswith('@@ -1 +1,4 @@')
+    assert changes[0].read_file('README.md') == "# Title\n\nSecond line.\nThird line.\n"
+    assert changes[0].read_file('missing.md') is None
+
+def test_git_range_per_commit_yields_every_commit_in_order(repo):
+    changes = list(iter_git_changes(str(repo), ['HEAD~2..HEAD'], per_commit=True))
+
+    assert len(changes) == 2
+    assert sorted(patches_of(changes[0])) == ['README.md', 'guide.md']
+    assert list(patches_of(changes[1])) == ['README.md']
+
+def test_single_commit_is_compared_with_its_parent_or_the_empty_tree(repo):
+    root, = iter_git_changes(str(repo), ['HEAD~2'])
+    assert patches_of(root) == {'README.md': '@@ -0,0 +1 @@\n+# Title\n'}
+
+def test_unknown_revision_raises(repo):
+    with pytest.raises(subprocess.CalledProcessError):
+        list(iter_git_changes(str(repo), ['no-such-branch..HEAD']))
+
+def test_patch_dir_reads_patch_files_in_name_order(repo, tmp_path):
+    patch_dir = tmp_path / "patches"
+    patch_dir.mkdir()
+    diff = subprocess.run(['git', '-C', str(repo), 'diff', 'HEAD~1', 'HEAD'], capture_output=True, check=True).stdout
+    (patch_dir / "b.diff").write_bytes(diff)
+    (patch_dir / "a.patch").write_bytes(diff)
+    (patch_dir / "notes.txt").write_text("not a patch")
+
+    changes = list(iter_patch_dir(str(patch_dir)))
+
+    assert [change.name for change in changes] == ['a.patch', 'b.diff']
+    assert list(patches_of(changes[0])) == ['README.md']
+    assert changes[0].read_file('README.md') is None
+    assert changes[0].head == changes[1].head
+
+def test_patch_dir_reads_contents_from_source_dir(repo, tmp_path):
+    patch_dir = tmp_path / "patches"
+    patch_dir.mkdir()
+    (patch_dir / "a.patch").write_text("")
+
+    change, = iter_patch_dir(str(patch_dir), source_dir=str(repo))
+
+    assert change.read_file('guide.md') == "Guide\n"
+
+def test_content_from_patch_keeps_line_numbers():
+    diff_index = DiffIndex("@@ -3,2 +3,3 @@\n three\n+added\n four\n", "README.md")
+    assert content_from_patch(diff_index) == "\n\nthree\nadded\nfour\n"
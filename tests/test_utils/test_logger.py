@@ -0,0 +1,130 @@
+import json
+import queue
+import logging
+import pytest
+
+from src.utils.logger import (
+    AsyncQueueHandler, JsonFormatter, SamplingFilter, TruncatingFilter, configure_logging, stop_logging
+)
+from src.utils.metrics import LOG_RECORDS_DROPPED
+from src.utils.tracing import configure_tracing, start_trace
+
+
+def make_record(msg, *args, level=logging.DEBUG, exc_info=None):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, exc_info)
+
+@pytest.fixture
+def root_level():
+    root = logging.getLogger()
+    level = root.level
+    yield
+    stop_logging()
+    root.setLevel(level)
+
+def test_queue_handler_bounds_large_arguments_without_formatting():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=50)
+    payload = {'pull_request': {'body': 'x' * 10000, 'files': list(range(1000))}}
+    record = make_record("Payload: %s", payload)
+
+    prepared = handler.prepare(record)
+
+    assert prepared.msg == "Payload: %s"
+    assert len(prepared.getMessage()) < 400
+    assert record.args is payload
+
+def test_queue_handler_bounds_mapping_arguments():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=5)
+    prepared = handler.prepare(make_record("%(repo)s #%(number)d", {'repo': 'test/repository', 'number': 7}))
+    assert prepared.getMessage() == "test/... (10 more characters) #7"
+
+def test_queue_handler_keeps_small_arguments_as_is():
+    handler = AsyncQueueHandler(queue.Queue())
+    prepared = handler.prepare(make_record("%d comments on %s", 3, "README.md"))
+    assert prepared.args == (3, "README.md")
+    assert prepared.getMessage() == "3 comments on README.md"
+
+def test_queue_handler_logs_objects_with_str():
+    from pathlib import Path
+
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=20)
+    prepared = handler.prepare(make_record("Failed to read %s: %s", Path("docs/a.md"), ValueError("bad value")))
+    assert prepared.getMessage() == "Failed to read docs/a.md: bad value"
+
+    prepared = handler.prepare(make_record("Error: %s", RuntimeError("x" * 30)))
+    assert prepared.getMessage() == "Error: " + "x" * 20 + "... (10 more characters)"
+
+def test_queue_handler_truncates_long_strings():
+    handler = AsyncQueueHandler(queue.Queue(), max_field_chars=10)
+    prepared = handler.prepare(make_record("%s", "a" * 25))
+    assert prepared.getMessage() == "aaaaaaaaaa... (15 more characters)"
+
+def test_queue_handler_renders_exceptions_on_the_calling_thread():
+    handler = AsyncQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        import sys
+        record = make_record("failed", level=logging.ERROR, exc_info=sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.exc_info is None
+    assert "ValueError: boom" in prepared.exc_text
+
+def test_queue_handler_drops_records_when_the_queue_is_full():
+    handler = AsyncQueueHandler(queue.Queue(maxsize=1))
+    before = LOG_RECORDS_DROPPED._value.get()
+    handler.handle(make_record("first"))
+    handler.handle(make_record("second"))
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED._value.get() == before + 1
+
+def test_queue_handler_records_the_trace_id(tmp_path):
+    configure_tracing({'enabled': True, 'output_dir': str(tmp_path)})
+    handler = AsyncQueueHandler(queue.Queue())
+    try:
+        with start_trace("webhook", delivery_id="delivery-1"):
+            prepared = handler.prepare(make_record("inside"))
+    finally:
+        configure_tracing({'enabled': False})
+    assert prepared.trace_id
+    assert handler.prepare(make_record("outside")).trace_id is None
+
+@pytest.mark.parametrize("rate, expected", [(0.0, False), (1.0, True)])
+def test_sampling_filter_samples_debug_records(rate, expected):
+    sampling = SamplingFilter(rate)
+    assert sampling.filter(make_record("debug")) is expected
+    assert sampling.filter(make_record("info", level=logging.INFO)) is True
+
+def test_truncating_filter_cuts_formatted_messages():
+    record = make_record(f"Payload: {'x' * 100}")
+    TruncatingFilter(20).filter(record)
+    assert record.getMessage().startswith("Payload: xxxxxxxxxxx... (")
+
+def test_json_formatter_writes_one_object_per_record():
+    record = make_record("Review of %s", "test/repo", level=logging.INFO)
+    record.trace_id = "abc"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Review of test/repo"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "test"
+    assert entry["trace_id"] == "abc"
+
+def test_configure_logging_writes_json_lines_from_a_background_thread(tmp_path, root_level, monkeypatch):
+    monkeypatch.delenv('LOG_FORMAT', raising=False)
+    monkeypatch.delenv('LOG_LEVEL', raising=False)
+    log_file = tmp_path / "app.log"
+    configure_logging({'format': 'json', 'file': str(log_file), 'console': False}, 'INFO')
+
+    logging.getLogger("test").info("Payload: %s", {'action': 'labeled'})
+    logging.getLogger("test").debug("not written")
+    stop_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["message"] == "Payload: {'action': 'labeled'}"
+    assert entry["thread"] == "MainThread"
+
+def test_configure_logging_rejects_unknown_formats(monkeypatch):
+    monkeypatch.delenv('LOG_FORMAT', raising=False)
+    with pytest.raises(ValueError):
+        configure_logging({'format': 'xml'})
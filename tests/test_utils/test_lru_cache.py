@@ -0,0 +1,71 @@
+import threading
+import pytest
+
+from src.utils.lru_cache import MISSING, LRUCache
+
+
+def test_get_returns_missing_and_cached_none_distinctly():
+    cache = LRUCache("test", maxsize=2)
+    assert cache.get("word") is MISSING
+    cache.put("word", None)
+    assert cache.get("word") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_ratio() == 0.5
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache("test", maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+def test_get_or_compute_calls_compute_once():
+    cache = LRUCache("test", maxsize=4)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key.upper()
+
+    assert cache.get_or_compute("teh", compute) == "TEH"
+    assert cache.get_or_compute("teh", compute) == "TEH"
+    assert calls == ["teh"]
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "cache" / "owner__repo.json")
+    cache = LRUCache("test", maxsize=2, path=path)
+    cache.put("teh", "the")
+    cache.put("wrold", None)
+    cache.save()
+
+    restored = LRUCache("test", maxsize=1, path=path)
+    assert len(restored) == 1
+    assert restored.get("wrold") is None
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+    assert len(LRUCache("test", maxsize=2, path=str(path))) == 0
+
+def test_concurrent_puts_respect_maxsize():
+    cache = LRUCache("test", maxsize=50)
+
+    def worker(offset):
+        for index in range(500):
+            cache.put(offset * 1000 + index, index)
+            cache.get(offset * 1000 + index // 2)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        LRUCache("test", maxsize=0)
@@ -0,0 +1,39 @@
+from prometheus_client import REGISTRY
+
+from src.utils.metrics import record_cache_access, record_watsonx_usage, render_metrics
+
+
+def _sample(name, labels):
+    value = REGISTRY.get_sample_value(name, labels)
+    return value or 0.0
+
+
+def test_record_cache_access_counts_hits_and_misses():
+    hits_before = _sample('cache_requests_total', {'cache': 'test_cache', 'result': 'hit'})
+    misses_before = _sample('cache_requests_total', {'cache': 'test_cache', 'result': 'miss'})
+
+    record_cache_access('test_cache', True)
+    record_cache_access('test_cache', True)
+    record_cache_access('test_cache', False)
+
+    assert _sample('cache_requests_total', {'cache': 'test_cache', 'result': 'hit'}) == hits_before + 2
+    assert _sample('cache_requests_total', {'cache': 'test_cache', 'result': 'miss'}) == misses_before + 1
+
+def test_record_watsonx_usage_counts_tokens():
+    labels = {'model': 'test-model', 'kind': 'generated'}
+    before = _sample('watsonx_tokens_total', labels)
+
+    record_watsonx_usage('test-model', {'results': [{'input_token_count': 10, 'generated_token_count': 5}]})
+    record_watsonx_usage('test-model', {'output': []})  # Responses without usage are ignored
+
+    assert _sample('watsonx_tokens_total', labels) == before + 5
+    assert _sample('watsonx_tokens_total', {'model': 'test-model', 'kind': 'input'}) >= 10
+
+def test_render_metrics_exposes_pipeline_metrics():
+    payload, content_type = render_metrics()
+    text = payload.decode('utf-8')
+
+    assert content_type.startswith('text/plain')
+    assert 'webhook_request_seconds' in text
+    assert 'github_api_call_seconds' in text
+    assert 'review_queue_depth' in text
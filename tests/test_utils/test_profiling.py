@@ -0,0 +1,41 @@
+import pstats
+
+from src.utils.profiling import Profiler, configure_profiling, get_profiler
+
+
+def _busy_work():
+    return sum(i * i for i in range(10000))
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = Profiler(enabled=False, output_dir=str(tmp_path))
+    with profiler.profile("section"):
+        _busy_work()
+    assert list(tmp_path.iterdir()) == []
+
+def test_profile_dumps_cprofile_and_tracemalloc_stats(tmp_path):
+    profiler = Profiler(enabled=True, output_dir=str(tmp_path), use_tracemalloc=True)
+    with profiler.profile("spell_check-owner/repo-1-docs/README.md"):
+        _busy_work()
+
+    prof_path = tmp_path / "spell_check-owner_repo-1-docs_README.md.prof"
+    stats = pstats.Stats(str(prof_path))
+    assert any(function[2] == "_busy_work" for function in stats.stats)
+
+    report = (tmp_path / "spell_check-owner_repo-1-docs_README.md.tracemalloc.txt").read_text()
+    assert report.startswith("Peak traced memory:")
+
+def test_sample_rate_zero_skips_profiling(tmp_path):
+    profiler = Profiler(enabled=True, output_dir=str(tmp_path), sample_rate=0.0)
+    with profiler.profile("section"):
+        _busy_work()
+    assert list(tmp_path.iterdir()) == []
+
+def test_configure_profiling_reads_config(tmp_path):
+    configure_profiling({'enabled': True, 'output_dir': str(tmp_path), 'tracemalloc': True, 'sample_rate': 0.5})
+    try:
+        profiler = get_profiler()
+        assert profiler.enabled
+        assert profiler.use_tracemalloc
+        assert profiler.sample_rate == 0.5
+    finally:
+        configure_profiling({})
@@ -0,0 +1,96 @@
+from src.utils.raw_diff import RawDiffSplitter, split_raw_diff
+
+README_HUNKS = (
+    "@@ -1,2 +1,2 @@\n"
+    "-Old title\n"
+    "+New title\n"
+    " Text\n"
+    "@@ -10,2 +10,3 @@ Section\n"
+    " Context\n"
+    "+Added line\n"
+    " End\n"
+)
+
+RAW_DIFF = (
+    "diff --git a/README.md b/README.md\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/README.md\n"
+    "+++ b/README.md\n"
+    + README_HUNKS +
+    "diff --git a/logo.png b/logo.png\n"
+    "index 3333333..4444444 100644\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+    "diff --git a/docs/old.md b/docs/new name.md\n"
+    "similarity index 90%\n"
+    "rename from docs/old.md\n"
+    "rename to docs/new name.md\n"
+    "--- a/docs/old.md\n"
+    "+++ b/docs/new name.md\n"
+    "@@ -1 +1 @@\n"
+    "-teh\n"
+    "+the\n"
+    "diff --git a/gone.md b/gone.md\n"
+    "deleted file mode 100644\n"
+    "--- a/gone.md\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-bye\n"
+    "diff --git \"a/caf\\303\\251.md\" \"b/caf\\303\\251.md\"\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ \"b/caf\\303\\251.md\"\n"
+    "@@ -0,0 +1 @@\n"
+    "+Bonjour\n"
+).encode('utf-8')
+
+
+def everything(path):
+    return True
+
+def test_splits_a_raw_diff_into_patches_per_file():
+    patches = dict(split_raw_diff([RAW_DIFF], everything))
+
+    assert patches == {
+        "README.md": README_HUNKS,
+        "docs/new name.md": "@@ -1 +1 @@\n-teh\n+the\n",
+        "café.md": "@@ -0,0 +1 @@\n+Bonjour\n",
+    }
+
+def test_chunk_boundaries_do_not_matter():
+    chunks = [RAW_DIFF[index:index + 7] for index in range(0, len(RAW_DIFF), 7)]
+
+    assert list(split_raw_diff(chunks, everything)) == list(split_raw_diff([RAW_DIFF], everything))
+
+def test_only_wanted_files_are_kept():
+    assert [path for path, _ in split_raw_diff([RAW_DIFF], lambda path: path.startswith("docs/"))] == \
+        ["docs/new name.md"]
+
+def test_patches_over_the_size_cap_end_on_a_hunk_boundary():
+    splitter = RawDiffSplitter(lambda path: path == "README.md", max_file_bytes=60)
+
+    patches = dict(splitter.feed(RAW_DIFF) + splitter.close())
+
+    assert patches == {"README.md": "@@ -1,2 +1,2 @@\n-Old title\n+New title\n Text\n"}
+    assert splitter.truncated == ["README.md"]
+
+def test_reading_stops_once_all_wanted_files_are_found():
+    chunks = [RAW_DIFF[index:index + 16] for index in range(0, len(RAW_DIFF), 16)]
+    consumed = []
+
+    def stream():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    patches = list(split_raw_diff(stream(), lambda path: path == "README.md", limit=1))
+
+    assert patches == [("README.md", README_HUNKS)]
+    assert len(consumed) < len(chunks)
+
+def test_reading_stops_at_the_byte_cap_without_partial_hunks():
+    cut = RAW_DIFF.index(b"+Added line")
+    chunks = [RAW_DIFF[:cut], RAW_DIFF[cut:]]
+
+    patches = dict(split_raw_diff(chunks, everything, max_bytes=cut - 1))
+
+    assert patches == {"README.md": "@@ -1,2 +1,2 @@\n-Old title\n+New title\n Text\n"}
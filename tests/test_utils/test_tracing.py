@@ -0,0 +1,70 @@
+import json
+import pytest
+
+from src.utils import tracing
+from src.utils.tracing import configure_tracing, span, start_trace
+
+
+@pytest.fixture
+def enabled_tracer(tmp_path):
+    configure_tracing({'enabled': True, 'output_dir': str(tmp_path), 'format': 'chrome'})
+    yield tmp_path
+    configure_tracing({'enabled': False})
+
+def test_span_is_noop_without_active_trace():
+    configure_tracing({'enabled': False})
+    with span("stage") as current:
+        current.set_attribute("ignored", True)
+    assert current is tracing._NOOP_SPAN
+
+def test_disabled_tracer_writes_nothing(tmp_path):
+    configure_tracing({'enabled': False, 'output_dir': str(tmp_path)})
+    with start_trace("review", delivery_id="abc"):
+        with span("stage"):
+            pass
+    assert list(tmp_path.iterdir()) == []
+
+def test_chrome_export_nests_spans_and_uses_delivery_id(enabled_tracer):
+    with start_trace("webhook", delivery_id="delivery-1"):
+        with start_trace("perform_code_review", repo="test/repo"):
+            with span("get_contents", path="README.md") as stage:
+                stage.set_attribute("bytes", 42)
+
+    [path] = enabled_tracer.glob("delivery-1-*.chrome.json")
+    document = json.loads(path.read_text())
+    events = {event['name']: event for event in document['traceEvents']}
+    assert set(events) == {"webhook", "perform_code_review", "get_contents"}
+    assert events['get_contents']['args']['bytes'] == 42
+    assert events['webhook']['dur'] >= events['get_contents']['dur']
+    assert document['otherData']['delivery_id'] == "delivery-1"
+
+def test_otlp_export_links_parents_and_records_errors(tmp_path):
+    configure_tracing({'enabled': True, 'output_dir': str(tmp_path), 'format': 'otlp'})
+    try:
+        with pytest.raises(RuntimeError):
+            with start_trace("review", delivery_id="delivery-2"):
+                with span("llm_review"):
+                    raise RuntimeError("boom")
+    finally:
+        configure_tracing({'enabled': False})
+
+    [path] = tmp_path.glob("delivery-2-*.otlp.json")
+    document = json.loads(path.read_text())
+    spans = {s['name']: s for s in document['resourceSpans'][0]['scopeSpans'][0]['spans']}
+    assert spans['llm_review']['parentSpanId'] == spans['review']['spanId']
+    assert spans['llm_review']['status']['code'] == 2
+    assert 'parentSpanId' not in spans['review']
+
+def test_delivery_ids_cannot_escape_the_output_directory(enabled_tracer):
+    for _ in range(2):
+        with start_trace("webhook", delivery_id="../../escaped"):
+            pass
+
+    paths = list(enabled_tracer.iterdir())
+    assert len(paths) == 2
+    assert all(path.name.startswith(".._.._escaped-") for path in paths)
+    assert not (enabled_tracer.parent.parent / "escaped.chrome.json").exists()
+
+def test_unknown_export_format_is_rejected():
+    with pytest.raises(ValueError):
+        tracing.Tracer(export_format="zipkin")